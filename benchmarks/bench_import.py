@@ -0,0 +1,49 @@
+"""
+Benchmark for the time taken to import loman, and to build and compute a small computation, in a new process
+
+Prints the median time over ``repeat`` fresh interpreters, and lists any heavy optional dependencies that were imported,
+which should only be loaded on first use of the features that need them.
+
+Usage::
+
+    python -m benchmarks.bench_import [repeat]
+"""
+from __future__ import print_function
+
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'dill', 'matplotlib', 'pydotplus']
+
+SCRIPT = '''
+import json, sys, time
+start = time.time()
+import loman
+imported = time.time()
+comp = loman.Computation()
+comp.add_node('a', value=1)
+comp.add_node('b', lambda a: a + 1)
+comp.compute_all()
+end = time.time()
+print(json.dumps({'import': imported - start, 'total': end - start,
+                  'loaded': [m for m in %r if m in sys.modules]}))
+''' % (HEAVY_MODULES,)
+
+
+def run_once():
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def main(repeat=5):
+    results = [run_once() for _ in range(repeat)]
+    import_time = sorted(r['import'] for r in results)[len(results) // 2]
+    total_time = sorted(r['total'] for r in results)[len(results) // 2]
+    print('import loman:              {:.3f}s'.format(import_time))
+    print('import, build and compute: {:.3f}s'.format(total_time))
+    print('heavy modules loaded:      {}'.format(', '.join(results[0]['loaded']) or 'none'))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
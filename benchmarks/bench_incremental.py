@@ -0,0 +1,71 @@
+"""
+Benchmark for incremental nodes that fold in appended rows
+
+Appends batches of rows to a DataFrame with ``n_rows`` rows, recomputing aggregates after each batch, with aggregates
+that are recalculated in full and with aggregates that have ``update`` functions, and prints the time per batch.
+
+Usage::
+
+    python -m benchmarks.bench_incremental [n_rows] [n_batches] [batch_rows]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from loman import Computation
+
+
+def trades(n, seed):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({'qty': rng.randint(1, 100, n), 'price': rng.uniform(90, 110, n)})
+
+
+def notional(trades):
+    return (trades.qty * trades.price).sum()
+
+
+def update_notional(notional, trades):
+    return notional + (trades.qty * trades.price).sum()
+
+
+def volume(trades):
+    return trades.qty.sum()
+
+
+def update_volume(volume, trades):
+    return volume + trades.qty.sum()
+
+
+def build(n_rows, incremental):
+    comp = Computation()
+    comp.add_node('trades', value=trades(n_rows, 0))
+    if incremental:
+        comp.add_node('notional', notional, update=update_notional)
+        comp.add_node('volume', volume, update=update_volume)
+    else:
+        comp.add_node('notional', notional)
+        comp.add_node('volume', volume)
+    comp.add_node('vwap', lambda notional, volume: notional / volume)
+    comp.compute_all()
+    return comp
+
+
+def main(n_rows=1000000, n_batches=100, batch_rows=100):
+    print('{:>12} {:>14}'.format('mode', 'per batch'))
+    for incremental in [False, True]:
+        comp = build(n_rows, incremental)
+        batches = [trades(batch_rows, i + 1) for i in range(n_batches)]
+        start = time.time()
+        for batch in batches:
+            comp.append('trades', batch)
+            comp.compute('vwap')
+        elapsed = time.time() - start
+        print('{:>12} {:>13.2f}ms'.format('incremental' if incremental else 'full', elapsed / n_batches * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,62 @@
+"""
+Benchmark for streaming items from source nodes with ``run_pipeline``
+
+Replays ``n_ticks`` synthetic ticks from a generator through a small computation, reading them one at a time and in
+batches of increasing size, and prints the throughput of each run.
+
+Usage::
+
+    python -m benchmarks.bench_pipeline [n_ticks]
+"""
+from __future__ import print_function
+
+import sys
+
+from loman import Computation
+
+
+def ticks(n):
+    for i in range(n):
+        yield 1 + i % 100, 100. + (i % 7)
+
+
+def last_price(tick):
+    return tick[1]
+
+
+def batch_last_price(tick):
+    return tick[-1][1]
+
+
+def vwap(tick):
+    return tick[1]
+
+
+def batch_vwap(tick):
+    return sum(size * price for size, price in tick) / sum(size for size, price in tick)
+
+
+def build(n, batch_size):
+    comp = Computation()
+    comp.add_source_node('tick', ticks(n), batch_size=batch_size)
+    if batch_size is None:
+        comp.add_node('price', last_price)
+        comp.add_node('vwap', vwap)
+    else:
+        comp.add_node('price', batch_last_price)
+        comp.add_node('vwap', batch_vwap)
+    comp.add_node('spread', lambda price, vwap: price - vwap)
+    return comp
+
+
+def main(n=20000):
+    print('{:>10} {:>8} {:>10} {:>14}'.format('batch_size', 'batches', 'elapsed', 'ticks/second'))
+    for batch_size in [None, 10, 100, 1000]:
+        comp = build(n, batch_size)
+        stats = comp.run_pipeline('spread')
+        print('{:>10} {:>8} {:>9.3f}s {:>14.0f}'.format(str(batch_size), stats.batches, stats.elapsed,
+                                                      stats.items_per_second))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,75 @@
+"""
+Benchmark for planning ``compute`` with many targets
+
+Builds a computation of about ``n_nodes`` nodes, made of chains of intermediate nodes feeding report outputs, none of
+which have been calculated, and times planning for increasing numbers of targets, with the single-pass planner used by
+``compute``, and with the previous approach of copying and pruning the graph once per target.
+
+Usage::
+
+    python -m benchmarks.bench_planning [n_nodes] [max_legacy_targets]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import networkx as nx
+
+from loman import Computation, States
+from benchmarks.graphs import add1, add
+
+N_CHAINS = 100
+
+
+def build(n, n_outputs=500):
+    comp = Computation()
+    comp.add_node('a', value=0)
+    length = max((n - n_outputs) // N_CHAINS, 1)
+    for c in range(N_CHAINS):
+        comp.add_node(('mid', c, 0), add1, kwds={'x': 'a'})
+        for i in range(1, length):
+            comp.add_node(('mid', c, i), add1, kwds={'x': ('mid', c, i - 1)})
+    for j in range(n_outputs):
+        comp.add_node(('out', j), add, kwds={'x': ('mid', j % N_CHAINS, length - 1),
+                                             'y': ('mid', (j * 7) % N_CHAINS, length // 2)})
+    return comp, [('out', j) for j in range(n_outputs)]
+
+
+def legacy_plan(comp, targets):
+    calc_nodes = set()
+    for name in targets:
+        g = nx.DiGraph()
+        g.add_nodes_from(comp.dag.nodes())
+        g.add_edges_from(comp.dag.edges())
+        for n in nx.ancestors(g, name):
+            if comp.dag.node[n]['state'] in (States.UPTODATE, States.PINNED):
+                g.remove_node(n)
+        ancestors = nx.ancestors(g, name)
+        ancestors.add(name)
+        calc_nodes.update(n for n in nx.topological_sort(g) if n in ancestors)
+    return calc_nodes
+
+
+def time_plan(f, comp, targets):
+    start = time.time()
+    f(comp, targets)
+    return time.time() - start
+
+
+def main(n=50000, max_legacy_targets=10):
+    comp, outputs = build(n)
+    print('Planning compute on {} nodes'.format(len(comp.dag)))
+    print('{:>8} {:>12} {:>12}'.format('targets', 'single-pass', 'per-target'))
+    for n_targets in [1, 10, 100, 500]:
+        targets = outputs[:n_targets]
+        single = time_plan(lambda c, t: c._get_calc_nodes(t), comp, targets)
+        if n_targets <= max_legacy_targets:
+            legacy = '{:>11.3f}s'.format(time_plan(legacy_plan, comp, targets))
+        else:
+            legacy = '{:>12}'.format('-')
+        print('{:>8} {:>11.3f}s {}'.format(n_targets, single, legacy))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,55 @@
+"""
+Microbenchmark for signature introspection in ``add_node``
+
+Builds a computation where many nodes share a single function, as happens with named tuple expansions, first with
+the memoized ``get_signature``, and then with uncached ``inspect``-based introspection.
+
+Usage::
+
+    python -m benchmarks.bench_signature [n_nodes]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import loman.computeengine
+from loman import Computation
+from loman.compat import get_signature, _inspect_signature
+
+
+def make_f(i):
+    def f(x, scale=1.0):
+        return x * scale + i
+    return f
+
+
+def build(n):
+    comp = Computation()
+    comp.add_node('x', value=1.0)
+    for i in range(n):
+        comp.add_node(('y', i), make_f(i))
+    return comp
+
+
+def time_build(n, signature_func):
+    loman.computeengine.get_signature = signature_func
+    try:
+        start = time.time()
+        build(n)
+        return time.time() - start
+    finally:
+        loman.computeengine.get_signature = get_signature
+
+
+def main(n=100000):
+    cached = time_build(n, get_signature)
+    uncached = time_build(n, _inspect_signature)
+    print('Building {} nodes sharing a function'.format(n))
+    print('  memoized get_signature: {:.3f}s'.format(cached))
+    print('  inspect.signature:      {:.3f}s'.format(uncached))
+    print('  speedup:                {:.2f}x'.format(uncached / cached))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,56 @@
+"""
+Synthetic computations used by the benchmarks
+
+Each builder returns a tuple ``(comp, inputs, outputs)`` of a Computation with all input nodes populated, the names of its input nodes, and the names of its output nodes.
+"""
+from loman import Computation
+
+
+def add1(x):
+    return x + 1
+
+
+def add(x, y):
+    return x + y
+
+
+def total(*xs):
+    return sum(xs)
+
+
+def wide_graph(n):
+    """One input feeding ``n`` independent nodes, which are summed by a single output node"""
+    comp = Computation()
+    comp.add_node('a', value=0)
+    names = [('wide', i) for i in range(n)]
+    for name in names:
+        comp.add_node(name, add1, kwds={'x': 'a'})
+    comp.add_node('out', total, args=names, inspect=False)
+    return comp, ['a'], ['out']
+
+
+def deep_graph(n):
+    """A chain of ``n`` nodes, each depending on the previous one"""
+    comp = Computation()
+    comp.add_node(('deep', 0), value=0)
+    for i in range(1, n):
+        comp.add_node(('deep', i), add1, kwds={'x': ('deep', i - 1)})
+    return comp, [('deep', 0)], [('deep', n - 1)]
+
+
+def diamond_graph(n):
+    """``n`` diamonds in series, where each diamond splits into two nodes which are then recombined"""
+    comp = Computation()
+    comp.add_node(('diamond', 0), value=0)
+    for i in range(n):
+        comp.add_node(('left', i), add1, kwds={'x': ('diamond', i)})
+        comp.add_node(('right', i), add1, kwds={'x': ('diamond', i)})
+        comp.add_node(('diamond', i + 1), add, kwds={'x': ('left', i), 'y': ('right', i)})
+    return comp, [('diamond', 0)], [('diamond', n)]
+
+
+GRAPHS = {
+    'wide': wide_graph,
+    'deep': deep_graph,
+    'diamond': diamond_graph,
+}
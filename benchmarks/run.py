@@ -0,0 +1,202 @@
+"""
+Benchmark suite for the compute engine
+
+Runs each benchmark case against each synthetic graph shape, and records the timings as JSON, so that runs can be
+compared with each other.
+
+Usage::
+
+    python -m benchmarks.run [-n SIZE] [-r REPEAT] [-k FILTER] [-o results.json] [--compare baseline.json]
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+import six
+
+from loman import Computation
+from benchmarks.graphs import GRAPHS
+
+CASES = OrderedDict()
+
+
+def case(name, shapes=tuple(GRAPHS)):
+    """
+    Register a benchmark case
+
+    The decorated function takes a graph builder and a size, performs any setup, and returns a function of no arguments to be timed.
+    """
+    def inner(f):
+        for shape in shapes:
+            CASES['{}[{}]'.format(name, shape)] = (f, shape)
+        return f
+    return inner
+
+
+@case('construct')
+def bench_construct(build, n):
+    return lambda: build(n)
+
+
+@case('copy')
+def bench_copy(build, n):
+    comp, inputs, outputs = build(n)
+    comp.compute_all()
+    return comp.copy
+
+
+@case('insert_compute')
+def bench_insert_compute(build, n):
+    comp, inputs, outputs = build(n)
+    comp.compute_all()
+    counter = itertools.count(1)
+
+    def run():
+        comp.insert(inputs[0], next(counter))
+        comp.compute(outputs)
+    return run
+
+
+@case('insert_compute_all')
+def bench_insert_compute_all(build, n):
+    comp, inputs, outputs = build(n)
+    counter = itertools.count(1)
+
+    def run():
+        comp.insert(inputs[0], next(counter))
+        comp.compute_all()
+    return run
+
+
+@case('first_result', shapes=['wide'])
+def bench_first_result(build, n):
+    comp, inputs, outputs = build(n)
+    counter = itertools.count(1)
+
+    def run():
+        comp.insert(inputs[0], next(counter))
+        it = comp.compute_iter(outputs, priority=('wide', n - 1), max_in_flight=1)
+        next(it)
+        it.close()
+    return run
+
+
+@case('insert_from')
+def bench_insert_from(build, n):
+    sources = []
+    for i in range(2):
+        source, inputs, outputs = build(n)
+        source.insert(inputs[0], i)
+        source.compute_all()
+        sources.append(source)
+    comp = build(n)[0]
+    counter = itertools.count()
+
+    def run():
+        comp.insert_from(sources[next(counter) % 2])
+    return run
+
+
+@case('dill_round_trip')
+def bench_dill_round_trip(build, n):
+    comp, inputs, outputs = build(n)
+    comp.compute_all()
+
+    def run():
+        f = six.BytesIO()
+        comp.write_dill(f)
+        f.seek(0)
+        Computation.read_dill(f)
+    return run
+
+
+@case('map_node', shapes=['diamond'])
+def bench_map_node(build, n):
+    subgraph, inputs, outputs = build(10)
+    comp = Computation()
+    comp.add_node('xs', value=list(range(n)))
+    comp.add_map_node('ys', 'xs', subgraph, inputs[0], outputs[0])
+    counter = itertools.count(1)
+
+    def run():
+        start = next(counter)
+        comp.insert('xs', list(range(start, start + n)))
+        comp.compute('ys')
+    return run
+
+
+def time_case(f, shape, n, repeat):
+    fn = f(GRAPHS[shape], n)
+    times = []
+    for i in range(repeat):
+        start = time.time()
+        fn()
+        times.append(time.time() - start)
+    return OrderedDict([('min', min(times)), ('mean', sum(times) / len(times)), ('max', max(times))])
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(n, repeat, pattern=None):
+    results = OrderedDict()
+    for name, (f, shape) in six.iteritems(CASES):
+        if pattern is not None and pattern not in name:
+            continue
+        results[name] = time_case(f, shape, n, repeat)
+        print('{:<32} {:>10.4f}s'.format(name, results[name]['min']))
+    return OrderedDict([
+        ('timestamp', datetime.datetime.utcnow().isoformat()),
+        ('commit', get_commit()),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('size', n),
+        ('repeat', repeat),
+        ('results', results),
+    ])
+
+
+def compare(baseline, current):
+    print()
+    print('{:<32} {:>11} {:>11} {:>8}'.format('case', 'baseline', 'current', 'ratio'))
+    for name, result in six.iteritems(current['results']):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['min'] / base['min'] if base['min'] > 0 else float('nan')
+        print('{:<32} {:>10.4f}s {:>10.4f}s {:>7.2f}x'.format(name, base['min'], result['min'], ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run loman benchmarks')
+    parser.add_argument('-n', '--size', type=int, default=1000, help='Number of nodes (or diamonds) in each graph')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of times to time each case')
+    parser.add_argument('-k', '--filter', default=None, help='Only run cases whose name contains this string')
+    parser.add_argument('-o', '--output', default=None, help='File to write JSON results to')
+    parser.add_argument('--compare', default=None, help='JSON results of a previous run to compare against')
+    args = parser.parse_args(argv)
+
+    current = run(args.size, args.repeat, args.filter)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        compare(baseline, current)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
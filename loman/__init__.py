@@ -1,6 +1,10 @@
 from loman.computeengine import (
-    Computation, ComputationFactory, MapException, LoopDetectedException, NonExistentNodeException,
-    node, C, input_node, calc_node)
+    Computation, ComputationFactory, ComputationTemplate, MapException, LoopDetectedException, NonExistentNodeException,
+    ComputationCancelledException, DeadlineExceededException, Snapshot, node, C, input_node, calc_node)
 from loman.consts import States
+from loman.profiling import ProfileData
+from loman.scheduling import ResourcePool, CancellationToken
+from loman.reactive import ReactiveDriver
 
+import loman.events as events
 import loman.util as util
@@ -2,14 +2,21 @@ import inspect
 from collections import namedtuple
 
 import sys
+import types
+import weakref
 
 import six
 
+try:
+    from time import perf_counter
+except ImportError:
+    from time import time as perf_counter
+
 _Signature = namedtuple('_Signature', ['kwd_params', 'default_params', 'has_var_args', 'has_var_kwds'])
 
 if six.PY3:
     if sys.version_info >= (3, 5):
-        def get_signature(func):
+        def _inspect_signature(func):
             sig = inspect.signature(func)
             pk = inspect._ParameterKind
             has_var_args = any(p.kind == pk.VAR_POSITIONAL for p in sig.parameters.values())
@@ -20,7 +27,7 @@ if six.PY3:
                                   if param.kind in (pk.POSITIONAL_OR_KEYWORD, pk.KEYWORD_ONLY) and param.default != inspect._empty]
             return _Signature(all_keyword_params, default_params, has_var_args, has_var_kwds)
     elif sys.version_info >= (3, 4):
-        def get_signature(func):
+        def _inspect_signature(func):
             sig = inspect.signature(func)
             has_var_args = any(p.kind == inspect._VAR_POSITIONAL for p in sig.parameters.values())
             has_var_kwds = any(p.kind == inspect._VAR_KEYWORD for p in sig.parameters.values())
@@ -32,7 +39,7 @@ if six.PY3:
     else:
         raise Exception("Only Python3 >=3.4 is supported")
 elif six.PY2:
-    def get_signature(func):
+    def _inspect_signature(func):
         argspec = inspect.getargspec(func)
         has_var_args = argspec.varargs is not None
         has_var_kwds = argspec.keywords is not None
@@ -44,4 +51,49 @@ elif six.PY2:
             default_params = argspec.args[-n_default_params:]
         return _Signature(all_keyword_params, default_params, has_var_args, has_var_kwds)
 else:
-    raise Exception("Only Pythons 2 and 3 supported")
\ No newline at end of file
+    raise Exception("Only Pythons 2 and 3 supported")
+
+
+_CO_VARARGS = 0x04
+_CO_VARKEYWORDS = 0x08
+
+_signature_cache = weakref.WeakKeyDictionary()
+
+
+def _code_signature(func):
+    code = func.__code__
+    n_pos = code.co_argcount
+    n_pos_only = getattr(code, 'co_posonlyargcount', 0)
+    n_kwd_only = getattr(code, 'co_kwonlyargcount', 0)
+    names = code.co_varnames
+    pos_params = names[n_pos_only:n_pos]
+    kwd_only_params = names[n_pos:n_pos + n_kwd_only]
+    defaults = func.__defaults__ or ()
+    kwdefaults = getattr(func, '__kwdefaults__', None) or {}
+    default_params = names[max(n_pos - len(defaults), n_pos_only):n_pos]
+    default_params += tuple(name for name in kwd_only_params if name in kwdefaults)
+    return _Signature(pos_params + kwd_only_params, default_params,
+                      bool(code.co_flags & _CO_VARARGS), bool(code.co_flags & _CO_VARKEYWORDS))
+
+
+def get_signature(func):
+    """
+    Get the parameters of a function, as used to bind node inputs
+
+    For plain Python functions, the result is read directly from the function's code object, and cached per code object, so that closures and other functions sharing code are only inspected once. Cache entries are evicted when the code object is garbage collected. Other callables fall back to the ``inspect`` module.
+
+    :param func: Function to get the signature of
+    :rtype: _Signature
+    """
+    if type(func) is not types.FunctionType or hasattr(func, '__wrapped__') or hasattr(func, '__signature__'):
+        return _inspect_signature(func)
+    code = func.__code__
+    n_defaults = len(func.__defaults__) if func.__defaults__ else 0
+    kwdefaults = getattr(func, '__kwdefaults__', None)
+    kwdefault_names = tuple(kwdefaults) if kwdefaults else ()
+    cached = _signature_cache.get(code)
+    if cached is not None and cached[0] == n_defaults and cached[1] == kwdefault_names:
+        return cached[2]
+    signature = _code_signature(func)
+    _signature_cache[code] = (n_defaults, kwdefault_names, signature)
+    return signature
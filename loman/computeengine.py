@@ -1,43 +1,83 @@
+import functools
+import heapq
+import itertools
 import logging
 import os
 import tempfile
+import threading
 import traceback
-from collections import namedtuple, defaultdict
-from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
-from datetime import datetime
+from collections import namedtuple, defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 from enum import Enum
 
 import inspect
-import decorator
-import dill
 import networkx as nx
-import pandas as pd
 import six
 import types
 
+from . import events
 from .consts import NodeAttributes, EdgeAttributes, SystemTags, States
-from .graph_utils import contract_node
-from .visualization import create_viz_dag, to_pydot
-from .compat import get_signature
-from .util import AttributeView, apply_n, apply1, as_iterable
+from .graph_utils import contract_node, get_neighbourhood, topological_sort_subset
+from .visualization import create_viz_dag, create_group_viz_dag, to_pydot, to_dot, write_dot
+from .compat import get_signature, perf_counter
+from .memory import EVICTED, estimate_size
+from .store import DeferredValue, DiskStore
+from .sharedmem import share_value
+from .profiling import update_profile, write_folded_stacks
+from .scheduling import PoolScheduler, ResourcePool
+from .sources import Source, run_pipeline
+from .util import AttributeView, append_values, apply_n, apply1, as_iterable, values_equal
 
 LOG = logging.getLogger('loman.computeengine')
 
+_IMMUTABLE_TYPES = six.integer_types + six.string_types + (float, complex, bool, bytes, frozenset, type(None), Enum)
+
 Error = namedtuple('Error', ['exception', 'traceback'])
 NodeData = namedtuple('NodeData', ['state', 'value'])
-TimingData = namedtuple('TimingData', ['start', 'end', 'duration'])
+TimingData = namedtuple('TimingData', ['start', 'end', 'duration', 'submit', 'queue_wait', 'worker', 'executor'])
+NodeChange = namedtuple('NodeChange', ['name', 'old_state', 'new_state', 'value'])
+NodeRecord = namedtuple('NodeRecord', ['state', 'value', 'version'])
+Subscription = namedtuple('Subscription', ['target', 'nodes', 'tags', 'groups'])
+ExecutorUtilization = namedtuple('ExecutorUtilization', ['nodes', 'workers', 'busy', 'queue_wait', 'span', 'utilization'])
 
 
 class ComputationException(Exception):
     pass
 
 
+def _eval_node(name, f, args, kwds, raise_exceptions):
+    exc, tb = None, None
+    start_t = perf_counter()
+    try:
+        value = f(*args, **kwds)
+    except Exception as e:
+        value = None
+        exc = e
+        tb = traceback.format_exc()
+        if raise_exceptions:
+            raise
+    end_t = perf_counter()
+    worker = (os.getpid(), threading.current_thread().ident)
+    return value, exc, tb, start_t, end_t, worker
+
+
 class MapException(ComputationException):
     def __init__(self, message, results):
         super(MapException, self).__init__(message)
         self.results = results
 
 
+class ComputationCancelledException(ComputationException):
+    def __init__(self, message, completed, remaining):
+        super(ComputationCancelledException, self).__init__(message)
+        self.completed = completed
+        self.remaining = remaining
+
+
+class DeadlineExceededException(ComputationCancelledException):
+    pass
+
+
 class LoopDetectedException(ComputationException):
     pass
 
@@ -64,6 +104,7 @@ def _node(func, *args, **kws):
 
 def node(comp, name=None, *args, **kw):
     def inner(f):
+        import decorator
         if name is None:
             comp.add_node(f.__name__, f, *args, **kw)
         else:
@@ -101,21 +142,205 @@ def calc_node(f, *args, **kwds):
     return CalcNode(f, args, kwds)
 
 
+class _Unchanged(object):
+    def __repr__(self):
+        return '<unchanged>'
+
+
+_UNCHANGED = _Unchanged()
+
+
+def _writer(f):
+    @functools.wraps(f)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            self._write_depth += 1
+            try:
+                return f(self, *args, **kwargs)
+            finally:
+                self._end_write()
+    return wrapper
+
+
+def _copy_dag(dag):
+    g = nx.DiGraph(dag)
+    for name, data in g.nodes(data=True):
+        tags = data.get(NodeAttributes.TAG)
+        if tags is not None:
+            data[NodeAttributes.TAG] = set(tags)
+    return g
+
+
+class ComputationTemplate(object):
+    """
+    A precompiled graph structure, from which new Computation objects can be created without introspection
+
+    The template holds the nodes, resolved edges and parameter bindings of a computation, along with any values that were inserted when it was defined. It holds no executors, so it can be pickled and cached.
+    """
+    def __init__(self, dag, tag_map, state_map):
+        self.dag = dag
+        self.tag_map = tag_map
+        self.state_map = state_map
+
+    @staticmethod
+    def from_computation(comp):
+        """
+        Create a template from the current structure and values of a computation
+
+        :param comp: Computation to take structure and values from
+        :type comp: Computation
+        :rtype: ComputationTemplate
+        """
+        return ComputationTemplate(_copy_dag(comp.dag),
+                                   {tag: nodes.copy() for tag, nodes in six.iteritems(comp._tag_map)},
+                                   {state: nodes.copy() for state, nodes in six.iteritems(comp._state_map)})
+
+    @staticmethod
+    def from_class(definition_class):
+        """
+        Create a template from a class defining the nodes of a computation
+
+        :param definition_class: A class with methods defining the nodes of the Computation
+        :type definition_class: type
+        :rtype: ComputationTemplate
+        """
+        return ComputationTemplate.from_computation(Computation(definition_class))
+
+    def instantiate(self, default_executor=None, executor_map=None, memory_budget=None, memory_policy='drop',
+                    spill_dir=None):
+        """
+        Create a new Computation from the template. This takes time linear in the number of nodes and edges.
+
+        The parameters are the same as those of ``Computation``.
+
+        :rtype: Computation
+        """
+        comp = Computation(default_executor=default_executor, executor_map=executor_map, memory_policy=memory_policy,
+                           spill_dir=spill_dir)
+        comp.dag = _copy_dag(self.dag)
+        comp._tag_map = defaultdict(set, {tag: nodes.copy() for tag, nodes in six.iteritems(self.tag_map)})
+        comp._state_map = {state: nodes.copy() for state, nodes in six.iteritems(self.state_map)}
+        if memory_budget is not None:
+            comp.set_memory_budget(memory_budget)
+        return comp
+
+
 class ComputationFactory(object):
+    """
+    Creates Computation objects from a definition class
+
+    The definition class is introspected once, on first use, to build a :class:`ComputationTemplate`, and each subsequent Computation is stamped out from that template.
+    """
     def __init__(self, definition_class):
         self.definition_class = definition_class
+        self._template = None
+
+    @property
+    def template(self):
+        if self._template is None:
+            self._template = ComputationTemplate.from_class(self.definition_class)
+        return self._template
+
     def __call__(self, *args, **kwargs):
-        return Computation(self.definition_class, *args, **kwargs)
+        return self.template.instantiate(*args, **kwargs)
+
+
+class Snapshot(object):
+    """
+    A read-only view of the states and values of the nodes of a computation, as they were when the snapshot was taken
+
+    Snapshots are returned by ``Computation.snapshot``. They do not change as the computation is updated, and can be read from any thread, while another thread inserts values or calculates nodes. States and values can be read with ``state``, ``value`` and ``[]``, or the attribute-style accessors ``s`` and ``v``, as for a ``Computation``.
+    """
+    def __init__(self, records, version):
+        self._records = records
+        self.version = version
+        self.v = AttributeView(self.nodes, self.value, self.value)
+        self.s = AttributeView(self.nodes, self.state, self.state)
+
+    def nodes(self):
+        """
+        Get a list of nodes in the snapshot
+        :return: List of nodes
+        """
+        return list(self._records)
+
+    def __contains__(self, name):
+        return name in self._records
+
+    def _state_one(self, name):
+        return self._records[name].state
+
+    def state(self, name):
+        """
+        Get the state of a node when the snapshot was taken
+
+        :param name: Name or names of the node to get state for
+        :type name: Key or [Keys]
+        """
+        return apply1(self._state_one, name)
+
+    def _value_one(self, name):
+        value = self._records[name].value
+        if value is EVICTED:
+            raise ComputationException('Value of node {} was evicted, and could not be recalculated, when the snapshot '
+                                       'was published'.format(str(name)))
+        if isinstance(value, DeferredValue):
+            value = value.load()
+        return value
+
+    def value(self, name):
+        """
+        Get the value of a node when the snapshot was taken
+
+        :param name: Name or names of the node to get the value of
+        :type name: Key or [Keys]
+        """
+        return apply1(self._value_one, name)
+
+    def _get_item_one(self, name):
+        return NodeData(self._records[name].state, self._value_one(name))
+
+    def __getitem__(self, name):
+        """
+        Get the state and value of a node when the snapshot was taken
+
+        :param name: Name of the node to get the state and value of
+        """
+        return apply1(self._get_item_one, name)
+
+    def _get_version_one(self, name):
+        return self._records[name].version
+
+    def get_version(self, name):
+        """
+        Get the version of a node's value when the snapshot was taken, which increases each time the node is given a new value
+
+        :param name: Name or names of nodes
+        """
+        return apply1(self._get_version_one, name)
+
+    def to_dict(self):
+        """
+        Get a dictionary containing the values of all nodes when the snapshot was taken
+        """
+        return {name: self._value_one(name) for name in self._records}
 
 
 class Computation(object):
-    def __init__(self, definition_class=None, default_executor=None, executor_map=None):
+    def __init__(self, definition_class=None, default_executor=None, executor_map=None, memory_budget=None,
+                 memory_policy='drop', spill_dir=None):
         """
 
         :param definition_class: A class with methods defining the nodes of the Computation
         :type definition_class: type
         :param default_executor: An executor 
         :type default_executor: concurrent.futures.Executor, default ThreadPoolExecutor(max_workers=1) 
+        :param memory_budget: If set, node values are evicted or spilled to disk when the total estimated size of node values exceeds this many bytes. See ``set_memory_budget``.
+        :type memory_budget: int, default None
+        :param memory_policy: ``'drop'`` or ``'spill'``. See ``set_memory_budget``.
+        :type memory_policy: string, default 'drop'
+        :param spill_dir: Directory to write spilled values to. By default, a temporary directory is used.
+        :type spill_dir: string, default None
         """
         if default_executor is None:
             self.default_executor = ThreadPoolExecutor(1)
@@ -133,9 +358,33 @@ class Computation(object):
         self.tim = AttributeView(self.nodes, self.get_timing, self.get_timing)
         self._tag_map = defaultdict(set)
         self._state_map = {state: set() for state in States}
+        self._hooks = []
+        self._subscriptions = []
+        self._changes = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._publish_lock = threading.Lock()
+        self._dirty = None
+        self._records = {}
+        self._records_shared = False
+        self._records_version = 0
+        self._publish_each_node = True
+        self.resource_pools = OrderedDict()
+        self._pool_orphans = {}
+        self.sources = OrderedDict()
+        self.memory_budget = None
+        self.memory_policy = 'drop'
+        self._memory_usage = 0
+        self._resident = OrderedDict()
+        self.spill_dir = spill_dir
+        self._disk_store = None
+        self.shared_memory_threshold = None
+        self._shared_values = {}
         if definition_class is not None:
             self.add_nodes_from_class(definition_class)
+        self.set_memory_budget(memory_budget, memory_policy)
 
+    @_writer
     def add_node(self, name, func=None, **kwargs):
         """
         Adds or updates a node in a computation
@@ -159,9 +408,14 @@ class Computation(object):
         :type tags: Iterable
         :param executor: Name of executor to run node on
         :type executor: string
+        :param update: Function to update the node's value incrementally, when its inputs have only had rows appended, with ``append``, since it was last calculated. It is called with the node's previous value as its first argument, followed by the same parameters as ``func``, except that inputs that had rows appended receive only the appended rows.
+        :type update: Function, default None
+        :param appends: Whether ``update`` returns rows to append to the node's previous value, rather than its new value. The appended rows are passed on to incremental nodes downstream.
+        :type appends: boolean, default False
         :raises LoopDetectedException
         """
-        LOG.debug('Adding node {}'.format(str(name)))
+        if events.enabled:
+            events.emit('add_node', name=name)
         args = kwargs.get('args', None)
         kwds = kwargs.get('kwds', None)
         has_value = 'value' in kwargs
@@ -171,6 +425,8 @@ class Computation(object):
         group = kwargs.get('group', None)
         tags = kwargs.get('tags', [])
         executor = kwargs.get('executor', None)
+        update = kwargs.get('update', None)
+        appends = kwargs.get('appends', False)
 
         self.dag.add_node(name)
         pred_edges = [(p, name) for p in self.dag.predecessors(name)]
@@ -185,6 +441,8 @@ class Computation(object):
         node[NodeAttributes.KWDS] = {}
         node[NodeAttributes.FUNC] = None
         node[NodeAttributes.EXECUTOR] = executor
+        node[NodeAttributes.UPDATE] = update
+        node[NodeAttributes.APPENDS] = appends
 
         if func:
             node[NodeAttributes.FUNC] = func
@@ -226,18 +484,20 @@ class Computation(object):
                             self.dag.add_node(in_node_name, **{NodeAttributes.STATE: States.PLACEHOLDER})
                             self._state_map[States.PLACEHOLDER].add(in_node_name)
                     self.dag.add_edge(in_node_name, name, **{EdgeAttributes.PARAM: (_ParameterType.KWD, param_name)})
-        try:
-            nx.find_cycle(self.dag)
-            LOG.debug('cycle detected')
+        preds = set(self.dag.predecessors(name))
+        if preds and (name in preds or not preds.isdisjoint(nx.descendants(self.dag, name))):
+            if events.enabled:
+                events.emit('cycle_detected', name=name)
             raise LoopDetectedException('Adding node "{}" created a loop in the DAG.'.format(name))
-        except nx.NetworkXNoCycle:
-            pass
         if func or value is not None:
             self._set_descendents(name, States.STALE)
         if has_value:
             self._set_uptodate(name, value)
         if node[NodeAttributes.STATE] == States.UNINITIALIZED:
             self._try_set_computable(name)
+        if self._dirty is not None:
+            for n in preds:
+                self._dirty.setdefault(n, _UNCHANGED)
         self.set_tag(name, tags)
         if serialize:
             self.set_tag(name, SystemTags.SERIALIZE)
@@ -248,6 +508,273 @@ class Computation(object):
         for name, node in inspect.getmembers(cls, lambda o: isinstance(o, CalcNode)):
             self.add_node(name, node.f, *node.args, **node.kwds)
 
+    def add_hook(self, hook):
+        """
+        Register a hook to observe node calculations
+
+        Hooks are called from the thread that calls ``compute``, when nodes are planned, submitted to executors, started, finished or raise errors, and when their new states are propagated to their descendents. When no hooks are registered, this adds no overhead to calculations.
+
+        :param hook: Hook to register
+        :type hook: loman.tracing.ComputationHook
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Unregister a hook previously registered with ``add_hook``
+
+        :param hook: Hook to unregister
+        """
+        self._hooks.remove(hook)
+
+    def subscribe(self, target, nodes=None, tags=None, groups=None):
+        """
+        Register a function or queue to receive the changes to nodes made by each computation
+
+        Changes to the states and values of nodes are recorded as they happen, and after each call to ``compute``, ``compute_all`` or ``compute_iter`` finishes, they are delivered to each subscriber as a single list of ``NodeChange`` tuples ``(name, old_state, new_state, value)``, in the order in which the nodes first changed. Changes made outside a computation, for example by ``insert``, are delivered with the next computation, or by ``publish_changes``. A node's ``old_state`` is its state before its first change, and ``value`` is its value once the computation finished, which is a marker if the value has been evicted, spilled, or is held remotely. Nodes that changed state and returned to it, without a new value, are not included.
+
+        Recording changes takes time in proportion to the number of changes, and only while there are subscribers.
+
+        Subscribers can be limited to nodes with particular names, tags or groups. A subscriber that specifies none of these receives changes to every node. A function is called with the list of changes, from the thread that called ``compute``. For a queue, such as ``queue.Queue``, the list is passed to ``put``.
+
+        :param target: Function of one argument, or queue
+        :param nodes: Names of nodes to receive changes to
+        :param tags: Tags of nodes to receive changes to
+        :param groups: Groups of nodes to receive changes to
+        :return: Subscription, which can be passed to ``unsubscribe``
+        :rtype: Subscription
+        """
+        def to_set(xs):
+            return None if xs is None else frozenset(as_iterable(xs))
+        subscription = Subscription(target, to_set(nodes), to_set(tags), to_set(groups))
+        self._subscriptions.append(subscription)
+        if self._changes is None:
+            self._changes = OrderedDict()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Stop delivering changes to a subscriber
+
+        :param subscription: Subscription returned by ``subscribe``
+        """
+        self._subscriptions.remove(subscription)
+        if not self._subscriptions:
+            self._changes = None
+
+    def publish_changes(self):
+        """
+        Deliver changes recorded since the last computation to subscribers immediately
+        """
+        changes = self._changes
+        if not changes:
+            return
+        self._changes = OrderedDict()
+        node_changes = []
+        for name, (old_state, value_changed) in six.iteritems(changes):
+            if name not in self.dag:
+                continue
+            node = self.dag.node[name]
+            new_state = node[NodeAttributes.STATE]
+            if new_state != old_state or value_changed:
+                node_changes.append(NodeChange(name, old_state, new_state, node.get(NodeAttributes.VALUE)))
+        for subscription in list(self._subscriptions):
+            selected = [change for change in node_changes if self._is_subscribed(subscription, change.name)]
+            if not selected:
+                continue
+            try:
+                if hasattr(subscription.target, 'put'):
+                    subscription.target.put(selected)
+                else:
+                    subscription.target(selected)
+            except Exception:
+                LOG.exception('Error delivering changes to subscriber {}'.format(subscription.target))
+
+    def _is_subscribed(self, subscription, name):
+        nodes, tags, groups = subscription.nodes, subscription.tags, subscription.groups
+        if nodes is None and tags is None and groups is None:
+            return True
+        if nodes is not None and name in nodes:
+            return True
+        node = self.dag.node[name]
+        if tags is not None and not tags.isdisjoint(node.get(NodeAttributes.TAG, ())):
+            return True
+        return groups is not None and node.get(NodeAttributes.GROUP) in groups
+
+    def _record_change(self, name, old_state, value_changed):
+        entry = self._changes.get(name)
+        if entry is None:
+            self._changes[name] = [old_state, value_changed]
+        elif value_changed:
+            entry[1] = True
+
+    @_writer
+    def enable_snapshots(self, publish='node'):
+        """
+        Start keeping a versioned record of the state and value of each node, which other threads can read consistently, with ``snapshot``, while this computation is updated
+
+        Methods that change the computation, such as ``insert`` and ``compute``, take a writer lock, so that only one thread changes the computation at once. Changes are collected as they are made, and published to the records together. With ``publish='node'``, changes are published after each node is calculated, along with the resulting changes to the states of its descendents, and when each other method that changes the computation finishes. With ``publish='batch'``, changes are only published when each method finishes, so that, for example, snapshots see all or none of the results of a call to ``compute``.
+
+        Publishing takes time in proportion to the number of nodes changed, and is only done while snapshots are enabled, except that the first publication after a snapshot is taken copies the records, in time proportional to the number of nodes. Records keep the value of each node as it was published, so values released under a memory budget stay in memory until their nodes change. Values that were already evicted when their nodes are first published are recalculated, if possible, as for ``value``.
+
+        :param publish: ``'node'`` or ``'batch'``
+        :type publish: string, default 'node'
+        """
+        if publish not in ('node', 'batch'):
+            raise ValueError('{} is not a valid loman publish parameter'.format(publish))
+        self._publish_each_node = publish == 'node'
+        if self._dirty is None:
+            self._dirty = {name: _UNCHANGED for name in self.dag.nodes()}
+
+    @_writer
+    def disable_snapshots(self):
+        """
+        Stop keeping records of the states and values of nodes for ``snapshot``
+        """
+        self._dirty = None
+        with self._publish_lock:
+            self._records = {}
+            self._records_shared = False
+
+    def snapshot(self):
+        """
+        Get a consistent, read-only view of the states and values of all nodes, as most recently published
+
+        A snapshot can be taken, and read, from any thread, without waiting for a computation running in another thread. It shows the computation as it was at a point between the changes published, as described for ``enable_snapshots``, so a node is never seen with a new value while its descendents are seen as UPTODATE with values calculated from its old value. Taking a snapshot takes constant time.
+
+        If snapshots are not enabled, they are enabled, with ``publish='node'``, which waits for any method changing the computation in another thread to finish.
+
+        ::
+
+            >>> snapshot = comp.snapshot()
+            >>> snapshot.s.result, snapshot.v.result
+            (<States.UPTODATE: 4>, 42)
+
+        :rtype: Snapshot
+        """
+        if self._dirty is None:
+            self.enable_snapshots()
+        with self._publish_lock:
+            self._records_shared = True
+            return Snapshot(self._records, self._records_version)
+
+    def _end_write(self):
+        self._write_depth -= 1
+        if self._write_depth == 0 and self._dirty:
+            self._publish_records()
+
+    def _publish_records(self):
+        dirty, self._dirty = self._dirty, {}
+        records = self._records
+        updates = {}
+        for name, value in six.iteritems(dirty):
+            if name not in self.dag:
+                updates[name] = None
+                continue
+            node = self.dag.node[name]
+            if value is _UNCHANGED:
+                record = records.get(name)
+                value = node.get(NodeAttributes.VALUE) if record is None else record.value
+            if value is EVICTED and self._is_restorable(name):
+                value = self._get_value(name)
+            updates[name] = NodeRecord(node[NodeAttributes.STATE], value, node.get(NodeAttributes.VERSION, 0))
+        with self._publish_lock:
+            if not self._records_shared:
+                self._apply_records(self._records, updates)
+                self._records_version += 1
+                return
+        records = self._records.copy()
+        self._apply_records(records, updates)
+        with self._publish_lock:
+            self._records = records
+            self._records_shared = False
+            self._records_version += 1
+
+    @staticmethod
+    def _apply_records(records, updates):
+        for name, record in six.iteritems(updates):
+            if record is None:
+                records.pop(name, None)
+            else:
+                records[name] = record
+
+    def add_resource_pool(self, name, max_concurrency=None, priority=0, groups=None, tags=None, executor=None,
+                          stealable=False):
+        """
+        Add a resource pool, to limit how many nodes in some groups, or with some tags, are calculated at once
+
+        During ``compute`` and ``compute_all``, nodes in a pool are queued when they are ready to calculate, and at most ``max_concurrency`` of them are submitted to executors at once. When several pools have queued nodes, pools with higher priority are served first. A node is in the first pool, in priority order, that includes its group or any of its tags. Nodes that are not in a pool are submitted as soon as they are ready.
+
+        A pool that has spare capacity and no queued nodes takes queued nodes from busy pools that are ``stealable``, and calculates them on its own executor. This keeps executors busy with mixed workloads, but means a stealable pool's limit can be exceeded, so it should only be set for pools whose limit is not a hard constraint.
+
+        :param name: Name of the pool
+        :param max_concurrency: Maximum number of nodes in the pool calculating at once, or None for no limit
+        :type max_concurrency: int, default None
+        :param priority: Pools with higher priority are served first
+        :type priority: int, default 0
+        :param groups: Groups of nodes in the pool
+        :param tags: Tags of nodes in the pool
+        :param executor: Name of an executor in ``executor_map`` to calculate nodes in the pool, unless they specify their own executor. By default, the default executor is used.
+        :param stealable: Whether idle pools may take queued nodes from this pool
+        :type stealable: Boolean, default False
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        groups = frozenset() if groups is None else frozenset(as_iterable(groups))
+        tags = frozenset() if tags is None else frozenset(as_iterable(tags))
+        self.resource_pools[name] = ResourcePool(name, max_concurrency, priority, groups, tags, executor, stealable)
+
+    def remove_resource_pool(self, name):
+        """
+        Remove a resource pool previously added with ``add_resource_pool``
+
+        :param name: Name of the pool
+        """
+        del self.resource_pools[name]
+
+    def add_source_node(self, name, source, batch_size=None, **kwargs):
+        """
+        Add an input node whose values are read from an iterable, such as a generator, or a queue, by ``run_pipeline``
+
+        Each batch read from the source is inserted into the node. If ``batch_size`` is None, items are read one at a time, and each item becomes the node's value. Otherwise, the node's value is a list of up to ``batch_size`` items, so that downstream nodes can process many items at once. A queue, such as ``queue.Queue``, ends when ``loman.sources.END_OF_STREAM`` is read from it.
+
+        Sources are not copied or serialized with the computation.
+
+        :param name: Name of the node
+        :param source: Iterable or queue to read items from
+        :param batch_size: Maximum number of items to read into the node at once
+        :type batch_size: int, default None
+        :param kwargs: Further keyword arguments are passed to ``add_node``, for example ``group`` or ``tags``
+        """
+        source = Source(source, batch_size)
+        self.add_node(name, **kwargs)
+        self.sources[name] = source
+
+    def run_pipeline(self, targets=None, raise_exceptions=False, cancel_token=None, on_batch=None, poll_interval=0.05):
+        """
+        Stream items from source nodes through the computation until all sources end
+
+        Each step reads a batch from every source node that has items available, inserts the batches with ``insert_many``, and computes ``targets``. The next batch is only read once the previous one has been computed, so generators are consumed as fast as the computation can keep up, and producers putting items into a queue with a ``maxsize`` are blocked when the computation falls behind. Items that build up in a queue while a batch is computed are read together in the next batch, up to the source's ``batch_size``.
+
+        ::
+
+            >>> comp.add_source_node('tick', replay_ticks(day), batch_size=1000)
+            >>> stats = comp.run_pipeline('pnl')
+            >>> stats.items_per_second
+
+        :param targets: Name or names of nodes to compute after each batch. By default, all nodes are computed, as with ``compute_all``.
+        :param raise_exceptions: Whether to pass exceptions raised by node computations back to the caller
+        :type raise_exceptions: Boolean, default False
+        :param cancel_token: Token that can be used, from another thread, to stop the pipeline
+        :type cancel_token: CancellationToken, default None
+        :param on_batch: Function called with the computation after each batch is computed
+        :param poll_interval: Time, in seconds, to wait for items in queues before checking for cancellation
+        :type poll_interval: float, default 0.05
+        :return: Numbers of items and batches processed, and the time taken
+        :rtype: PipelineStats
+        """
+        return run_pipeline(self, targets, raise_exceptions, cancel_token, on_batch, poll_interval)
+
     def _refresh_maps(self):
         self._tag_map.clear()
         for state in States:
@@ -256,6 +783,8 @@ class Computation(object):
             self._state_map[self.state(name)].add(name)
             for tag in self.tags(name):
                 self._tag_map[tag].add(name)
+        if self.memory_budget is not None:
+            self.set_memory_budget(self.memory_budget, self.memory_policy)
 
     def _set_tag_one(self, name, tag):
         self.dag.node[name][NodeAttributes.TAG].add(tag)
@@ -283,6 +812,19 @@ class Computation(object):
         """
         apply_n(self._clear_tag_one, name, tag)
 
+    def _set_executor_one(self, name, executor):
+        self.dag.node[name][NodeAttributes.EXECUTOR] = executor
+
+    def set_executor(self, name, executor):
+        """
+        Set the executor used to calculate a node or nodes
+
+        :param name: Node or nodes to set the executor for
+        :param executor: Name of an executor in the computation's ``executor_map``, or None to use the default executor
+        """
+        apply_n(self._set_executor_one, name, executor)
+
+    @_writer
     def delete_node(self, name):
         """
         Delete a node from a computation
@@ -291,22 +833,29 @@ class Computation(object):
 
         :param name: Name of the node to delete. If the node does not exist, a ``NonExistentNodeException`` will be raised.
         """
-        LOG.debug('Deleting node {}'.format(str(name)))
+        if events.enabled:
+            events.emit('delete_node', name=name)
 
         if name not in self.dag:
             raise NonExistentNodeException('Node {} does not exist'.format(str(name)))
 
+        self.sources.pop(name, None)
         if len(self.dag.succ[name]) == 0:
             preds = self.dag.predecessors(name)
             state = self.dag.node[name][NodeAttributes.STATE]
             self.dag.remove_node(name)
             self._state_map[state].remove(name)
+            self._memory_usage -= self._resident.pop(name, 0)
+            self._release_shared_value(name)
+            if self._dirty is not None:
+                self._dirty[name] = None
             for n in preds:
                 if self.dag.node[n][NodeAttributes.STATE] == States.PLACEHOLDER:
                     self.delete_node(n)
         else:
             self._set_state(name, States.PLACEHOLDER)
 
+    @_writer
     def rename_node(self, old_name, new_name=None):
         """
         Rename a node in a computation
@@ -315,14 +864,16 @@ class Computation(object):
         """
 
         if hasattr(old_name, '__getitem__') and not isinstance(old_name, six.string_types):
-            for k, v in six.iteritems(old_name):
-                LOG.debug('Renaming node {} to {}'.format(str(k), str(v)))
+            if events.enabled:
+                for k, v in six.iteritems(old_name):
+                    events.emit('rename_node', old_name=k, new_name=v)
             if new_name is not None:
                 raise ValueError("new_name must not be set if rename_node is passed a dictionary")
             else:
                 mapping = old_name
         else:
-            LOG.debug('Renaming node {} to {}'.format(str(old_name), str(new_name)))
+            if events.enabled:
+                events.emit('rename_node', old_name=old_name, new_name=new_name)
             if old_name not in self.dag:
                 raise NonExistentNodeException('Node {} does not exist'.format(str(old_name)))
             if new_name in self.dag:
@@ -330,9 +881,16 @@ class Computation(object):
             mapping = {old_name: new_name}
 
         nx.relabel_nodes(self.dag, mapping, copy=False)
+        if any(k in self.sources for k in mapping):
+            self.sources = OrderedDict((mapping.get(k, k), v) for k, v in six.iteritems(self.sources))
+        if self._dirty is not None:
+            for k, v in six.iteritems(mapping):
+                self._dirty.setdefault(k, _UNCHANGED)
+                self._dirty[v] = self.dag.node[v].get(NodeAttributes.VALUE)
 
         self._refresh_maps()
 
+    @_writer
     def insert(self, name, value, force=False):
         """
         Insert a value into a node of a computation
@@ -345,56 +903,67 @@ class Computation(object):
         :param value: The value to be inserted into the node.
         :param force: Whether to force recalculation of descendents if node value and state would not be changed
         """
-        LOG.debug('Inserting value into node {}'.format(str(name)))
+        if events.enabled:
+            events.emit('insert', name=name)
 
         if name not in self.dag:
             raise NonExistentNodeException('Node {} does not exist'.format(str(name)))
 
-        if not force:
-            try:
-                current_state, current_value = self.__getitem__(name)
-                if current_state == States.UPTODATE and current_value == value:
-                    return
-            except:
-                pass
+        if not force and self._is_unchanged(name, value):
+            return
 
         self._set_state_and_value(name, States.UPTODATE, value)
         self._set_descendents(name, States.STALE)
         for n in self.dag.successors(name):
             self._try_set_computable(n)
+        if self.memory_budget is not None:
+            self._enforce_memory_budget()
 
-    def insert_many(self, name_value_pairs):
+    @_writer
+    def insert_many(self, name_value_pairs, force=False):
         """
         Insert values into many nodes of a computation simultaneously
 
         Following insertation, the nodes will have state UPTODATE, and all their descendents will be COMPUTABLE or STALE. In the case of inserting many nodes, some of which are descendents of others, this ensures that the inserted nodes have correct status, rather than being set as STALE when their ancestors are inserted.
 
+        Descendents of all the inserted nodes are found in a single traversal of the graph, so inserting many values, for example when loading a snapshot of inputs, takes time proportional to the size of the graph rather than to the number of nodes inserted multiplied by the size of the graph. Nodes that are already UPTODATE with an equal value are skipped, and their descendents are left unchanged. Inserting the mutable object that a node already holds always counts as a change, as it may have been modified in place.
+
         If an attempt is made to insert a value into a node that does not exist, a ``NonExistentNodeException`` will be raised, and none of the nodes will be inserted.
 
         :param name_value_pairs: Each tuple should be a pair (name, value), where name is the name of the node to insert the value into.
         :type name_value_pairs: List of tuples
+        :param force: Whether to force recalculation of descendents of nodes whose value and state would not be changed
         """
-        LOG.debug('Inserting value into nodes {}'.format(", ".join(str(name) for name, value in name_value_pairs)))
+        if events.enabled:
+            events.emit('insert_many', names=[name for name, value in name_value_pairs])
 
         for name, value in name_value_pairs:
             if name not in self.dag:
                 raise NonExistentNodeException('Node {} does not exist'.format(str(name)))
 
-        stale = set()
-        computable = set()
+        names = set()
+        changed = []
         for name, value in name_value_pairs:
-            self._set_state_and_value(name, States.UPTODATE, value)
-            stale.update(nx.dag.descendants(self.dag, name))
-            computable.update(self.dag.successors(name))
-        names = set([name for name, value in name_value_pairs])
+            names.add(name)
+            if force or not self._is_unchanged(name, value):
+                self._set_state_and_value(name, States.UPTODATE, value)
+                changed.append(name)
+        if not changed:
+            return
+
+        stale = self._get_descendents(changed, set([States.PINNED]))
         stale.difference_update(names)
+        self._set_states(stale, States.STALE)
+        computable = set()
+        for name in changed:
+            computable.update(self.dag.successors(name))
         computable.difference_update(names)
-        for name in stale:
-            self._set_state(name, States.STALE)
         for name in computable:
             self._try_set_computable(name)
+        if self.memory_budget is not None:
+            self._enforce_memory_budget()
 
-    def insert_from(self, other, nodes=None):
+    def insert_from(self, other, nodes=None, force=False):
         """
         Insert values into another Computation object into this Computation object
 
@@ -402,40 +971,142 @@ class Computation(object):
         :type Computation:
         :param nodes: Only populate the nodes with the names provided in this list. By default, all nodes from the other Computation object that have corresponding nodes in this Computation object will be inserted
         :type nodes: List, default None
+        :param force: Whether to force recalculation of descendents of nodes whose value and state would not be changed
         """
         if nodes is None:
             nodes = set(self.dag.nodes())
             nodes.intersection_update(other.dag.nodes())
         name_value_pairs = [(name, other.value(name)) for name in nodes]
-        self.insert_many(name_value_pairs)
+        self.insert_many(name_value_pairs, force)
+
+    @_writer
+    def append(self, name, rows):
+        """
+        Append rows to the value of a node, such as a DataFrame that only gains rows
+
+        Following the append, the node will have state UPTODATE, and all its descendents will be COMPUTABLE or STALE, as with ``insert``. Nodes with an ``update`` function that depend on the node receive only the appended rows when they are next calculated, rather than the whole value, so that they can be updated in time proportional to the number of new rows. If the node has no value, the rows become its value.
+
+        :param name: Name of the node
+        :param rows: Rows to append, which may be a pandas DataFrame or Series, numpy array, list or tuple, of the same type as the node's value
+        """
+        if name not in self.dag:
+            raise NonExistentNodeException('Node {} does not exist'.format(str(name)))
+        node = self.dag.node[name]
+        if node[NodeAttributes.STATE] != States.UPTODATE:
+            self.insert(name, rows, force=True)
+            return
+        deltas, base = node.get(NodeAttributes.DELTAS, []), node[NodeAttributes.VERSION]
+        self.insert(name, append_values(self._get_value(name), rows), force=True)
+        self._publish_delta(name, deltas, base, rows)
+
+    def _publish_delta(self, name, deltas, base, rows):
+        if any(self.dag.node[n].get(NodeAttributes.UPDATE) is not None for n in self.dag.successors(name)):
+            self.dag.node[name][NodeAttributes.DELTAS] = deltas + [(base, rows)]
+
+    def _get_input_deltas(self, name, versions):
+        # Rows appended to each input of an incremental node since it was last calculated, or None if any input
+        # changed in another way
+        node = self.dag.node[name]
+        input_versions = node.get(NodeAttributes.INPUT_VERSIONS)
+        if input_versions is None or node.get(NodeAttributes.VALUE) is EVICTED:
+            return None
+        deltas = {}
+        for n, version in six.iteritems(versions):
+            previous = input_versions.get(n)
+            if previous == version:
+                continue
+            entries = self.dag.node[n].get(NodeAttributes.DELTAS)
+            if previous is None or not entries or entries[0][0] > previous:
+                return None
+            rows = [r for v, r in entries if v >= previous]
+            deltas[n] = functools.reduce(append_values, rows)
+        return deltas
+
+    def _prune_deltas(self, name):
+        # Drop rows appended to the inputs of an incremental node that every incremental node has now seen
+        for n in self.dag.predecessors(name):
+            entries = self.dag.node[n].get(NodeAttributes.DELTAS)
+            if not entries:
+                continue
+            seen = [self.dag.node[n1][NodeAttributes.INPUT_VERSIONS].get(n, 0) for n1 in self.dag.successors(n)
+                    if self.dag.node[n1].get(NodeAttributes.INPUT_VERSIONS) is not None]
+            oldest = min(seen) if seen else self.dag.node[n][NodeAttributes.VERSION]
+            self.dag.node[n][NodeAttributes.DELTAS] = [(v, r) for v, r in entries if v >= oldest]
+
+    def _get_update_args(self, name, executor):
+        node = self.dag.node[name]
+        versions = {n: self.dag.node[n].get(NodeAttributes.VERSION, 0) for n in self.dag.predecessors(name)}
+        deltas = self._get_input_deltas(name, versions)
+        if not deltas:
+            f, _, args, kwds = self._get_func_args_kwds(name, executor)
+            return f, args, kwds, (versions, False)
+        _, _, args, kwds = self._get_func_args_kwds(name, executor, deltas)
+        return node[NodeAttributes.UPDATE], [self._get_value(name)] + args, kwds, (versions, True)
+
+    def _is_unchanged(self, name, value):
+        node = self.dag.node[name]
+        if node[NodeAttributes.STATE] != States.UPTODATE:
+            return False
+        current_value = node.get(NodeAttributes.VALUE, EVICTED)
+        if current_value is EVICTED or isinstance(current_value, DeferredValue):
+            return False
+        # The same mutable object may have been modified in place since it was inserted, so it counts as changed
+        if current_value is value and not isinstance(value, _IMMUTABLE_TYPES):
+            return False
+        return values_equal(current_value, value)
 
     def _set_state(self, name, state):
         node = self.dag.node[name]
         old_state = node[NodeAttributes.STATE]
         self._state_map[old_state].remove(name)
         node[NodeAttributes.STATE] = state
+        if self._changes is not None:
+            self._record_change(name, old_state, False)
+        if self._dirty is not None:
+            self._dirty.setdefault(name, _UNCHANGED)
         self._state_map[state].add(name)
 
     def _set_state_and_value(self, name, state, value, require_old_state=True):
         node = self.dag.node[name]
+        old_state = None
         try:
             old_state = node[NodeAttributes.STATE]
             self._state_map[old_state].remove(name)
         except KeyError:
             if require_old_state:
                 raise
+        if self._changes is not None:
+            self._record_change(name, old_state, True)
+        if self._dirty is not None:
+            self._dirty[name] = value
         node[NodeAttributes.STATE] = state
         node[NodeAttributes.VALUE] = value
+        node[NodeAttributes.VERSION] = node.get(NodeAttributes.VERSION, 0) + 1
+        node.pop(NodeAttributes.SIZE, None)
+        node.pop(NodeAttributes.DELTAS, None)
+        node.pop(NodeAttributes.INPUT_VERSIONS, None)
+        node.pop(NodeAttributes.EVICTED_INPUT_VERSIONS, None)
+        if self._shared_values:
+            self._release_shared_value(name)
         self._state_map[state].add(name)
+        if self.memory_budget is not None:
+            self._account_memory(name, value)
 
     def _set_states(self, names, state):
+        changes = self._changes
+        dirty = self._dirty
         for name in names:
             node = self.dag.node[name]
             old_state = node[NodeAttributes.STATE]
             self._state_map[old_state].remove(name)
             node[NodeAttributes.STATE] = state
+            if changes is not None:
+                self._record_change(name, old_state, False)
+            if dirty is not None:
+                dirty.setdefault(name, _UNCHANGED)
         self._state_map[state].update(names)
 
+    @_writer
     def set_stale(self, name):
         """
         Set the state of a node and all its dependencies to STALE
@@ -447,6 +1118,7 @@ class Computation(object):
         self._set_states(names, States.STALE)
         self._try_set_computable(name)
 
+    @_writer
     def pin(self, name, value=None):
         """
         Set the state of a node to PINNED
@@ -467,13 +1139,12 @@ class Computation(object):
         """
         self.set_stale(name)
 
-    def _get_descendents(self, name, stop_states=None):
-        if self.dag.node[name][NodeAttributes.STATE] in stop_states:
-            return set()
+    def _get_descendents(self, names, stop_states=None):
         if stop_states is None:
             stop_states = []
+        names = as_iterable(names)
         visited = set()
-        to_visit = {name}
+        to_visit = set(n for n in names if self.dag.node[n][NodeAttributes.STATE] not in stop_states)
         while to_visit:
             n = to_visit.pop()
             visited.add(n)
@@ -483,7 +1154,7 @@ class Computation(object):
                 if self.dag.node[n1][NodeAttributes.STATE] in stop_states:
                     continue
                 to_visit.add(n1)
-        visited.remove(name)
+        visited.difference_update(names)
         return visited
 
     def _set_descendents(self, name, state):
@@ -492,7 +1163,15 @@ class Computation(object):
 
     def _set_uninitialized(self, name):
         self._set_states([name], States.UNINITIALIZED)
+        if self._dirty is not None:
+            self._dirty[name] = None
         self.dag.node[name].pop(NodeAttributes.VALUE, None)
+        self.dag.node[name].pop(NodeAttributes.SIZE, None)
+        self.dag.node[name].pop(NodeAttributes.DELTAS, None)
+        self.dag.node[name].pop(NodeAttributes.INPUT_VERSIONS, None)
+        self.dag.node[name].pop(NodeAttributes.EVICTED_INPUT_VERSIONS, None)
+        self._memory_usage -= self._resident.pop(name, 0)
+        self._release_shared_value(name)
 
     def _set_uptodate(self, name, value):
         self._set_state_and_value(name, States.UPTODATE, value)
@@ -515,23 +1194,241 @@ class Computation(object):
                     return
             self._set_state(name, States.COMPUTABLE)
 
-    def _get_parameter_data(self, name):
+    def _get_parameter_data(self, name, executor=None, overrides=None):
+        keep_remote = getattr(executor, 'accepts_remote_values', False)
+        share = self.shared_memory_threshold is not None and \
+            (isinstance(executor, ProcessPoolExecutor) or getattr(executor, 'accepts_shared_memory', False))
         for arg, value in six.iteritems(self.dag.node[name][NodeAttributes.ARGS]):
             yield _ParameterItem(_ParameterType.ARG, arg, value)
         for param_name, value in six.iteritems(self.dag.node[name][NodeAttributes.KWDS]):
             yield _ParameterItem(_ParameterType.KWD, param_name, value)
         for in_node_name in self.dag.predecessors(name):
-            param_value = self.dag.node[in_node_name][NodeAttributes.VALUE]
+            if overrides is not None and in_node_name in overrides:
+                param_value = overrides[in_node_name]
+            else:
+                param_value = self._get_value(in_node_name, keep_remote)
+            if share and not isinstance(param_value, DeferredValue):
+                param_value = self._get_shared_value(in_node_name, param_value)
             edge = self.dag[in_node_name][name]
             param_type, param_name = edge[EdgeAttributes.PARAM]
             yield _ParameterItem(param_type, param_name, param_value)
 
-    def _get_func_args_kwds(self, name):
+    def _get_shared_value(self, name, value):
+        shared = self._shared_values.get(name)
+        if shared is not None and shared.source is value:
+            return shared
+        self._release_shared_value(name)
+        shared = share_value(value, self.shared_memory_threshold)
+        if shared is None:
+            return value
+        if events.enabled:
+            events.emit('share_value', name=name, block=shared.name)
+        self._shared_values[name] = shared
+        return shared
+
+    def _release_shared_value(self, name):
+        shared = self._shared_values.pop(name, None)
+        if shared is not None:
+            if events.enabled:
+                events.emit('release_shared_value', name=name, block=shared.name)
+            shared.release()
+
+    def _get_value(self, name, keep_remote=False):
+        value = self.dag.node[name][NodeAttributes.VALUE]
+        if value is EVICTED:
+            self._restore_values(name)
+            value = self.dag.node[name][NodeAttributes.VALUE]
+        elif isinstance(value, DeferredValue) and not (keep_remote and value.residency == 'remote'):
+            if events.enabled:
+                events.emit('load_value', name=name, residency=value.residency)
+            value = value.load()
+            self.dag.node[name][NodeAttributes.VALUE] = value
+            if self.memory_budget is not None:
+                self._account_memory(name, value)
+        if self.memory_budget is not None and name in self._resident:
+            self._resident[name] = self._resident.pop(name)
+        return value
+
+    def _get_evicted_ancestors(self, name):
+        to_restore = []
+        visited = {name}
+        to_visit = [name]
+        while to_visit:
+            n = to_visit.pop()
+            to_restore.append(n)
+            for n1 in self.dag.predecessors(n):
+                if n1 not in visited and self.dag.node[n1].get(NodeAttributes.VALUE) is EVICTED:
+                    visited.add(n1)
+                    to_visit.append(n1)
+        return to_restore
+
+    def _is_restorable(self, name):
+        for n in self._get_evicted_ancestors(name):
+            if self.dag.node[n].get(NodeAttributes.EVICTED_INPUT_VERSIONS) != self._get_input_versions(n):
+                return False
+        return True
+
+    def _restore_values(self, name):
+        if not self._is_restorable(name):
+            raise ComputationException('Unable to restore evicted value of node {}, which is {}, because its inputs have '
+                                       'changed since it was calculated. Compute the node to get its current value.'
+                                       .format(str(name), self.dag.node[name][NodeAttributes.STATE].name))
+        to_restore = self._get_evicted_ancestors(name)
+        for n in nx.topological_sort(self.dag.subgraph(to_restore)):
+            if events.enabled:
+                events.emit('restore_value', name=n)
+            f, executor_name, args, kwds = self._get_func_args_kwds(n)
+            try:
+                value = f(*args, **kwds)
+            except Exception as e:
+                raise ComputationException('Unable to restore evicted value of node {}: {!r}'.format(str(n), e))
+            node = self.dag.node[n]
+            node[NodeAttributes.VALUE] = value
+            node.pop(NodeAttributes.SIZE, None)
+            node.pop(NodeAttributes.EVICTED_INPUT_VERSIONS, None)
+            if self.memory_budget is not None:
+                self._account_memory(n, value)
+
+    def _get_input_versions(self, name):
+        return {n: self.dag.node[n].get(NodeAttributes.VERSION, 0) for n in self.dag.predecessors(name)}
+
+    def _account_memory(self, name, value):
+        old_size = self._resident.pop(name, 0)
+        if value is EVICTED or isinstance(value, DeferredValue):
+            size = 0
+        else:
+            size = self._get_size_one(name)
+            self._resident[name] = size
+        self._memory_usage += size - old_size
+
+    def _get_size_one(self, name):
+        node = self.dag.node[name]
+        size = node.get(NodeAttributes.SIZE)
+        if size is None:
+            value = node.get(NodeAttributes.VALUE)
+            size = 0 if value is EVICTED or isinstance(value, DeferredValue) else estimate_size(value)
+            node[NodeAttributes.SIZE] = size
+        return size
+
+    def get_size(self, name):
+        """
+        Get the estimated memory used by the value of a node, in bytes
+
+        Sizes include objects referred to by the value, and use the size of the data of numpy arrays and pandas objects. The size of an evicted value is 0. Sizes are cached until the node's value changes.
+
+        :param name: Name or names of the node to get the size of
+        """
+        return apply1(self._get_size_one, name)
+
+    @_writer
+    def set_memory_budget(self, memory_budget, policy=None):
+        """
+        Set the maximum total estimated size of node values to keep in memory
+
+        When a memory budget is set, the size of each node's value is estimated whenever it changes. If the total exceeds the budget, during ``compute`` and ``compute_all``, or after values are inserted, the least recently used values are released until the total is within budget. Values of targets of a computation, and values needed to calculate nodes still pending, are not released.
+
+        With ``policy='drop'``, values of calculated nodes are evicted. Evicted nodes keep their state, and their values are transparently recalculated from their inputs when they are next used, or retrieved with ``value``. Input nodes, and pinned nodes, are never evicted. Values are recalculated by calling nodes' functions directly, in the calling thread, rather than through executors, and are not recorded in timing, profile data or hooks. If the inputs of an evicted node have changed since it was calculated, for example because a new value was inserted upstream, its old value cannot be recalculated, and retrieving it raises a ``ComputationException``; it is recalculated as usual by the next computation.
+
+        With ``policy='spill'``, values of any node are written to disk, in ``spill_dir``, or a temporary directory, and transparently read back when they are next used. numpy arrays are memory-mapped when they are read back.
+
+        :param memory_budget: Budget in bytes, or None to stop releasing values
+        :param policy: ``'drop'`` or ``'spill'``, or None to keep the current policy
+        :type policy: string, default None
+        """
+        if policy is None:
+            policy = self.memory_policy
+        elif policy not in ('drop', 'spill'):
+            raise ValueError('{} is not a valid loman memory policy'.format(policy))
+        self.memory_budget = memory_budget
+        self.memory_policy = policy
+        self._resident = OrderedDict()
+        self._memory_usage = 0
+        if memory_budget is not None:
+            for name, value in six.iteritems(nx.get_node_attributes(self.dag, NodeAttributes.VALUE)):
+                self._account_memory(name, value)
+
+    def is_evicted(self, name):
+        """
+        Whether the value of a node has been evicted to save memory
+
+        :param name: Name or names of nodes
+        """
+        return apply1(lambda n: self.dag.node[n].get(NodeAttributes.VALUE) is EVICTED, name)
+
+    def _get_residency_one(self, name):
+        value = self.dag.node[name].get(NodeAttributes.VALUE)
+        if value is EVICTED:
+            return 'evicted'
+        if isinstance(value, DeferredValue):
+            return value.residency
+        return 'resident'
+
+    def get_residency(self, name):
+        """
+        Get where the value of a node is held: ``'resident'`` in memory, ``'spilled'`` to disk, ``'remote'`` in a worker process, or ``'evicted'`` to be recalculated when needed
+
+        :param name: Name or names of nodes
+        """
+        return apply1(self._get_residency_one, name)
+
+    def _evict(self, name):
+        if events.enabled:
+            events.emit('evict', name=name)
+        node = self.dag.node[name]
+        node[NodeAttributes.VALUE] = EVICTED
+        node[NodeAttributes.EVICTED_INPUT_VERSIONS] = self._get_input_versions(name)
+        node.pop(NodeAttributes.SIZE, None)
+        self._release_shared_value(name)
+        self._memory_usage -= self._resident.pop(name, 0)
+
+    def _spill(self, name):
+        if events.enabled:
+            events.emit('spill', name=name)
+        if self._disk_store is None:
+            self._disk_store = DiskStore(self.spill_dir)
+        node = self.dag.node[name]
+        if isinstance(node[NodeAttributes.VALUE], DeferredValue):
+            return
+        node[NodeAttributes.VALUE] = self._disk_store.put(node[NodeAttributes.VALUE])
+        node.pop(NodeAttributes.SIZE, None)
+        self._memory_usage -= self._resident.pop(name, 0)
+        self._release_shared_value(name)
+
+    def _is_releasable(self, name, targets=(), pending=()):
+        if name in targets or name not in self._resident:
+            return False
+        node = self.dag.node[name]
+        if self.memory_policy == 'spill':
+            if node[NodeAttributes.STATE] not in (States.UPTODATE, States.PINNED):
+                return False
+        elif node.get(NodeAttributes.FUNC) is None or node[NodeAttributes.STATE] != States.UPTODATE:
+            return False
+        return not any(n in pending for n in self.dag.successors(name))
+
+    def _enforce_memory_budget(self, targets=(), pending=(), candidates=None):
+        # candidates holds nodes that may be releasable, in least recently used order. Nodes are removed from it as
+        # they are checked, so that during a computation, each node is only checked again once it may have become
+        # releasable, rather than after every node calculated.
+        if self._memory_usage <= self.memory_budget:
+            return
+        if candidates is None:
+            candidates = OrderedDict.fromkeys(self._resident)
+        while candidates and self._memory_usage > self.memory_budget:
+            name = next(iter(candidates))
+            del candidates[name]
+            if not self._is_releasable(name, targets, pending):
+                continue
+            if self.memory_policy == 'spill':
+                self._spill(name)
+            else:
+                self._evict(name)
+
+    def _get_func_args_kwds(self, name, executor=None, overrides=None):
         node0 = self.dag.node[name]
         f = node0[NodeAttributes.FUNC]
         executor_name = node0.get(NodeAttributes.EXECUTOR)
         args, kwds = [], {}
-        for param in self._get_parameter_data(name):
+        for param in self._get_parameter_data(name, executor, overrides):
             if param.type == _ParameterType.ARG:
                 idx = param.name
                 while len(args) <= idx:
@@ -543,91 +1440,309 @@ class Computation(object):
                 raise Exception("Unexpected param type: {}".format(param.type))
         return f, executor_name, args, kwds
 
-    def _eval_node(self, name, f, args, kwds, raise_exceptions):
-        exc, tb = None, None
-        start_dt = datetime.utcnow()
+    def _compute_nodes(self, names, raise_exceptions=False, targets=None, release=None, deadline=None,
+                       cancel_token=None):
         try:
-            logging.debug("Running " + str(name))
-            value = f(*args, **kwds)
-            logging.debug("Completed " + str(name))
-        except Exception as e:
-            value = None
-            exc = e
-            tb = traceback.format_exc()
-            if raise_exceptions:
-                raise
-        end_dt = datetime.utcnow()
-        return value, exc, tb, start_dt, end_dt
+            for _ in self._iter_compute_nodes(names, raise_exceptions, targets, release, deadline, cancel_token):
+                pass
+        finally:
+            if self._subscriptions:
+                self.publish_changes()
+
+    def _get_priority_ranks(self, priority, names):
+        ranks = {}
+        for rank, p in enumerate(as_iterable(priority)):
+            to_visit = [p]
+            while to_visit:
+                n = to_visit.pop()
+                if n in ranks or n not in names:
+                    continue
+                ranks[n] = rank
+                to_visit.extend(self.dag.predecessors(n))
+        return ranks
 
-    def _compute_nodes(self, names, raise_exceptions=False):
-        LOG.debug('Computing nodes {}'.format(list(map(str, names))))
+    def _iter_compute_nodes(self, names, raise_exceptions=False, targets=None, release=None, deadline=None,
+                            cancel_token=None, priority=None, max_in_flight=None):
+        if events.enabled:
+            events.emit('compute_start', names=list(names))
 
+        names_set = names if isinstance(names, (set, frozenset)) else set(names)
         futs = {}
+        interruptible = deadline is not None or cancel_token is not None
+        interruption = []
+
+        def check_interrupted():
+            if not interruption:
+                if cancel_token is not None and cancel_token.cancelled:
+                    interruption.append(ComputationCancelledException)
+                elif deadline is not None and perf_counter() >= deadline:
+                    interruption.append(DeadlineExceededException)
+            return bool(interruption)
+        hooks = self._hooks
+        memory_budget = self.memory_budget
+        if memory_budget is not None or release is not None:
+            pending = {n for n in names if self.dag.node[n].get(NodeAttributes.FUNC) is not None
+                       and self.dag.node[n][NodeAttributes.STATE] not in (States.UPTODATE, States.PINNED)}
+            if targets is None:
+                targets = {n for n in names if len(self.dag.succ[n]) == 0}
+            else:
+                targets = set(as_iterable(targets))
+        if memory_budget is not None:
+            releasable = OrderedDict((n, None) for n in self._resident if self._is_releasable(n, targets, pending))
+        if release is not None:
+            if release == 'drop':
+                release_value = self._evict
+            elif release == 'spill':
+                release_value = self._spill
+            else:
+                raise ValueError('{} is not a valid loman release parameter'.format(release))
+            consumers = {n: sum(1 for n1 in self.dag.successors(n) if n1 in pending) for n in pending}
+
+            def release_if_consumed(n):
+                if consumers.get(n) == 0 and n not in targets and self.dag.node[n][NodeAttributes.STATE] == States.UPTODATE:
+                    release_value(n)
 
-        def run(name):
-            f, executor_name, args, kwds = self._get_func_args_kwds(name)
+        scheduler = PoolScheduler(self.resource_pools.values(), self._pool_orphans) if self.resource_pools else None
+
+        closed = []
+
+        def submit(name, pool=None):
+            if closed or (interruptible and check_interrupted()):
+                return
+            if hooks:
+                bind_t = perf_counter()
+            executor_name = self.dag.node[name].get(NodeAttributes.EXECUTOR)
+            if executor_name is None and pool is not None:
+                executor_name = pool.executor
             if executor_name is None:
                 executor = self.default_executor
             else:
                 executor = self.executor_map[executor_name]
-            fut = executor.submit(self._eval_node, name, f, args, kwds, raise_exceptions)
-            futs[fut] = name
+            if self.dag.node[name].get(NodeAttributes.UPDATE) is not None:
+                f, args, kwds, incremental = self._get_update_args(name, executor)
+            else:
+                f, _, args, kwds = self._get_func_args_kwds(name, executor)
+                incremental = None
+            submit_t = perf_counter()
+            if hooks:
+                for hook in hooks:
+                    hook.on_submit(name, executor_name, bind_t, submit_t)
+            if events.enabled:
+                events.emit('node_submit', name=name, executor=executor_name)
+            fut = executor.submit(_eval_node, name, f, args, kwds, raise_exceptions)
+            futs[fut] = name, executor_name, submit_t, incremental
+
+        def route(name):
+            if scheduler is not None:
+                pool = scheduler.get_pool(self.dag.node[name])
+                if pool is not None:
+                    scheduler.push(name, pool)
+                    for n, slot_pool in scheduler.pop_ready():
+                        submit(n, slot_pool)
+                    return
+            submit(name)
+
+        if priority is None and max_in_flight is None:
+            ready = None
+            run = route
+        else:
+            if max_in_flight is not None and max_in_flight < 1:
+                raise ValueError('max_in_flight must be at least 1')
+            ranks = {} if priority is None else self._get_priority_ranks(priority, names)
+            default_rank = max(ranks.values()) + 1 if ranks else 0
+            ready = []
+            sequence = itertools.count()
+
+            def run(name):
+                heapq.heappush(ready, (ranks.get(name, default_rank), next(sequence), name))
+
+        def dispatch():
+            while ready and (max_in_flight is None or len(futs) < max_in_flight):
+                route(heapq.heappop(ready)[2])
 
         computed = set()
 
         for name in names:
+            if interruptible and check_interrupted():
+                break
             node0 = self.dag.node[name]
             state = node0[NodeAttributes.STATE]
             if state == States.COMPUTABLE:
                 run(name)
+        if ready is not None:
+            dispatch()
 
-        while len(futs) > 0:
-            done, not_done = wait(futs.keys(), return_when=FIRST_COMPLETED)
-            for fut in done:
-                name = futs.pop(fut)
-                node0 = self.dag.node[name]
-                value, exc, tb, start_dt, end_dt = fut.result()
-                delta = (end_dt - start_dt).total_seconds()
-                if exc is None:
-                    self._set_state_and_value(name, States.UPTODATE, value)
-                    node0[NodeAttributes.TIMING] = TimingData(start_dt, end_dt, delta)
-                    self._set_descendents(name, States.STALE)
-                    for n in self.dag.successors(name):
-                        logging.debug(str(name) + ' ' + str(n) + ' ' + str(computed))
-                        if n in computed:
-                            raise LoopDetectedException("Calculating {} for the second time".format(name))
-                        self._try_set_computable(n)
-                        node0 = self.dag.node[n]
-                        state = node0[NodeAttributes.STATE]
-                        if state == States.COMPUTABLE and n in names:
-                            run(n)
+        try:
+            while not interruption:
+                if futs:
+                    wait_for = list(futs)
+                elif scheduler is not None and scheduler.is_waiting() and not closed:
+                    # Nodes are queued behind nodes still running from an earlier computation
+                    wait_for = scheduler.get_orphans()
+                    if not wait_for:
+                        break
+                else:
+                    break
+                if interruptible:
+                    if cancel_token is not None:
+                        wait_for.append(cancel_token._future)
+                    timeout = None if deadline is None else max(deadline - perf_counter(), 0)
+                    done, not_done = wait(wait_for, timeout=timeout, return_when=FIRST_COMPLETED)
+                    if cancel_token is not None:
+                        done.discard(cancel_token._future)
+                    check_interrupted()
                 else:
-                    self._set_state_and_value(name, States.ERROR, Error(exc, tb))
-                    self._set_descendents(name, States.STALE)
-                computed.add(name)
+                    done, not_done = wait(wait_for, return_when=FIRST_COMPLETED)
+                if scheduler is not None and not futs:
+                    for n, slot_pool in scheduler.pop_ready():
+                        submit(n, slot_pool)
+                for fut in done:
+                    if fut not in futs:
+                        continue
+                    name, executor_name, submit_t, incremental = futs.pop(fut)
+                    if scheduler is not None:
+                        scheduler.finish(name)
+                    node0 = self.dag.node[name]
+                    value, exc, tb, start_t, end_t, worker = fut.result()
+                    delta = end_t - start_t
+                    if events.enabled:
+                        if exc is None:
+                            events.emit('node_finish', name=name, duration=delta, worker=worker)
+                        else:
+                            events.emit('node_error', name=name, error=repr(exc), duration=delta, worker=worker)
+                    if hooks:
+                        for hook in hooks:
+                            hook.on_start(name, start_t, worker)
+                            if exc is None:
+                                hook.on_finish(name, start_t, end_t, worker)
+                            else:
+                                hook.on_error(name, Error(exc, tb), start_t, end_t, worker)
+                        propagate_t = perf_counter()
+                    self._update_profile(name, delta)
+                    if release is not None:
+                        for n in self.dag.predecessors(name):
+                            if n in consumers:
+                                consumers[n] -= 1
+                                release_if_consumed(n)
+                    if exc is None:
+                        appended = incremental is not None and incremental[1] and node0[NodeAttributes.APPENDS]
+                        if appended:
+                            deltas, base, rows = node0.get(NodeAttributes.DELTAS, []), node0[NodeAttributes.VERSION], value
+                            value = append_values(self._get_value(name), rows)
+                        self._set_state_and_value(name, States.UPTODATE, value)
+                        if appended:
+                            self._publish_delta(name, deltas, base, rows)
+                        if incremental is not None:
+                            node0[NodeAttributes.INPUT_VERSIONS] = incremental[0]
+                            self._prune_deltas(name)
+                        node0[NodeAttributes.TIMING] = TimingData(start_t, end_t, delta, submit_t, start_t - submit_t,
+                                                                  worker, executor_name)
+                        self._set_descendents(name, States.STALE)
+                        for n in self.dag.successors(name):
+                            if n in computed:
+                                raise LoopDetectedException("Calculating {} for the second time".format(name))
+                            self._try_set_computable(n)
+                            node0 = self.dag.node[n]
+                            state = node0[NodeAttributes.STATE]
+                            if state == States.COMPUTABLE and n in names_set:
+                                run(n)
+                    else:
+                        self._set_state_and_value(name, States.ERROR, Error(exc, tb))
+                        self._set_descendents(name, States.STALE)
+                    computed.add(name)
+                    if release is not None:
+                        release_if_consumed(name)
+                    if memory_budget is not None:
+                        pending.discard(name)
+                        for n in itertools.chain([name], self.dag.predecessors(name)):
+                            releasable.pop(n, None)
+                            if self._is_releasable(n, targets, pending):
+                                releasable[n] = None
+                        self._enforce_memory_budget(targets, pending, releasable)
+                    if hooks:
+                        end_propagate_t = perf_counter()
+                        for hook in hooks:
+                            hook.on_propagate(name, propagate_t, end_propagate_t)
+                    if scheduler is not None:
+                        for n, slot_pool in scheduler.pop_ready():
+                            submit(n, slot_pool)
+                    if ready is not None:
+                        dispatch()
+                    if self._dirty and self._publish_each_node:
+                        self._publish_records()
+                    if closed:
+                        continue
+                    try:
+                        yield name
+                    except GeneratorExit:
+                        # The caller stopped iterating. Nodes not yet started are cancelled, and nodes already running
+                        # are waited for, and their results kept, without yielding them, so that they are not
+                        # calculated again by a later computation.
+                        closed.append(True)
+                        for fut in list(futs):
+                            if fut.cancel():
+                                del futs[fut]
+
+            if interruption and not closed:
+                exc_class = interruption[0]
+                completed = [n for n in names if n in computed]
+                remaining = [n for n in names if self.dag.node[n][NodeAttributes.STATE] in (States.COMPUTABLE, States.STALE)]
+                reason = 'deadline exceeded' if exc_class is DeadlineExceededException else 'cancelled'
+                raise exc_class('Computation {} after calculating {} nodes, with {} nodes remaining'.format(
+                    reason, len(completed), len(remaining)), completed, remaining)
+        finally:
+            # Nodes still running when the computation stops, because it was interrupted, or a node raised an
+            # exception, are cancelled if they have not started, and otherwise keep their resource pool's capacity
+            # until they finish
+            for fut, (name, _, _, _) in six.iteritems(futs):
+                if scheduler is not None:
+                    scheduler.detach(name, fut)
+                else:
+                    fut.cancel()
+
+    def _update_profile(self, name, duration):
+        critical_base, critical_pred = 0.0, None
+        for n in self.dag.predecessors(name):
+            profile = self.dag.node[n].get(NodeAttributes.PROFILE)
+            if profile is not None and profile.critical_path > critical_base:
+                critical_base, critical_pred = profile.critical_path, n
+        node = self.dag.node[name]
+        profile = update_profile(node.get(NodeAttributes.PROFILE), duration, critical_base, critical_pred)
+        node[NodeAttributes.PROFILE] = profile
 
     def _get_calc_nodes(self, name):
-        g = nx.DiGraph()
-        g.add_nodes_from(self.dag.nodes())
-        g.add_edges_from(self.dag.edges())
-        for n in nx.ancestors(g, name):
-            node = self.dag.node[n]
-            state = node[NodeAttributes.STATE]
-            if state == States.UPTODATE or state == States.PINNED:
-                g.remove_node(n)
-
-        ancestors = nx.ancestors(g, name)
-        for n in ancestors:
-            if state == States.UNINITIALIZED and len(self.dag.pred[n]) == 0:
-                raise Exception("Cannot compute {} because {} uninitialized".format(name, n))
-            if state == States.PLACEHOLDER:
-                raise Exception("Cannot compute {} because {} is placeholder".format(name, n))
-
-        ancestors.add(name)
-        nodes_sorted = nx.topological_sort(g)
-        return [n for n in nodes_sorted if n in ancestors]
-
-    def compute(self, name, raise_exceptions=False):
+        targets = as_iterable(name)
+        nodes = set(targets)
+        to_visit = list(nodes)
+        while to_visit:
+            n = to_visit.pop()
+            for n1 in self.dag.predecessors(n):
+                if n1 in nodes:
+                    continue
+                state = self.dag.node[n1][NodeAttributes.STATE]
+                if state == States.UPTODATE or state == States.PINNED:
+                    continue
+                if state == States.UNINITIALIZED and len(self.dag.pred[n1]) == 0:
+                    raise Exception("Cannot compute {} because {} uninitialized".format(name, n1))
+                if state == States.PLACEHOLDER:
+                    raise Exception("Cannot compute {} because {} is placeholder".format(name, n1))
+                nodes.add(n1)
+                to_visit.append(n1)
+        return topological_sort_subset(self.dag, nodes)
+
+    def _plan(self, name):
+        hooks = self._hooks
+        if hooks:
+            plan_t = perf_counter()
+        calc_nodes = self._get_calc_nodes(name)
+        if hooks:
+            end_plan_t = perf_counter()
+            for hook in hooks:
+                hook.on_plan(name, calc_nodes, plan_t, end_plan_t)
+        return calc_nodes
+
+    @_writer
+    def compute(self, name, raise_exceptions=False, release=None, timeout=None, cancel_token=None):
         """
         Compute a node and all necessary predecessors
 
@@ -635,31 +1750,108 @@ class Computation(object):
 
         If any nodes raises an exception, then the state of that node will be set to ERROR, and its value set to an object containing the exception object, as well as a traceback. This will not halt the computation, which will proceed as far as it can, until no more nodes that would be required to calculate the target are COMPUTABLE.
 
+        Setting ``release`` computes in a streaming mode, to bound peak memory use. Once every node that consumes an intermediate node's value has been calculated, that value is released, unless the node is one of the targets. With ``release='drop'``, released values are evicted, and recalculated if they are needed again. With ``release='spill'``, they are written to a temporary file on local disk, and read back if they are needed again.
+
+        If ``timeout`` passes, or ``cancel_token`` is cancelled, before the computation finishes, no further nodes are submitted, nodes submitted but not yet started are cancelled, and a ``DeadlineExceededException`` or ``ComputationCancelledException`` is raised. Its ``completed`` attribute lists the nodes calculated, and ``remaining`` lists the nodes still to calculate, which keep their COMPUTABLE or STALE state, so a later call to ``compute`` resumes from where this one stopped. Calculations that had already started are left to finish, but their results are discarded.
+
         :param name: Name of the node to compute
         :param raise_exceptions: Whether to pass exceptions raised by node computations back to the caller
         :type raise_exceptions: Boolean, default False
-        """
-
-        if isinstance(name, (types.GeneratorType, list)):
-            calc_nodes = set()
-            for name0 in name:
-                for n in self._get_calc_nodes(name0):
-                    calc_nodes.add(n)
-        else:
-            calc_nodes = self._get_calc_nodes(name)
-        self._compute_nodes(calc_nodes, raise_exceptions=raise_exceptions)
-
-    def compute_all(self, raise_exceptions=False):
+        :param release: ``'drop'`` or ``'spill'`` to release the values of intermediate nodes once they are no longer needed
+        :type release: string, default None
+        :param timeout: Maximum time for the computation, in seconds
+        :type timeout: float, default None
+        :param cancel_token: Token that can be used, from another thread, to cancel the computation
+        :type cancel_token: CancellationToken, default None
+        """
+        deadline = None if timeout is None else perf_counter() + timeout
+        if isinstance(name, types.GeneratorType):
+            name = list(name)
+
+        calc_nodes = self._plan(name)
+        self._compute_nodes(calc_nodes, raise_exceptions=raise_exceptions, targets=name, release=release,
+                            deadline=deadline, cancel_token=cancel_token)
+
+    @_writer
+    def compute_all(self, raise_exceptions=False, release=None, timeout=None, cancel_token=None):
         """Compute all nodes of a computation that can be computed
 
         Nodes that are already UPTODATE will not be recalculated. Following the computation, if successful, all nodes will have state UPTODATE, except UNINITIALIZED input nodes and PLACEHOLDER nodes.
 
         If any nodes raises an exception, then the state of that node will be set to ERROR, and its value set to an object containing the exception object, as well as a traceback. This will not halt the computation, which will proceed as far as it can, until no more nodes are COMPUTABLE.
 
+        If ``release`` is set, the values of intermediate nodes are released once they are no longer needed, as described for ``compute``. Nodes without successors are kept. ``timeout`` and ``cancel_token`` stop the computation early, as described for ``compute``.
+
         :param raise_exceptions: Whether to pass exceptions raised by node computations back to the caller
         :type raise_exceptions: Boolean, default False
+        :param release: ``'drop'`` or ``'spill'`` to release the values of intermediate nodes once they are no longer needed
+        :type release: string, default None
+        :param timeout: Maximum time for the computation, in seconds
+        :type timeout: float, default None
+        :param cancel_token: Token that can be used, from another thread, to cancel the computation
+        :type cancel_token: CancellationToken, default None
         """
-        self._compute_nodes(self.nodes(), raise_exceptions=raise_exceptions)
+        deadline = None if timeout is None else perf_counter() + timeout
+        self._compute_nodes(self.nodes(), raise_exceptions=raise_exceptions, release=release, deadline=deadline,
+                            cancel_token=cancel_token)
+
+    def compute_iter(self, name=None, raise_exceptions=False, priority=None, max_in_flight=None, release=None,
+                     timeout=None, cancel_token=None):
+        """
+        Compute a node or nodes and all necessary predecessors, or all nodes, yielding each node as soon as it is calculated
+
+        The computation proceeds as the returned iterator is consumed. Each time a node is calculated and its new state is propagated, the iterator yields a tuple ``(name, NodeData)``, with the node's state, UPTODATE or ERROR, and its value, before waiting for further nodes. Nodes that are ready to calculate are submitted to executors before each node is yielded, so that they progress while the caller uses the result.
+
+        ``priority`` lists nodes to calculate first, for example the nodes currently being displayed. Ready nodes needed by earlier entries in the list are submitted first, followed by those needed by later entries, and then other nodes. ``max_in_flight`` limits how many nodes are submitted to executors at once, so that later, higher priority, nodes do not wait behind a queue of lower priority ones.
+
+        If the iterator is closed before the computation finishes, for example by breaking out of a ``for`` loop, nodes that were submitted to executors but have not started are cancelled, and closing waits for nodes already being calculated, whose results are kept. Nodes not yet calculated keep their COMPUTABLE or STALE states, as with a cancelled computation.
+
+        The computation's writer lock, described in ``enable_snapshots``, is held while the computation proceeds, and released each time a node is yielded, so other threads can read values while the caller handles the node, and an iterator that is abandoned without being closed does not block them. Nodes being computed should not be changed, or deleted, until iteration finishes.
+
+        ::
+
+            >>> for name, node_data in comp.compute_iter(['chart1', 'chart2'], priority='chart2'):
+            ...     refresh(name, node_data.value)
+
+        :param name: Name or names of nodes to compute. By default, all nodes are computed, as with ``compute_all``.
+        :param raise_exceptions: Whether to pass exceptions raised by node computations back to the caller
+        :type raise_exceptions: Boolean, default False
+        :param priority: Name or names of nodes to calculate first, most important first
+        :param max_in_flight: Maximum number of nodes submitted to executors at once
+        :type max_in_flight: int, default None
+        :param release: ``'drop'`` or ``'spill'`` to release the values of intermediate nodes once they are no longer needed
+        :type release: string, default None
+        :param timeout: Maximum time for the computation, in seconds
+        :type timeout: float, default None
+        :param cancel_token: Token that can be used, from another thread, to cancel the computation
+        :type cancel_token: CancellationToken, default None
+        :return: Iterator of tuples ``(name, NodeData)``
+        """
+        deadline = None if timeout is None else perf_counter() + timeout
+        with self._write_lock:
+            self._write_depth += 1
+            try:
+                if name is None:
+                    names = self.nodes()
+                else:
+                    if isinstance(name, types.GeneratorType):
+                        name = list(name)
+                    names = self._plan(name)
+                for n in self._iter_compute_nodes(names, raise_exceptions, name, release, deadline, cancel_token,
+                                                  priority, max_in_flight):
+                    node = self.dag.node[n]
+                    node_data = NodeData(node[NodeAttributes.STATE], self._get_value(n))
+                    self._end_write()
+                    self._write_lock.release()
+                    try:
+                        yield n, node_data
+                    finally:
+                        self._write_lock.acquire()
+                        self._write_depth += 1
+            finally:
+                if self._subscriptions:
+                    self.publish_changes()
+                self._end_write()
 
     def nodes(self):
         """
@@ -690,7 +1882,7 @@ class Computation(object):
         return apply1(self._state_one, name)
 
     def _value_one(self, name):
-        return self.dag.node[name][NodeAttributes.VALUE]
+        return self._get_value(name)
 
     def value(self, name):
         """
@@ -705,10 +1897,15 @@ class Computation(object):
             >>> comp.v.foo
             1
 
+        If the node's value was evicted under a memory budget, it is recalculated from the node's inputs. If its inputs have changed since, so that the node is no longer UPTODATE, its old value cannot be recalculated, and a ``ComputationException`` is raised.
+
+        As getting a value may recalculate or load it, this waits for any method changing the computation in another thread, such as ``compute``, to finish. To read values from other threads without waiting, use ``snapshot``.
+
         :param name: Name or names of the node to get the value of
         :type name: Key or [Keys]
         """
-        return apply1(self._value_one, name)
+        with self._write_lock:
+            return apply1(self._value_one, name)
 
     def _tag_one(self, name):
         node = self.dag.node[name]
@@ -743,15 +1940,18 @@ class Computation(object):
 
     def _get_item_one(self, name):
         node = self.dag.node[name]
-        return NodeData(node[NodeAttributes.STATE], node[NodeAttributes.VALUE])
+        return NodeData(node[NodeAttributes.STATE], self._get_value(name))
 
     def __getitem__(self, name):
         """
         Get the state and current value of a node
 
+        As for ``value``, this waits for any method changing the computation in another thread to finish.
+
         :param name: Name of the node to get the state and value of
         """
-        return apply1(self._get_item_one, name)
+        with self._write_lock:
+            return apply1(self._get_item_one, name)
 
     def _get_timing_one(self, name):
         node = self.dag.node[name]
@@ -760,15 +1960,83 @@ class Computation(object):
     def get_timing(self, name):
         """
         Get the timing information for a node
-        
+
+        Timing information contains the times a node's most recent calculation was submitted to an executor, started and ended, from the high-resolution monotonic clock ``loman.compat.perf_counter``, as well as its duration, the time it waited in the executor's queue, the ``(process id, thread id)`` of the worker that calculated it, and the name of the executor.
+
         :param name: Name or names of the node to get the timing information of
         :return: 
         """
         return apply1(self._get_timing_one, name)
 
+    def get_executor_utilization(self, names=None):
+        """
+        Summarize how busy each executor was, from the timing data of the most recent calculation of each node
+
+        The summary for each executor contains the number of nodes it calculated, the number of workers it has (or that were seen calculating nodes, if the executor does not report its size), the total time workers spent calculating nodes, the total time nodes spent queued waiting for a worker, the time span from the first submission to the last completion, and the fraction of the available worker time in that span that was spent calculating.
+
+        A high utilization with long queue waits suggests that more workers are needed. A low utilization with long queue waits suggests that nodes are waiting on each other.
+
+        :param names: Nodes to include. By default, all nodes with timing data are included.
+        :return: Dictionary from executor name (``None`` for the default executor) to ``ExecutorUtilization``
+        """
+        if names is None:
+            names = self.dag.nodes()
+        timings_by_executor = defaultdict(list)
+        for name in names:
+            timing = self.dag.node[name].get(NodeAttributes.TIMING)
+            if timing is not None:
+                timings_by_executor[timing.executor].append(timing)
+        result = {}
+        for executor_name, timings in six.iteritems(timings_by_executor):
+            executor = self.default_executor if executor_name is None else self.executor_map.get(executor_name)
+            workers = getattr(executor, '_max_workers', None) or len(set(timing.worker for timing in timings))
+            busy = sum(timing.duration for timing in timings)
+            queue_wait = sum(timing.queue_wait for timing in timings)
+            span = max(timing.end for timing in timings) - min(timing.submit for timing in timings)
+            utilization = busy / (span * workers) if span > 0 else 0.0
+            result[executor_name] = ExecutorUtilization(len(timings), workers, busy, queue_wait, span, utilization)
+        return result
+
+    def _get_profile_one(self, name):
+        node = self.dag.node[name]
+        return node.get(NodeAttributes.PROFILE, None)
+
+    def get_profile(self, name):
+        """
+        Get the profile data accumulated over every calculation of a node
+
+        The profile data contains the number of times the node has been calculated, the total, min, max and last duration of its own calculation, and the time taken by the critical path of calculations leading to it.
+
+        :param name: Name or names of the node to get the profile data of
+        :rtype: ProfileData
+        """
+        return apply1(self._get_profile_one, name)
+
+    def reset_profile(self):
+        """
+        Clear profile data accumulated for all nodes
+        """
+        for name in self.dag.nodes():
+            self.dag.node[name].pop(NodeAttributes.PROFILE, None)
+
+    def write_flamegraph(self, file_):
+        """
+        Write accumulated profile data in the "folded stacks" text format used by flame graph tools
+
+        Each node is shown under the critical path of calculations leading to it, with a width equal to the total time spent calculating that node itself.
+
+        :param file_: If string, writes to a file
+        :type file_: File-like object, or string
+        """
+        if isinstance(file_, six.string_types):
+            with open(file_, 'w') as f:
+                write_folded_stacks(self.dag, f)
+        else:
+            write_folded_stacks(self.dag, file_)
+
     def to_df(self):
         """
-        Get a dataframe containing the states and value of all nodes of computation
+        Get a dataframe containing the states, values, estimated sizes, residency and timing of all nodes of computation
 
         ::
 
@@ -780,9 +2048,12 @@ class Computation(object):
             bar  States.UPTODATE      2           NaN
             foo  States.UPTODATE      1           NaN
         """
+        import pandas as pd
         df = pd.DataFrame(index=nx.topological_sort(self.dag))
         df[NodeAttributes.STATE] = pd.Series(nx.get_node_attributes(self.dag, NodeAttributes.STATE))
         df[NodeAttributes.VALUE] = pd.Series(nx.get_node_attributes(self.dag, NodeAttributes.VALUE))
+        df[NodeAttributes.SIZE] = [self._get_size_one(name) for name in df.index]
+        df['residency'] = [self._get_residency_one(name) for name in df.index]
         df_timing = pd.DataFrame.from_dict(nx.get_node_attributes(self.dag, 'timing'), orient='index')
         df = pd.merge(df, df_timing, left_index=True, right_index=True, how='left')
         return df
@@ -798,8 +2069,13 @@ class Computation(object):
             >>> comp.add_node('bar', value=2)
             >>> comp.to_dict()
             {'bar': 2, 'foo': 1}
+
+        Nodes whose values were evicted under a memory budget, and cannot be recalculated because their inputs have since changed, are left out. As for ``value``, this waits for any method changing the computation in another thread to finish.
         """
-        return nx.get_node_attributes(self.dag, NodeAttributes.VALUE)
+        with self._write_lock:
+            values = nx.get_node_attributes(self.dag, NodeAttributes.VALUE)
+            return {name: self._get_value(name) for name, value in six.iteritems(values)
+                    if value is not EVICTED or self._is_restorable(name)}
 
     def _get_inputs_one(self, name):
         args_dict = {}
@@ -853,6 +2129,7 @@ class Computation(object):
             nodes = self.get_ancestors(names)
         return [n for n in nodes if self.dag.node[n].get(NodeAttributes.FUNC) is None]
 
+    @_writer
     def restrict(self, output_nodes, input_nodes=None):
         """
         Restrict a computation to the ancestors of a set of output nodes, excluding ancestors of a set of input nodes
@@ -869,12 +2146,17 @@ class Computation(object):
                 self.add_node(n)
                 self._set_state_and_value(n, state, value)
         nodes = self.get_ancestors(output_nodes)
-        self.dag.remove_nodes_from([n for n in self.dag if n not in nodes])
+        removed = [n for n in self.dag if n not in nodes]
+        self.dag.remove_nodes_from(removed)
+        if self._dirty is not None:
+            self._dirty.update((n, None) for n in removed)
 
     def write_dill(self, file_):
         """
         Serialize a computation to a file or file-like object
 
+        Executors are not serialized. A deserialized computation uses a default ``ThreadPoolExecutor`` with a single worker, and an empty executor map.
+
         :param file_: If string, writes to a file
         :type file_: File-like object, or string
         """
@@ -887,6 +2169,7 @@ class Computation(object):
                 if SystemTags.SERIALIZE not in tags:
                     obj._set_uninitialized(name)
 
+        import dill
         if isinstance(file_, six.string_types):
             with open(file_, 'wb') as f:
                 dill.dump(obj, f)
@@ -901,12 +2184,39 @@ class Computation(object):
         :param file_: If string, writes to a file
         :type file_: File-like object, or string
         """
+        import dill
         if isinstance(file_, six.string_types):
             with open(file_, 'rb') as f:
                 return dill.load(f)
         else:
             return dill.load(file_)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['default_executor']
+        del state['executor_map']
+        del state['_shared_values']
+        del state['_write_lock']
+        del state['_publish_lock']
+        state['sources'] = OrderedDict()
+        state['_subscriptions'] = []
+        state['_changes'] = None
+        state['_write_depth'] = 0
+        state['_dirty'] = None
+        state['_records'] = {}
+        state['_records_shared'] = False
+        state['_pool_orphans'] = {}
+        state['_disk_store'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.default_executor = ThreadPoolExecutor(1)
+        self.executor_map = {}
+        self._shared_values = {}
+        self._write_lock = threading.RLock()
+        self._publish_lock = threading.Lock()
+
     def copy(self):
         """
         Create a copy of a computation
@@ -916,8 +2226,8 @@ class Computation(object):
         :rtype: Computation
         """
         obj = Computation()
-        obj.dag = nx.DiGraph(self.dag)
-        obj._tag_map = {tag: nodes.copy() for tag, nodes in six.iteritems(self._tag_map)}
+        obj.dag = _copy_dag(self.dag)
+        obj._tag_map = defaultdict(set, {tag: nodes.copy() for tag, nodes in six.iteritems(self._tag_map)})
         obj._state_map = {state: nodes.copy() for state, nodes in six.iteritems(self._state_map)}
         return obj
 
@@ -986,31 +2296,90 @@ class Computation(object):
     def _repr_svg_(self):
         return self.to_pydot().create_svg().decode('utf-8')
 
-    def to_pydot(self, colors='state', cmap=None, graph_attr=None, node_attr=None, edge_attr=None, show_expansion=False):
-        struct_dag = nx.DiGraph(self.dag)
+    def _get_viz_nodes(self, nodes=None, depth=None, states=None, tags=None):
+        selections = []
+        if nodes is not None:
+            selections.append(get_neighbourhood(self.dag, nodes, depth))
+        if states is not None:
+            selections.append(set().union(*[self._state_map[state] for state in as_iterable(states)]))
+        if tags is not None:
+            selections.append(self.nodes_by_tag(tags))
+        if not selections:
+            return None
+        selections.sort(key=len)
+        return selections[0].intersection(*selections[1:])
+
+    def _create_viz_dag(self, colors='state', cmap=None, show_expansion=False, collapse_groups=False, nodes=None,
+                        depth=None, states=None, tags=None):
+        viz_nodes = self._get_viz_nodes(nodes, depth, states, tags)
+        if viz_nodes is None:
+            struct_dag = nx.DiGraph(self.dag)
+        else:
+            struct_dag = nx.DiGraph(self.dag.subgraph(viz_nodes))
         if not show_expansion:
-            hide_nodes = set(struct_dag.nodes())
-            for name1, name2 in struct_dag.edges():
-                if not show_expansion and SystemTags.EXPANSION in self.tags(name2):
-                    continue
-                hide_nodes.discard(name1)
-                hide_nodes.discard(name2)
+            expansion_nodes = {n for n in self.nodes_by_tag(SystemTags.EXPANSION) if n in struct_dag}
+            hide_nodes = {n for n in expansion_nodes
+                          if all(n1 in expansion_nodes for n1 in struct_dag.successors(n))}
             contract_node(struct_dag, hide_nodes)
-        viz_dag = create_viz_dag(struct_dag, colors=colors, cmap=cmap)
+        if collapse_groups:
+            if colors != 'state':
+                raise ValueError('collapse_groups is only supported with colors="state"')
+            return create_group_viz_dag(struct_dag, cmap=cmap)
+        # Colors are scaled to the nodes shown
+        return create_viz_dag(struct_dag, colors=colors, cmap=cmap)
+
+    def to_pydot(self, colors='state', cmap=None, graph_attr=None, node_attr=None, edge_attr=None, show_expansion=False,
+                 collapse_groups=False, nodes=None, depth=None, states=None, tags=None):
+        viz_dag = self._create_viz_dag(colors, cmap, show_expansion, collapse_groups, nodes, depth, states, tags)
         viz_dot = to_pydot(viz_dag, graph_attr, node_attr, edge_attr)
         return viz_dot
 
-    def draw(self, colors='state', cmap=None, graph_attr=None, node_attr=None, edge_attr=None, show_expansion=False):
+    def to_dot(self, colors='state', cmap=None, graph_attr=None, node_attr=None, edge_attr=None, show_expansion=False,
+               collapse_groups=False, nodes=None, depth=None, states=None, tags=None):
+        """
+        Get GraphViz DOT text for a computation's current state
+
+        This takes the same parameters as ``draw``, but writes DOT text directly, rather than building a pydotplus object, so is much faster for large graphs.
+
+        :rtype: str
+        """
+        viz_dag = self._create_viz_dag(colors, cmap, show_expansion, collapse_groups, nodes, depth, states, tags)
+        return to_dot(viz_dag, graph_attr, node_attr, edge_attr)
+
+    def write_dot(self, file_, colors='state', cmap=None, graph_attr=None, node_attr=None, edge_attr=None,
+                  show_expansion=False, collapse_groups=False, nodes=None, depth=None, states=None, tags=None):
+        """
+        Write GraphViz DOT text for a computation's current state to a file or file-like object
+
+        :param file_: If string, writes to a file
+        :type file_: File-like object, or string
+        """
+        viz_dag = self._create_viz_dag(colors, cmap, show_expansion, collapse_groups, nodes, depth, states, tags)
+        if isinstance(file_, six.string_types):
+            with open(file_, 'w') as f:
+                write_dot(viz_dag, f, graph_attr, node_attr, edge_attr)
+        else:
+            write_dot(viz_dag, file_, graph_attr, node_attr, edge_attr)
+
+    def draw(self, colors='state', cmap=None, graph_attr=None, node_attr=None, edge_attr=None, show_expansion=False,
+             collapse_groups=False, nodes=None, depth=None, states=None, tags=None):
         """
         Draw a computation's current state using the GraphViz utility
 
+        :param colors: ``'state'`` to color nodes by state, ``'timing'`` to color nodes by the duration of their last calculation, or ``'profile'`` to color and label nodes with profile data accumulated over all their calculations
         :param graph_attr: Mapping of (attribute, value) pairs for the graph. For example ``graph_attr={'size': '"10,8"'}`` can control the size of the output graph
         :param node_attr: Mapping of (attribute, value) pairs set for all nodes.
         :param edge_attr: Mapping of (attribute, value) pairs set for all edges.
         :param show_expansion: Whether to show expansion nodes (i.e. named tuple expansion nodes) if they are not referenced by other nodes
+        :param collapse_groups: Whether to show each group as a single node, labelled with the number of nodes in each state. This is useful for very large graphs.
+        :param nodes: If given, only show these nodes, together with their ancestors and descendants up to ``depth``
+        :param depth: Maximum number of edges from ``nodes`` to show. By default, there is no limit.
+        :param states: If given, only show nodes in these states
+        :param tags: If given, only show nodes with these tags
         """
         d = self.to_pydot(colors=colors, cmap=cmap, graph_attr=graph_attr, node_attr=node_attr, edge_attr=edge_attr,
-                          show_expansion=show_expansion)
+                          show_expansion=show_expansion, collapse_groups=collapse_groups, nodes=nodes, depth=depth,
+                          states=states, tags=tags)
 
         def repr_svg(self):
             return self.create_svg().decode('utf-8')
@@ -21,7 +21,15 @@ class NodeAttributes(object):
     ARGS = 'args'
     KWDS = 'kwds'
     TIMING = 'timing'
+    PROFILE = 'profile'
+    SIZE = 'size'
     EXECUTOR = 'executor'
+    UPDATE = 'update'
+    APPENDS = 'appends'
+    VERSION = 'version'
+    DELTAS = 'deltas'
+    INPUT_VERSIONS = 'input_versions'
+    EVICTED_INPUT_VERSIONS = 'evicted_input_versions'
 
 
 class EdgeAttributes(object):
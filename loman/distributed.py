@@ -0,0 +1,344 @@
+import collections
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future
+from multiprocessing.connection import Client, Listener
+
+import dill
+import networkx as nx
+import six
+
+from .computeengine import ComputationException, _eval_node
+from .consts import NodeAttributes, SystemTags
+from .store import DeferredValue, _identity
+
+
+class WorkerException(ComputationException):
+    pass
+
+
+class RemoteValue(DeferredValue):
+    """
+    Marker stored in place of a node's value when the value is held by a worker process of a ``LocalProcessCluster``
+
+    Workers fetch values from each other directly when they need them. Outside the workers, the value is fetched when it is used. When the marker is garbage collected, the worker holding the value is told to release it. When pickled, the marker is replaced by the value it refers to.
+    """
+    residency = 'remote'
+
+    def __init__(self, worker, key):
+        self.worker = worker
+        self.key = key
+
+    def load(self):
+        return _fetch(self.worker.address, self.worker.authkey, self.key)
+
+    def __reduce__(self):
+        return _identity, (self.load(),)
+
+    def __del__(self):
+        try:
+            self.worker.release(self.key)
+        except Exception:
+            pass
+
+    def __repr__(self):
+        return '<remote value {} in worker {}>'.format(self.key, self.worker.index)
+
+
+def _fetch(address, authkey, key):
+    conn = Client(address, authkey=authkey)
+    try:
+        conn.send(key)
+        found, value = dill.loads(conn.recv_bytes())
+    finally:
+        conn.close()
+    if not found:
+        raise WorkerException('Value {} is not held by worker at {}'.format(key, address))
+    return value
+
+
+class _TaskPickler(dill.Pickler):
+    def persistent_id(self, obj):
+        if isinstance(obj, RemoteValue):
+            return obj.worker.address, obj.key
+        return None
+
+
+class _TaskUnpickler(dill.Unpickler):
+    def __init__(self, file_, state):
+        dill.Unpickler.__init__(self, file_)
+        self.state = state
+
+    def persistent_load(self, pid):
+        address, key = pid
+        if address == self.state.address:
+            return self.state.values[key]
+        return _fetch(address, self.state.authkey, key)
+
+
+class _WorkerState(object):
+    def __init__(self, authkey):
+        self.authkey = authkey
+        self.values = {}
+        self.listener = Listener(('127.0.0.1', 0), authkey=authkey)
+        self.address = self.listener.address
+
+    def serve(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except multiprocessing.AuthenticationError:
+                continue
+            except (EOFError, OSError):
+                break
+            t = threading.Thread(target=self._serve_one, args=(conn,))
+            t.daemon = True
+            t.start()
+
+    def _serve_one(self, conn):
+        try:
+            key = conn.recv()
+            if key in self.values:
+                conn.send_bytes(dill.dumps((True, self.values[key])))
+            else:
+                conn.send_bytes(dill.dumps((False, None)))
+        finally:
+            conn.close()
+
+
+def _worker_main(conn, authkey):
+    state = _WorkerState(authkey)
+    t = threading.Thread(target=state.serve)
+    t.daemon = True
+    t.start()
+    conn.send(state.address)
+    while True:
+        try:
+            task_id, keep, releases, payload = dill.loads(conn.recv_bytes())
+        except EOFError:
+            break
+        for key in releases:
+            state.values.pop(key, None)
+        if payload is None:
+            break
+        try:
+            fn, args, kwds = _TaskUnpickler(six.BytesIO(payload), state).load()
+            result = fn(*args, **kwds)
+            kept = keep and result[1] is None
+            if kept:
+                state.values[task_id] = result[0]
+                result = (None,) + tuple(result[1:])
+            reply = task_id, True, kept, result
+        except Exception as e:
+            reply = task_id, False, False, e
+        try:
+            data = dill.dumps(reply)
+        except Exception as e:
+            error = WorkerException('Unable to send result of task {}: {!r}'.format(task_id, e))
+            data = dill.dumps((task_id, False, False, error))
+        conn.send_bytes(data)
+    state.listener.close()
+
+
+class _Worker(object):
+    def __init__(self, index, process, conn, address, authkey):
+        self.index = index
+        self.process = process
+        self.address = address
+        self.authkey = authkey
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._futures = {}
+        self._releases = collections.deque()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read)
+        self._reader.daemon = True
+        self._reader.start()
+
+    def release(self, key):
+        self._releases.append(key)
+
+    def _pop_releases(self):
+        releases = []
+        while True:
+            try:
+                releases.append(self._releases.popleft())
+            except IndexError:
+                return releases
+
+    def submit(self, fn, args, kwds, keep):
+        f = six.BytesIO()
+        _TaskPickler(f).dump((fn, args, kwds))
+        fut = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            task_id = next(self._ids)
+            self._futures[task_id] = fut
+            self._conn.send_bytes(dill.dumps((task_id, keep, self._pop_releases(), f.getvalue())))
+        return fut
+
+    def _read(self):
+        while True:
+            try:
+                task_id, ok, kept, result = dill.loads(self._conn.recv_bytes())
+            except (EOFError, OSError):
+                break
+            fut = self._futures.pop(task_id)
+            if not ok:
+                fut.set_exception(result)
+                continue
+            if kept:
+                result = (RemoteValue(self, task_id),) + tuple(result[1:])
+            fut.set_result(result)
+        for fut in list(self._futures.values()):
+            fut.set_exception(WorkerException('Worker {} exited'.format(self.index)))
+        self._futures.clear()
+
+    def close(self, timeout=None):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._conn.send_bytes(dill.dumps((None, False, self._pop_releases(), None)))
+            except (EOFError, OSError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self._reader.join()
+        self._conn.close()
+
+
+class WorkerExecutor(Executor):
+    """
+    Executor that runs tasks in one worker process of a ``LocalProcessCluster``
+
+    Values of nodes calculated by the worker are kept in the worker, and the computation holds a ``RemoteValue`` in their place. Functions and arguments are serialized with dill.
+    """
+    accepts_remote_values = True
+    accepts_shared_memory = True
+
+    def __init__(self, worker):
+        self._worker = worker
+
+    @property
+    def pid(self):
+        return self._worker.process.pid
+
+    def submit(self, fn, *args, **kwargs):
+        return self._worker.submit(fn, args, kwargs, fn is _eval_node)
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class LocalProcessCluster(object):
+    """
+    A set of worker processes on the local host, for calculating nodes of a computation
+
+    Each worker has an executor in ``executor_map``, named ``'<prefix>-<index>'``. Nodes can be assigned to workers directly, with ``Computation.set_executor``, or by group or tag, with ``assign``. The value of a node calculated by a worker stays in that worker. It is sent directly to other workers calculating nodes that depend on it, and to the computation only when it is used there, for example by ``value`` or by a node that is calculated locally.
+
+    Workers exit when the cluster is closed, or when it is used as a context manager and the context exits::
+
+        >>> with LocalProcessCluster(2) as cluster:
+        ...     comp = Computation()
+        ...     comp.add_node('a', value=1)
+        ...     comp.add_node('b', lambda a: a + 1, group='g1')
+        ...     comp.add_node('c', lambda b: b + 1, group='g2')
+        ...     cluster.assign(comp, by='group')
+        ...     comp.compute_all()
+        ...     comp.v.c
+        3
+
+    :param n_workers: Number of worker processes. By default, the number of CPUs.
+    :param prefix: Prefix of executor names
+    :param context: Name of the multiprocessing start method to use. By default, the platform default is used.
+    """
+    def __init__(self, n_workers=None, prefix='worker', context=None):
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        ctx = multiprocessing if context is None else multiprocessing.get_context(context)
+        authkey = os.urandom(16)
+        self.prefix = prefix
+        self._workers = []
+        for i in range(n_workers):
+            conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker_main, args=(child_conn, authkey))
+            process.daemon = True
+            process.start()
+            child_conn.close()
+            address = conn.recv()
+            self._workers.append(_Worker(i, process, conn, address, authkey))
+        self.executor_map = collections.OrderedDict((self.executor_name(i), WorkerExecutor(worker))
+                                                    for i, worker in enumerate(self._workers))
+
+    def __len__(self):
+        return len(self._workers)
+
+    def executor_name(self, index):
+        """
+        Get the name of the executor of a worker
+
+        :param index: Index of the worker
+        """
+        return '{}-{}'.format(self.prefix, index)
+
+    def assign(self, comp, by='group', mapping=None):
+        """
+        Assign nodes of a computation to workers, by group or tag
+
+        The cluster's executors are added to the computation's ``executor_map``. Nodes with the same group, or tag, are assigned to the same worker, so that values passed between them stay in that worker. Nodes without a group, or tags, are not changed. A node with several tags is assigned by the first of its tags, in sorted order, that is in ``mapping``.
+
+        :param comp: Computation to assign nodes of
+        :param by: ``'group'`` or ``'tag'``
+        :param mapping: Dictionary from group or tag names to worker indices. By default, groups or tags are assigned to workers in turn, in the order they are first found in a topological sort of the computation.
+        :type mapping: Dictionary, default None
+        """
+        if by == 'group':
+            def get_keys(name):
+                group = comp.dag.node[name].get(NodeAttributes.GROUP)
+                return [] if group is None else [group]
+        elif by == 'tag':
+            system_tags = {SystemTags.SERIALIZE, SystemTags.EXPANSION}
+
+            def get_keys(name):
+                return sorted(tag for tag in comp.dag.node[name][NodeAttributes.TAG] if tag not in system_tags)
+        else:
+            raise ValueError('{} is not a valid loman assignment'.format(by))
+
+        comp.executor_map.update(self.executor_map)
+        if mapping is None:
+            mapping = {}
+            indices = itertools.cycle(range(len(self._workers)))
+            for name in nx.topological_sort(comp.dag):
+                for key in get_keys(name):
+                    if key not in mapping:
+                        mapping[key] = next(indices)
+        for name in comp.dag.nodes():
+            for key in get_keys(name):
+                if key in mapping:
+                    comp.set_executor(name, self.executor_name(mapping[key]))
+                    break
+
+    def close(self, timeout=None):
+        """
+        Stop the worker processes
+
+        Values held by the workers are lost, and nodes whose values they held can no longer be used.
+
+        :param timeout: Time in seconds to wait for each worker to exit before terminating it
+        """
+        for worker in self._workers:
+            worker.close(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,159 @@
+"""
+Structured diagnostic events from the compute engine
+
+The engine reports what it is doing, such as adding nodes, inserting values and calculating nodes, as events with a kind and named fields. By default, no sinks are registered, and the engine only checks the module-level ``enabled`` flag before each event, so diagnostics cost nothing else. Events are only created, and messages only formatted, once a sink is added::
+
+    >>> from loman import events
+    >>> sink = events.add_sink(events.LoggingSink())
+    >>> comp.compute_all()
+    >>> events.remove_sink(sink)
+"""
+import json
+import logging
+import threading
+from collections import namedtuple
+
+import six
+
+from .compat import perf_counter
+
+Event = namedtuple('Event', ['kind', 'time', 'fields'])
+
+MESSAGES = {
+    'add_node': 'Adding node {name}',
+    'cycle_detected': 'Adding node {name} created a loop',
+    'delete_node': 'Deleting node {name}',
+    'rename_node': 'Renaming node {old_name} to {new_name}',
+    'insert': 'Inserting value into node {name}',
+    'insert_many': 'Inserting values into nodes {names}',
+    'share_value': 'Sharing value of node {name} in block {block}',
+    'release_shared_value': 'Releasing shared block {block} of node {name}',
+    'load_value': 'Loading {residency} value of node {name}',
+    'restore_value': 'Restoring evicted value of node {name}',
+    'evict': 'Evicting value of node {name}',
+    'spill': 'Spilling value of node {name}',
+    'compute_start': 'Computing nodes {names}',
+    'node_submit': 'Submitting node {name} to executor {executor}',
+    'node_finish': 'Calculated node {name} in {duration}s',
+    'node_error': 'Calculating node {name} raised {error}',
+}
+
+enabled = False
+_sinks = []
+_lock = threading.Lock()
+
+
+def add_sink(sink):
+    """
+    Start sending events to a sink
+
+    :param sink: Object with an ``emit`` method, which is called with each ``Event``
+    :return: The sink, which can be passed to ``remove_sink``
+    """
+    global enabled
+    with _lock:
+        _sinks.append(sink)
+        enabled = True
+    return sink
+
+
+def remove_sink(sink):
+    """
+    Stop sending events to a sink previously passed to ``add_sink``
+    """
+    global enabled
+    with _lock:
+        _sinks.remove(sink)
+        enabled = bool(_sinks)
+
+
+def emit(kind, **fields):
+    """
+    Send an event to all sinks
+
+    Callers on hot paths should check ``enabled`` first, so that the fields are not built when there are no sinks.
+    """
+    event = Event(kind, perf_counter(), fields)
+    for sink in list(_sinks):
+        sink.emit(event)
+
+
+def format_event(event):
+    """
+    Format an event as a human-readable message
+    """
+    template = MESSAGES.get(event.kind)
+    fields = {k: _format_field(v) for k, v in six.iteritems(event.fields)}
+    if template is None:
+        return '{} {}'.format(event.kind, ' '.join('{}={}'.format(k, v) for k, v in sorted(fields.items())))
+    return template.format(**fields)
+
+
+def _format_field(value):
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value)
+    return str(value)
+
+
+class _LazyMessage(object):
+    def __init__(self, event):
+        self.event = event
+
+    def __str__(self):
+        return format_event(self.event)
+
+
+class LoggingSink(object):
+    """
+    Sends events to a ``logging`` logger, formatting messages only if the logger handles them
+
+    :param logger: Logger, or name of logger, to send events to
+    :type logger: default ``'loman.computeengine'``
+    :param level: Level to log events at
+    :type level: int, default ``logging.DEBUG``
+    """
+    def __init__(self, logger='loman.computeengine', level=logging.DEBUG):
+        if isinstance(logger, six.string_types):
+            logger = logging.getLogger(logger)
+        self.logger = logger
+        self.level = level
+
+    def emit(self, event):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, '%s', _LazyMessage(event))
+
+
+class JsonLinesSink(object):
+    """
+    Writes events to a file as JSON, one event per line, with the fields ``event`` and ``time``, followed by the event's own fields
+
+    Values that cannot be represented in JSON, such as node names that are objects, are written as strings.
+
+    :param file_: File-like object, or name of file to write to
+    """
+    def __init__(self, file_):
+        if isinstance(file_, six.string_types):
+            file_ = open(file_, 'a')
+        self.file = file_
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        record = {'event': event.kind, 'time': event.time}
+        record.update(event.fields)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.file.write(line + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class RecordingSink(object):
+    """
+    Keeps events in a list, for example to inspect in tests
+    """
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
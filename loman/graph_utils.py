@@ -1,6 +1,6 @@
-import functools
+import networkx as nx
 
-from loman.util import apply_n
+from loman.util import as_iterable
 
 
 def contract_node_one(g, n):
@@ -11,4 +11,92 @@ def contract_node_one(g, n):
 
 
 def contract_node(g, ns):
-    apply_n(functools.partial(contract_node_one, g), ns)
\ No newline at end of file
+    """
+    Remove nodes from a DAG, connecting each remaining predecessor to each remaining successor reachable through removed nodes
+
+    All nodes are contracted in a single pass, visiting removed nodes in reverse topological order, so the cost is linear in the size of the graph plus the number of edges added, rather than repeatedly rewiring the graph for each removed node.
+
+    :param g: DAG to modify in place
+    :param ns: Node or nodes to remove
+    """
+    ns = set(as_iterable(ns))
+    reachable = {}
+    for n in reversed(list(nx.topological_sort(g.subgraph(ns)))):
+        targets = set()
+        for s in g.successors(n):
+            if s in ns:
+                targets.update(reachable[s])
+            else:
+                targets.add(s)
+        reachable[n] = targets
+    new_edges = []
+    for n in ns:
+        for p in g.predecessors(n):
+            if p not in ns:
+                new_edges.extend((p, s) for s in reachable[n])
+    g.remove_nodes_from(ns)
+    g.add_edges_from(new_edges)
+
+
+def _bfs(get_neighbours, nodes, depth):
+    visited = set(nodes)
+    frontier = list(visited)
+    level = 0
+    while frontier and (depth is None or level < depth):
+        next_frontier = []
+        for n in frontier:
+            for n1 in get_neighbours(n):
+                if n1 not in visited:
+                    visited.add(n1)
+                    next_frontier.append(n1)
+        frontier = next_frontier
+        level += 1
+    return visited
+
+
+def get_neighbourhood(g, nodes, depth=None, ancestors=True, descendants=True):
+    """
+    Get a set of nodes, together with their ancestors and descendants up to a given depth
+
+    The cost is proportional to the size of the neighbourhood found, rather than the size of the graph.
+
+    :param g: DAG to search
+    :param nodes: Node or nodes at the center of the neighbourhood
+    :param depth: Maximum number of edges to follow from the center nodes. By default, there is no limit.
+    :param ancestors: Whether to include ancestors
+    :param descendants: Whether to include descendants
+    :rtype: set
+    """
+    nodes = set(as_iterable(nodes))
+    result = set(nodes)
+    if ancestors:
+        result.update(_bfs(g.predecessors, nodes, depth))
+    if descendants:
+        result.update(_bfs(g.successors, nodes, depth))
+    return result
+
+
+def topological_sort_subset(g, nodes):
+    """
+    Sort a subset of the nodes of a DAG topologically
+
+    Only edges between nodes in the subset are followed, so the cost is proportional to the number of edges touching the subset, rather than the size of the graph.
+
+    :param g: DAG containing the nodes
+    :param nodes: Set of nodes to sort
+    :rtype: list
+    """
+    in_degree = {n: sum(1 for p in g.pred[n] if p in nodes) for n in nodes}
+    ready = [n for n, d in in_degree.items() if d == 0]
+    result = []
+    while ready:
+        n = ready.pop()
+        result.append(n)
+        for s in g.succ[n]:
+            if s in in_degree:
+                in_degree[s] -= 1
+                if in_degree[s] == 0:
+                    ready.append(s)
+    if len(result) < len(in_degree):
+        raise nx.NetworkXUnfeasible('Graph contains a cycle')
+    return result
@@ -0,0 +1,73 @@
+import sys
+
+import six
+
+
+class EvictedValue(object):
+    """
+    Marker stored in place of a node's value when it has been evicted to save memory
+
+    A node whose value is evicted keeps its state, and its value is recalculated from its inputs when it is next needed.
+    """
+    def __repr__(self):
+        return '<evicted>'
+
+    def __reduce__(self):
+        return 'EVICTED'
+
+
+EVICTED = EvictedValue()
+
+
+def _numpy_size(obj):
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            return None
+        return sys.getsizeof(obj) if obj.base is None else obj.nbytes + sys.getsizeof(obj)
+    return None
+
+
+def _pandas_size(obj):
+    pd = sys.modules.get('pandas')
+    if pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            return int(obj.memory_usage(deep=True).sum())
+        if isinstance(obj, (pd.Series, pd.Index)):
+            return int(obj.memory_usage(deep=True))
+    return None
+
+
+def estimate_size(obj):
+    """
+    Estimate the memory used by an object, including objects it refers to
+
+    numpy arrays and pandas objects are sized by the memory used by their data. Lists, tuples, sets, dictionaries and the attributes of other objects are followed recursively, and objects referred to more than once are only counted once. The result is an estimate, and may not count memory held by extension types.
+
+    :param obj: Object to estimate the size of
+    :return: Estimated size in bytes
+    :rtype: int
+    """
+    seen = set()
+    total = 0
+    to_visit = [obj]
+    while to_visit:
+        o = to_visit.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size = _numpy_size(o)
+        if size is None:
+            size = _pandas_size(o)
+        if size is not None:
+            total += size
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            to_visit.extend(six.iterkeys(o))
+            to_visit.extend(six.itervalues(o))
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            to_visit.extend(o)
+        elif hasattr(o, '__dict__') and not isinstance(o, type):
+            to_visit.append(o.__dict__)
+    return total
@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+from loman.consts import NodeAttributes
+
+ProfileData = namedtuple('ProfileData', ['count', 'total', 'min', 'max', 'last', 'critical_path', 'critical_pred'])
+ProfileData.__doc__ = """
+Accumulated timing data for a node, over all the times it has been calculated
+
+``total``, ``min``, ``max`` and ``last`` are durations of the node's own calculation (self time) in seconds. ``critical_path`` is the mean self time of the node, plus the largest ``critical_path`` of its predecessors, i.e. the time that the longest chain of calculations ending in this node takes. ``critical_pred`` is the predecessor on that chain, or None.
+"""
+
+
+def update_profile(profile, duration, critical_base=0.0, critical_pred=None):
+    """
+    Add a calculation of a node to its profile data
+
+    :param profile: Existing profile data for the node, or None
+    :type profile: ProfileData
+    :param duration: Time taken to calculate the node, in seconds
+    :param critical_base: Critical path time of the node's slowest predecessor
+    :param critical_pred: Name of the node's slowest predecessor
+    :rtype: ProfileData
+    """
+    if profile is None:
+        count, total, min_, max_ = 1, duration, duration, duration
+    else:
+        count = profile.count + 1
+        total = profile.total + duration
+        min_ = min(profile.min, duration)
+        max_ = max(profile.max, duration)
+    return ProfileData(count, total, min_, max_, duration, critical_base + total / count, critical_pred)
+
+
+def format_duration(seconds):
+    if seconds >= 1.0:
+        return '{:.3g}s'.format(seconds)
+    if seconds >= 1e-3:
+        return '{:.3g}ms'.format(seconds * 1e3)
+    return '{:.3g}us'.format(seconds * 1e6)
+
+
+def _frame_name(name):
+    return str(name).replace(';', ':').replace('\n', ' ')
+
+
+def _critical_stack(dag, name):
+    stack = []
+    seen = set()
+    while name is not None and name not in seen:
+        seen.add(name)
+        stack.append(_frame_name(name))
+        profile = dag.node[name].get(NodeAttributes.PROFILE)
+        name = profile.critical_pred if profile is not None else None
+    stack.reverse()
+    return stack
+
+
+def write_folded_stacks(dag, file_):
+    """
+    Write profile data in the "folded stacks" text format read by flame graph tools
+
+    Each line contains the chain of nodes on the critical path leading to a node, separated by semicolons, followed by the total self time of that node in microseconds.
+
+    :param dag: Computation DAG, with profile data in node attributes
+    :param file_: File-like object to write to
+    """
+    for name, profile in dag.nodes(data=NodeAttributes.PROFILE):
+        if profile is None:
+            continue
+        file_.write('{} {}\n'.format(';'.join(_critical_stack(dag, name)), int(round(profile.total * 1e6))))
@@ -0,0 +1,260 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from .compat import perf_counter
+from .computeengine import NodeData, NonExistentNodeException
+from .consts import States
+from .util import as_iterable, values_equal
+
+LOG = logging.getLogger('loman.reactive')
+
+
+class ReactiveDriver(object):
+    """
+    Recomputes the outputs of a computation in micro-batches as new input values arrive
+
+    Values inserted through the driver are held in a buffer that keeps only the latest value for each node. A background thread waits until no value has been inserted for ``debounce`` seconds, or until the oldest buffered value has waited ``max_latency`` seconds, then inserts all the buffered values at once with ``insert_many`` and computes the outputs. A burst of inserts therefore leads to a single recalculation of the nodes they affect, rather than one for each insert.
+
+    After each batch, subscribers are called with the outputs that were recalculated and whose values changed. While the driver is running, the computation should only be changed through the driver.
+
+    If inserting or computing a batch raises an exception, for example because a value could not be restored, subscribers are called with the outputs that changed before the exception, the exception is kept in ``last_error``, and it is raised by the next call to ``flush`` or ``stop``. Values that were inserted stay in the computation, and outputs are recalculated from them by the next batch.
+
+    Example::
+
+        >>> driver = ReactiveDriver(comp, ['pnl', 'risk'], debounce=0.01, max_latency=0.1)
+        >>> driver.subscribe(lambda changes: publish(changes), names='pnl')
+        >>> with driver:
+        ...     for name, value in feed:
+        ...         driver.insert(name, value)
+
+    :param comp: Computation to drive
+    :param outputs: Name or names of nodes to recompute after each batch of inserts
+    :param debounce: Time, in seconds, without new inserts to wait for before starting a batch
+    :type debounce: float, default 0
+    :param max_latency: Maximum time, in seconds, that an inserted value waits before a batch is started, however frequent inserts are
+    :type max_latency: float, default None
+    """
+    def __init__(self, comp, outputs, debounce=0., max_latency=None):
+        self.comp = comp
+        self.outputs = list(as_iterable(outputs))
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.n_inserts = 0
+        self.n_applied = 0
+        self.n_batches = 0
+        self.n_errors = 0
+        self.last_error = None
+        self._unreported_error = None
+        self._buffer = OrderedDict()
+        self._first_insert = None
+        self._last_insert = None
+        self._inserted = 0
+        self._done = 0
+        self._subscribers = []
+        self._values = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def insert(self, name, value):
+        """
+        Buffer a value to be inserted into a node in the next batch, replacing any value already buffered for that node
+
+        :param name: Name of the node
+        :param value: Value to insert
+        """
+        self.insert_many([(name, value)])
+
+    def insert_many(self, name_value_pairs):
+        """
+        Buffer values to be inserted into nodes in the next batch
+
+        :param name_value_pairs: Each tuple should be a pair (name, value), where name is the name of the node to insert the value into.
+        :type name_value_pairs: List of tuples
+        """
+        for name, value in name_value_pairs:
+            if name not in self.comp.dag:
+                raise NonExistentNodeException('Node {} does not exist'.format(str(name)))
+        with self._cond:
+            now = perf_counter()
+            for name, value in name_value_pairs:
+                self._buffer.pop(name, None)
+                self._buffer[name] = value
+                self.n_inserts += 1
+            if self._first_insert is None:
+                self._first_insert = now
+            self._last_insert = now
+            self._inserted += 1
+            self._cond.notify_all()
+
+    def subscribe(self, callback, names=None):
+        """
+        Call a function after each batch with the outputs whose values changed
+
+        The callback is called from the driver's thread with a dictionary mapping the names of changed outputs to ``NodeData`` tuples of their state and value. Outputs whose calculation raised an exception are included with state ERROR.
+
+        :param callback: Function of one argument to call
+        :param names: Only call the function when any of these outputs change, and only pass these outputs. By default, all outputs are passed.
+        """
+        names = None if names is None else frozenset(as_iterable(names))
+        with self._cond:
+            self._subscribers.append((callback, names))
+
+    def unsubscribe(self, callback):
+        """
+        Stop calling a function previously passed to ``subscribe``
+        """
+        with self._cond:
+            self._subscribers = [(f, names) for f, names in self._subscribers if f != callback]
+
+    def start(self):
+        """
+        Start the background thread that runs batches
+        """
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='loman-reactive')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, flush=True):
+        """
+        Stop the background thread
+
+        :param flush: Whether to run a final batch with any values still buffered
+        :type flush: Boolean, default True
+        """
+        try:
+            if flush:
+                self.flush()
+        finally:
+            with self._cond:
+                thread, self._thread = self._thread, None
+                self._stopping = True
+                self._cond.notify_all()
+            if thread is not None:
+                thread.join()
+
+    def flush(self, timeout=None):
+        """
+        Wait until all values buffered so far have been inserted and the outputs computed
+
+        If the driver is not running, the batch is run in the calling thread.
+
+        :param timeout: Maximum time to wait, in seconds
+        :type timeout: float, default None
+        :return: Whether the buffered values were processed before the timeout
+        :rtype: Boolean
+        :raises: The exception raised by inserting or computing a batch since ``flush`` or ``stop`` last raised
+        """
+        with self._cond:
+            if self._thread is None:
+                self._run_batch()
+                self._raise_unreported_error()
+                return True
+            target = self._inserted
+            if self._buffer:
+                self._last_insert = self._first_insert = perf_counter() - self.debounce
+                self._cond.notify_all()
+            deadline = None if timeout is None else perf_counter() + timeout
+            while self._done < target:
+                remaining = None if deadline is None else deadline - perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self._raise_unreported_error()
+            return True
+
+    def _raise_unreported_error(self):
+        # Called with the lock held
+        error, self._unreported_error = self._unreported_error, None
+        if error is not None:
+            raise error
+
+    def _due(self):
+        due = self._last_insert + self.debounce
+        if self.max_latency is not None:
+            due = min(due, self._first_insert + self.max_latency)
+        return due
+
+    def _run(self):
+        with self._cond:
+            while not self._stopping:
+                if not self._buffer:
+                    self._cond.wait()
+                    continue
+                wait = self._due() - perf_counter()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                self._run_batch()
+
+    def _run_batch(self):
+        # Called with the lock held. The lock is released while computing, so that inserts continue to be buffered.
+        pairs = list(self._buffer.items())
+        target = self._inserted
+        self._buffer.clear()
+        self._first_insert = self._last_insert = None
+        subscribers = list(self._subscribers)
+        self._cond.release()
+        error = None
+        try:
+            changes, error = self._apply(pairs)
+            if changes:
+                self._notify(subscribers, changes)
+        finally:
+            self._cond.acquire()
+        if error is not None:
+            self.n_errors += 1
+            self.last_error = self._unreported_error = error
+        self._done = target
+        self._cond.notify_all()
+
+    def _apply(self, pairs):
+        changes = OrderedDict()
+        if not pairs:
+            return changes, None
+        self.n_applied += len(pairs)
+        self.n_batches += 1
+        outputs = set(self.outputs)
+        try:
+            for name in self.outputs:
+                if name not in self._values and self.comp.state(name) == States.UPTODATE:
+                    self._values[name] = NodeData(States.UPTODATE, self.comp.value(name))
+            self.comp.insert_many(pairs)
+            for name, node_data in self.comp.compute_iter(self.outputs):
+                if name not in outputs:
+                    continue
+                previous = self._values.get(name)
+                if previous is not None and previous.state == node_data.state and \
+                        values_equal(previous.value, node_data.value):
+                    continue
+                self._values[name] = node_data
+                changes[name] = node_data
+        except Exception as e:
+            LOG.exception('Error computing outputs {}'.format(self.outputs))
+            return changes, e
+        return changes, None
+
+    def _notify(self, subscribers, changes):
+        for callback, names in subscribers:
+            if names is None:
+                selected = changes
+            else:
+                selected = OrderedDict((name, data) for name, data in changes.items() if name in names)
+            if not selected:
+                continue
+            try:
+                callback(selected)
+            except Exception:
+                LOG.exception('Error in subscriber {}'.format(callback))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
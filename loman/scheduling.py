@@ -0,0 +1,146 @@
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+from .consts import NodeAttributes
+
+ResourcePool = namedtuple('ResourcePool', ['name', 'max_concurrency', 'priority', 'groups', 'tags', 'executor',
+                                           'stealable'])
+
+
+class PoolScheduler(object):
+    """
+    Queues nodes ready to be calculated by resource pool, and decides which to submit
+
+    Each pool has a queue of ready nodes. At most ``max_concurrency`` nodes from a pool's queue run at once, and pools with higher ``priority`` are served first. When a pool has spare capacity and nothing queued, it takes nodes from the queues of busy pools that are ``stealable``, highest priority first, so that capacity is not left idle.
+
+    Nodes that were still running when an earlier computation stopped, because it was cancelled or failed, are kept in ``orphans``, and use their pools' capacity until they finish.
+
+    :param pools: Resource pools
+    :type pools: List of ResourcePool
+    :param orphans: Mapping from pool name to futures of nodes still running from earlier computations, which is updated by ``detach``
+    :type orphans: dict, default None
+    """
+    def __init__(self, pools, orphans=None):
+        self.pools = sorted(pools, key=lambda pool: -pool.priority)
+        self._queues = {pool.name: deque() for pool in self.pools}
+        self._running = {pool.name: 0 for pool in self.pools}
+        self._slots = {}
+        self._orphans = {} if orphans is None else orphans
+
+    def get_pool(self, node):
+        """
+        Get the first pool, in priority order, that includes a node's group or any of its tags, or None
+
+        :param node: Node attribute dictionary
+        """
+        group = node.get(NodeAttributes.GROUP)
+        tags = node.get(NodeAttributes.TAG, ())
+        for pool in self.pools:
+            if group is not None and group in pool.groups:
+                return pool
+            if not pool.tags.isdisjoint(tags):
+                return pool
+        return None
+
+    def push(self, name, pool):
+        self._queues[pool.name].append(name)
+
+    def _count_orphans(self, pool):
+        futs = self._orphans.get(pool.name)
+        if not futs:
+            return 0
+        futs[:] = [fut for fut in futs if not fut.done()]
+        return len(futs)
+
+    def _has_capacity(self, pool):
+        if pool.max_concurrency is None:
+            return True
+        return self._running[pool.name] + self._count_orphans(pool) < pool.max_concurrency
+
+    def is_waiting(self):
+        """
+        Whether any nodes are queued
+        """
+        return any(self._queues.values())
+
+    def get_orphans(self):
+        """
+        Get the futures of nodes from earlier computations that are still running
+
+        :rtype: List of futures
+        """
+        return [fut for futs in self._orphans.values() for fut in futs if not fut.done()]
+
+    def pop_ready(self):
+        """
+        Take the nodes that can be submitted now
+
+        :return: Pairs of node name and the pool whose capacity it uses
+        :rtype: List of tuples
+        """
+        ready = []
+        for pool in self.pools:
+            queue = self._queues[pool.name]
+            while queue and self._has_capacity(pool):
+                ready.append(self._take(queue.popleft(), pool))
+        for pool in self.pools:
+            if self._queues[pool.name]:
+                continue
+            while self._has_capacity(pool):
+                victim = next((p for p in self.pools if p.stealable and self._queues[p.name]), None)
+                if victim is None:
+                    return ready
+                ready.append(self._take(self._queues[victim.name].popleft(), pool))
+        return ready
+
+    def _take(self, name, pool):
+        self._running[pool.name] += 1
+        self._slots[name] = pool
+        return name, pool
+
+    def finish(self, name):
+        """
+        Release the capacity used by a node that has finished
+
+        :param name: Name of the node
+        """
+        pool = self._slots.pop(name, None)
+        if pool is not None:
+            self._running[pool.name] -= 1
+
+    def detach(self, name, fut):
+        """
+        Release the capacity used by a node when the computation stops before it finishes
+
+        The node is cancelled if it has not started. Otherwise, if it uses a pool's capacity, it is kept in ``orphans`` until it finishes.
+
+        :param name: Name of the node
+        :param fut: Future of the node's calculation
+        """
+        cancelled = fut.cancel()
+        pool = self._slots.pop(name, None)
+        if pool is not None:
+            self._running[pool.name] -= 1
+            if not cancelled:
+                self._orphans.setdefault(pool.name, []).append(fut)
+
+
+class CancellationToken(object):
+    """
+    Cancels a computation in progress when ``cancel`` is called, for example from another thread
+
+    A token stays cancelled once cancelled, so a new token should be used for each computation.
+    """
+    def __init__(self):
+        self._future = Future()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            if not self._future.done():
+                self._future.set_result(None)
+
+    @property
+    def cancelled(self):
+        return self._future.done()
@@ -0,0 +1,120 @@
+import sys
+import weakref
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+DEFAULT_THRESHOLD = 1 << 16
+
+_attached = weakref.WeakValueDictionary()
+
+
+def _get_shareable_data(value):
+    np = sys.modules.get('numpy')
+    if np is None:
+        return None
+    if type(value) in (np.ndarray, np.memmap):
+        data, kind, meta = value, 'array', None
+    else:
+        pd = sys.modules.get('pandas')
+        if pd is None:
+            return None
+        if type(value) is pd.Series and isinstance(value.dtype, np.dtype):
+            data, kind, meta = value.values, 'series', (value.index, value.name)
+        elif type(value) is pd.DataFrame and len(value.columns) > 0 and len(set(value.dtypes)) == 1 \
+                and isinstance(value.dtypes.iloc[0], np.dtype):
+            data, kind, meta = value.values, 'frame', (value.index, value.columns)
+        else:
+            return None
+    if data.dtype.hasobject:
+        return None
+    return data, kind, meta
+
+
+def share_value(value, threshold=DEFAULT_THRESHOLD):
+    """
+    Copy a numpy array, or the data of a pandas Series or DataFrame with a single dtype, into a shared memory block
+
+    :param value: Value to share
+    :param threshold: Minimum size of data to share, in bytes
+    :return: The shared value, or None if shared memory is not available, or the value is not an array or is too small
+    :rtype: SharedValue
+    """
+    if shared_memory is None:
+        return None
+    shareable = _get_shareable_data(value)
+    if shareable is None:
+        return None
+    data, kind, meta = shareable
+    if data.nbytes < threshold:
+        return None
+    return SharedValue(value, data, kind, meta)
+
+
+class SharedValue(object):
+    """
+    Copy of a node value held in a shared memory block
+
+    When pickled, only the name of the block and the layout of the data are written. Unpickling, in another process, creates a read-only array, Series or DataFrame backed by the block, without copying. The block is released when the ``SharedValue`` is released, or garbage collected.
+
+    :param source: The value that was shared
+    """
+    def __init__(self, source, data, kind, meta):
+        import numpy as np
+        self.source = source
+        self.shape = data.shape
+        self.dtype = data.dtype
+        self.kind = kind
+        self.meta = meta
+        self._shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        self.name = self._shm.name
+        arr = np.ndarray(data.shape, data.dtype, buffer=self._shm.buf)
+        arr[...] = data
+        del arr
+
+    def __reduce__(self):
+        return _attach, (self.name, self.shape, self.dtype, self.kind, self.meta)
+
+    def release(self):
+        """
+        Release the shared memory block
+
+        Processes that are using the block can continue to do so.
+        """
+        shm, self._shm = self._shm, None
+        self.source = None
+        if shm is not None:
+            shm.close()
+            try:
+                shm.unlink()
+            except OSError:
+                pass
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+def _attach(name, shape, dtype, kind, meta):
+    import numpy as np
+    arr = _attached.get(name)
+    if arr is None:
+        shm = shared_memory.SharedMemory(name=name)
+        arr = np.ndarray(shape, dtype, buffer=shm.buf)
+        arr.flags.writeable = False
+        # Views of arr refer to it as their base, so the block stays mapped until no array uses it
+        weakref.finalize(arr, shm.close)
+        _attached[name] = arr
+    if kind == 'series':
+        import pandas as pd
+        index, series_name = meta
+        return pd.Series(arr, index=index, name=series_name, copy=False)
+    if kind == 'frame':
+        import pandas as pd
+        index, columns = meta
+        return pd.DataFrame(arr, index=index, columns=columns, copy=False)
+    return arr
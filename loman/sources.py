@@ -0,0 +1,126 @@
+from collections import namedtuple
+
+from six.moves import queue
+
+from .compat import perf_counter
+
+
+class EndOfStream(object):
+    """
+    Marker put into a queue feeding a source node to show that no further items will follow
+    """
+    def __repr__(self):
+        return '<end of stream>'
+
+    def __reduce__(self):
+        return 'END_OF_STREAM'
+
+
+END_OF_STREAM = EndOfStream()
+
+
+class PipelineStats(namedtuple('PipelineStats', ['items', 'batches', 'elapsed', 'compute_time'])):
+    """
+    Statistics of a run of ``Computation.run_pipeline``: the number of items read from sources, the number of batches computed, and the total and computation time in seconds
+    """
+    @property
+    def items_per_second(self):
+        return self.items / self.elapsed if self.elapsed > 0 else float('nan')
+
+
+class Source(object):
+    """
+    Reads batches of items for a source node from an iterable, or a queue
+
+    An iterable, such as a list or generator, ends when it is exhausted. A queue, such as ``queue.Queue`` or ``multiprocessing.Queue``, ends when ``END_OF_STREAM`` is read from it.
+
+    :param source: Iterable or queue to read items from
+    :param batch_size: Maximum number of items to read at once. If None, items are read one at a time.
+    :type batch_size: int, default None
+    """
+    def __init__(self, source, batch_size=None):
+        if batch_size is not None and batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        if hasattr(source, 'get_nowait'):
+            self._queue, self._iter = source, None
+        else:
+            self._queue, self._iter = None, iter(source)
+        self.batch_size = batch_size
+        self.closed = False
+
+    @property
+    def is_queue(self):
+        return self._queue is not None
+
+    def read(self, block=False, timeout=None):
+        """
+        Read up to ``batch_size`` items
+
+        Items from an iterable are always read as they are produced. For a queue, only items already in the queue are read, unless ``block`` is set, in which case the first item is waited for for up to ``timeout`` seconds.
+
+        :return: Items read, which is empty if none are available
+        :rtype: List
+        """
+        n = self.batch_size or 1
+        items = []
+        while len(items) < n and not self.closed:
+            try:
+                if self._iter is not None:
+                    item = next(self._iter)
+                elif block and not items:
+                    item = self._queue.get(timeout=timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except (StopIteration, queue.Empty) as e:
+                if isinstance(e, StopIteration):
+                    self.closed = True
+                break
+            if item is END_OF_STREAM:
+                self.closed = True
+            else:
+                items.append(item)
+        return items
+
+    def value(self, items):
+        return items if self.batch_size is not None else items[0]
+
+
+def run_pipeline(comp, targets=None, raise_exceptions=False, cancel_token=None, on_batch=None, poll_interval=0.05):
+    """
+    Insert batches read from a computation's source nodes, and compute targets after each batch, until all sources end
+
+    See ``Computation.run_pipeline``.
+    """
+    start = perf_counter()
+    n_items, n_batches, compute_time = 0, 0, 0.
+    active = list(comp.sources.items())
+    while active:
+        if cancel_token is not None and cancel_token.cancelled:
+            break
+        pairs = []
+        for name, source in active:
+            items = source.read()
+            if items:
+                pairs.append((name, source.value(items)))
+                n_items += len(items)
+        waiting = [(name, source) for name, source in active if source.is_queue and not source.closed]
+        if not pairs and waiting:
+            name, source = waiting[0]
+            items = source.read(block=True, timeout=poll_interval)
+            if items:
+                pairs.append((name, source.value(items)))
+                n_items += len(items)
+        active = [(name, source) for name, source in active if not source.closed]
+        if not pairs:
+            continue
+        comp.insert_many(pairs, force=True)
+        compute_start = perf_counter()
+        if targets is None:
+            comp.compute_all(raise_exceptions=raise_exceptions, cancel_token=cancel_token)
+        else:
+            comp.compute(targets, raise_exceptions=raise_exceptions, cancel_token=cancel_token)
+        compute_time += perf_counter() - compute_start
+        n_batches += 1
+        if on_batch is not None:
+            on_batch(comp)
+    return PipelineStats(n_items, n_batches, perf_counter() - start, compute_time)
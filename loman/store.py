@@ -0,0 +1,114 @@
+import abc
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import six
+
+
+@six.add_metaclass(abc.ABCMeta)
+class DeferredValue(object):
+    """
+    Base class for markers stored in place of a node's value when the value is held outside the memory of the computation
+
+    Markers are replaced by their value, using ``load``, when the value is used. ``residency`` is reported by ``Computation.get_residency``.
+    """
+    residency = None
+
+    @abc.abstractmethod
+    def load(self):
+        """
+        Get the value that the marker refers to
+        """
+
+
+class SpilledValue(DeferredValue):
+    """
+    Marker stored in place of a node's value when the value has been written to disk
+
+    The file is deleted when the marker is garbage collected, i.e. when no node refers to it any more. When pickled, the marker is replaced by the value it refers to.
+    """
+    residency = 'spilled'
+
+    def __init__(self, path, format='dill'):
+        self.path = path
+        self.format = format
+
+    def load(self):
+        """
+        Read the value back from disk
+
+        numpy arrays are memory-mapped copy-on-write, so only the parts that are used are read, and changes are not written back to the file.
+        """
+        if self.format == 'npy':
+            import numpy as np
+            return np.load(self.path, mmap_mode='c')
+        import dill
+        with open(self.path, 'rb') as f:
+            return dill.load(f)
+
+    def __reduce__(self):
+        return _identity, (self.load(),)
+
+    def __del__(self):
+        try:
+            os.remove(self.path)
+        except (OSError, TypeError, AttributeError):
+            pass
+
+    def __repr__(self):
+        return '<spilled to {}>'.format(self.path)
+
+
+def _identity(value):
+    return value
+
+
+def _remove_directory(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _is_plain_ndarray(value):
+    np = sys.modules.get('numpy')
+    return np is not None and type(value) in (np.ndarray, np.memmap) and not value.dtype.hasobject
+
+
+class DiskStore(object):
+    """
+    Writes node values to files in a local directory
+
+    numpy arrays are written in ``.npy`` format, so that they can be memory-mapped when they are read back. Other values are serialized with dill.
+
+    :param directory: Directory to write files to. By default, a temporary directory is created, and removed when the process exits.
+    """
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='loman-')
+            atexit.register(_remove_directory, directory)
+        elif not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self._counter = 0
+
+    def put(self, value):
+        """
+        Write a value to disk
+
+        :return: Marker to store in place of the value
+        :rtype: SpilledValue
+        """
+        self._counter += 1
+        prefix = 'value-{}-'.format(self._counter)
+        if _is_plain_ndarray(value):
+            import numpy as np
+            fd, path = tempfile.mkstemp(dir=self.directory, prefix=prefix, suffix='.npy')
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, value, allow_pickle=False)
+            return SpilledValue(path, 'npy')
+        import dill
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix=prefix, suffix='.dill')
+        with os.fdopen(fd, 'wb') as f:
+            dill.dump(value, f)
+        return SpilledValue(path)
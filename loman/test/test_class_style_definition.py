@@ -1,5 +1,5 @@
 from loman import (Computation, States, MapException, LoopDetectedException, NonExistentNodeException, node, C,
-                   input_node, calc_node, ComputationFactory)
+                   input_node, calc_node, ComputationFactory, ComputationTemplate)
 
 
 def test_class_style_definition():
@@ -67,3 +67,59 @@ def test_class_style_definition_as_factory_decorator():
     comp.compute_all()
 
     assert comp.v.d == 10
+
+
+def test_computation_factory_introspects_once():
+    class FooComp():
+        a = input_node(value=3)
+
+        @calc_node
+        def b(a):
+            return a + 1
+
+    factory = ComputationFactory(FooComp)
+    template = factory.template
+    comp1 = factory()
+    comp2 = factory()
+    assert factory.template is template
+
+    comp1.compute_all()
+    assert comp1.v.b == 4
+    assert comp2.s.b == States.COMPUTABLE
+
+    comp2.insert('a', 10)
+    comp2.compute_all()
+    assert comp2.v.b == 11
+    assert comp1.v.b == 4
+
+    comp1.set_tag('b', 'foo')
+    assert 'foo' not in comp2.t.b
+    assert comp2.nodes_by_tag('foo') == set()
+
+
+def test_computation_factory_memory_budget():
+    class FooComp():
+        a = input_node(value=3)
+
+        @calc_node
+        def b(a):
+            return a + 1
+
+    comp = ComputationFactory(FooComp)(memory_budget=100, memory_policy='spill')
+    assert comp.memory_budget == 100
+    assert comp.memory_policy == 'spill'
+    comp.compute_all()
+    assert comp.v.b == 4
+
+
+def test_computation_template_from_computation():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1, tags=['foo'])
+    template = ComputationTemplate.from_computation(comp)
+
+    comp2 = template.instantiate()
+    comp2.compute_all()
+    assert comp2.v.b == 2
+    assert comp2.nodes_by_tag('foo') == {'b'}
+    assert comp.s.b == States.COMPUTABLE
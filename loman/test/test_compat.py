@@ -0,0 +1,80 @@
+import functools
+
+import six
+
+from loman.compat import get_signature, _inspect_signature, _signature_cache
+
+
+def _assert_matches_inspect(func):
+    sig = get_signature(func)
+    expected = _inspect_signature(func)
+    assert list(sig.kwd_params) == list(expected.kwd_params)
+    assert list(sig.default_params) == list(expected.default_params)
+    assert sig.has_var_args == expected.has_var_args
+    assert sig.has_var_kwds == expected.has_var_kwds
+
+
+def test_get_signature_matches_inspect():
+    def f0():
+        pass
+
+    def f1(a, b):
+        pass
+
+    def f2(a, b=1, c=2):
+        pass
+
+    def f3(a, *args, **kwds):
+        x = 1
+        return x
+
+    def f4(*args):
+        pass
+
+    for f in [f0, f1, f2, f3, f4, lambda a, b=1: a]:
+        _assert_matches_inspect(f)
+
+
+if six.PY3:
+    exec('''
+def test_get_signature_keyword_only_matches_inspect():
+    def f(a, b=1, *, c, d=2, **kwds):
+        pass
+    _assert_matches_inspect(f)
+''')
+
+
+def test_get_signature_non_function_callables():
+    def f(a, b, c=1):
+        pass
+
+    class Callable(object):
+        def __call__(self, x, y=2):
+            pass
+
+    _assert_matches_inspect(functools.partial(f, 1))
+    _assert_matches_inspect(Callable())
+    _assert_matches_inspect(Callable().__call__)
+
+
+def test_get_signature_cached_per_code_object():
+    def make_f(field):
+        def get_field_value(tuple):
+            return getattr(tuple, field)
+        return get_field_value
+
+    f1, f2 = make_f('x'), make_f('y')
+    assert f1.__code__ is f2.__code__
+    assert get_signature(f1) is get_signature(f2)
+    assert f1.__code__ in _signature_cache
+
+
+def test_get_signature_cache_checks_defaults():
+    def f(a, b=1):
+        pass
+
+    sig = get_signature(f)
+    assert list(sig.default_params) == ['b']
+    f.__defaults__ = None
+    sig = get_signature(f)
+    assert list(sig.default_params) == []
@@ -1,11 +1,13 @@
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from time import sleep
+import threading
 
 from loman import Computation, States, MapException, LoopDetectedException, NonExistentNodeException, node, C
 import six
 from collections import namedtuple
 import random
+import numpy as np
 from nose.tools import raises, assert_raises
 
 
@@ -502,6 +504,53 @@ def test_insert_from_large():
         assert comp2.value(i) == i
 
 
+def test_insert_many_skips_unchanged_values():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', value=np.arange(5))
+    comp.add_node('c', lambda a: a + 1)
+    comp.add_node('d', lambda b: b.sum())
+    comp.add_node('e', lambda c, d: c + d)
+    comp.compute_all()
+
+    comp.insert_many([('a', 1), ('b', np.arange(5))])
+    assert comp.s[['c', 'd', 'e']] == [States.UPTODATE] * 3
+
+    comp.insert_many([('a', 2), ('b', np.arange(5))])
+    assert comp.s[['c', 'd', 'e']] == [States.COMPUTABLE, States.UPTODATE, States.STALE]
+    comp.compute_all()
+    assert comp.v.e == 13
+
+    comp.insert_many([('a', 2)], force=True)
+    assert comp.s[['c', 'd', 'e']] == [States.COMPUTABLE, States.UPTODATE, States.STALE]
+
+
+def test_insert_same_object_modified_in_place():
+    comp = Computation()
+    comp.add_node('a', value=np.arange(3))
+    comp.add_node('b', lambda a: a.sum())
+    comp.compute_all()
+    x = comp.v.a
+    x[0] = 99
+    comp.insert('a', x)
+    assert comp.s.b == States.COMPUTABLE
+    comp.insert_many([('a', x)])
+    assert comp.s.b == States.COMPUTABLE
+    comp.compute_all()
+    assert comp.v.b == 102
+
+
+def test_insert_many_leaves_pinned_descendents():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    comp.compute_all()
+    comp.pin('b')
+    comp.insert_many([('a', 2)])
+    assert comp.s[['b', 'c']] == [States.PINNED, States.UPTODATE]
+
+
 def test_to_df():
     comp = Computation()
     comp.add_node('a')
@@ -1132,4 +1181,131 @@ def test_node_specific_thread_pool_executor():
 def test_delete_node_with_placeholder_parent():
     comp = Computation()
     comp.add_node('b', lambda a: a)
-    comp.delete_node('b')
\ No newline at end of file
+    comp.delete_node('b')
+
+
+def test_compute_iter():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda a: a / 0)
+    comp.add_node('d', lambda b: b + 1)
+    comp.add_node('e', lambda c: c + 1)
+
+    results = list(comp.compute_iter())
+    assert [name for name, node_data in results if name in ('b', 'd')] == ['b', 'd']
+    results = dict(results)
+    assert set(results) == {'b', 'c', 'd'}
+    assert results['d'] == (States.UPTODATE, 3)
+    assert results['c'].state == States.ERROR
+    assert isinstance(results['c'].value.exception, ZeroDivisionError)
+
+    comp.insert('a', 2)
+    assert list(comp.compute_iter('b')) == [('b', (States.UPTODATE, 3))]
+    assert comp.s.d == States.COMPUTABLE
+
+
+def test_compute_iter_priority():
+    comp = Computation(default_executor=ThreadPoolExecutor(1))
+    comp.add_node('a', value=1)
+    for i in range(10):
+        comp.add_node(i, lambda a: a)
+        comp.add_node((i, 'x'), lambda x: x, kwds={'x': i})
+    names = [name for name, node_data in comp.compute_iter(priority=[(7, 'x'), 3], max_in_flight=1)]
+    assert names[:3] == [7, (7, 'x'), 3]
+    assert len(names) == 20
+
+
+def test_compute_iter_stop_early():
+    comp = Computation(default_executor=ThreadPoolExecutor(1))
+    comp.add_node('a', value=1)
+    for i in range(5):
+        comp.add_node(i, lambda a: a + 1)
+    it = comp.compute_iter(max_in_flight=1)
+    name, node_data = next(it)
+    it.close()
+    assert comp.s[name] == States.UPTODATE
+    assert sorted(comp.s[list(range(5))], key=lambda state: state.value) == \
+        [States.COMPUTABLE] * 4 + [States.UPTODATE]
+    comp.compute_all()
+    assert comp.v[list(range(5))] == [2] * 5
+
+
+def test_compute_iter_close_waits_for_running_nodes():
+    calls = []
+
+    def slow(name):
+        def f(a):
+            calls.append(name)
+            sleep(0.2)
+            return a
+        return f
+
+    comp = Computation(default_executor=ThreadPoolExecutor(4))
+    comp.add_node('a', value=1)
+    comp.add_node('w', lambda a: a)
+    for name in ['x', 'y', 'z']:
+        comp.add_node(name, slow(name))
+    it = comp.compute_iter()
+    assert next(it)[0] == 'w'
+    it.close()
+    assert comp.s[['x', 'y', 'z']] == [States.UPTODATE] * 3
+    comp.compute_all()
+    assert sorted(calls) == ['x', 'y', 'z']
+
+
+def test_compute_iter_abandoned_does_not_block_writers():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    it = comp.compute_iter()
+
+    def consume_one():
+        assert next(it)[0] == 'b'
+
+    reader = threading.Thread(target=consume_one)
+    reader.start()
+    reader.join()
+    writer = threading.Thread(target=comp.insert, args=('a', 10))
+    writer.start()
+    writer.join(5)
+    assert not writer.is_alive()
+    assert comp.v.a == 10
+    it.close()
+    comp.compute_all()
+    assert comp.v.c == 12
+
+
+@raises(ValueError)
+def test_compute_iter_invalid_max_in_flight():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    list(comp.compute_iter(max_in_flight=0))
+
+
+def test_compute_many_targets_plans_once():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    comp.add_node('d', lambda b: b * 2)
+    comp.add_node('e', lambda a: a * 3)
+    comp.compute('b')
+    comp.insert('a', 2)
+    calc_nodes = comp._get_calc_nodes(['c', 'd', 'b'])
+    assert set(calc_nodes) == {'b', 'c', 'd'}
+    assert calc_nodes[0] == 'b'
+    comp.compute(['c', 'd'])
+    assert comp.v[['c', 'd']] == [4, 6]
+    assert comp.s.e == States.COMPUTABLE
+
+
+@raises(Exception)
+def test_compute_uninitialized_input():
+    comp = Computation()
+    comp.add_node('a')
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    comp.compute(['c'])
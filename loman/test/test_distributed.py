@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import six
+from nose.tools import raises
+
+from loman import Computation, States
+from loman.distributed import LocalProcessCluster, RemoteValue, WorkerException, _fetch
+
+
+def _pid_computation():
+    comp = Computation()
+    comp.add_node('a', value=np.arange(5))
+    comp.add_node('b', lambda a: (a + 1, os.getpid()), group='g1')
+    comp.add_node('c', lambda b: (b[0] * 2, os.getpid()), group='g2')
+    comp.add_node('d', lambda c: c[0].sum())
+    return comp
+
+
+def test_local_process_cluster():
+    with LocalProcessCluster(2) as cluster:
+        comp = _pid_computation()
+        cluster.assign(comp, by='group')
+        comp.compute_all()
+
+        assert comp.s[['b', 'c', 'd']] == [States.UPTODATE] * 3
+        assert comp.v.d == 30
+        # b was sent from one worker to the other, without passing through this process
+        assert comp.get_residency(['a', 'b']) == ['resident', 'remote']
+        assert comp.get_residency('c') == 'resident'
+
+        pids = {os.getpid(), comp.v.b[1], comp.v.c[1]}
+        assert len(pids) == 3
+        assert comp.get_residency('b') == 'resident'
+        timing_b, timing_c = comp.get_timing(['b', 'c'])
+        assert timing_b.worker[0] == comp.v.b[1]
+        assert timing_b.executor == 'worker-0'
+        assert timing_c.executor == 'worker-1'
+
+
+def test_local_process_cluster_assign_by_tag():
+    with LocalProcessCluster(2, prefix='w') as cluster:
+        comp = Computation()
+        comp.add_node('a', value=1)
+        comp.add_node('b', lambda a: os.getpid(), tags=['x'])
+        comp.add_node('c', lambda a: os.getpid(), tags=['y'])
+        comp.add_node('d', lambda a: os.getpid(), tags=['z'])
+        cluster.assign(comp, by='tag', mapping={'x': 1, 'y': 1})
+        comp.compute_all()
+        assert comp.v.b == comp.v.c == cluster.executor_map['w-1'].pid
+        assert comp.v.d == os.getpid()
+
+
+def test_local_process_cluster_error():
+    with LocalProcessCluster(1) as cluster:
+        comp = Computation()
+        comp.add_node('a', value=1)
+        comp.add_node('b', lambda a: a / 0, group='g')
+        comp.add_node('c', lambda b: b + 1, group='g')
+        cluster.assign(comp)
+        comp.compute_all()
+        assert comp.s[['b', 'c']] == [States.ERROR, States.STALE]
+        assert isinstance(comp.v.b.exception, ZeroDivisionError)
+
+
+def test_local_process_cluster_serialization():
+    with LocalProcessCluster(1) as cluster:
+        comp = _pid_computation()
+        cluster.assign(comp)
+        comp.compute_all()
+        f = six.BytesIO()
+        comp.write_dill(f)
+    f.seek(0)
+    comp2 = Computation.read_dill(f)
+    assert (comp2.v.b[0] == np.arange(1, 6)).all()
+
+
+def test_local_process_cluster_releases_values():
+    with LocalProcessCluster(1) as cluster:
+        comp = _pid_computation()
+        cluster.assign(comp)
+        comp.compute('b')
+        remote = comp.dag.node['b']['value']
+        assert isinstance(remote, RemoteValue)
+        worker, key = remote.worker, remote.key
+        del remote
+        assert _fetch(worker.address, worker.authkey, key)[1] == comp.v.b[1]
+
+        for i in range(2):
+            comp.insert('a', np.arange(i))
+            comp.compute('b')
+        assert (comp.v.b[0] == np.arange(1, 2)).all()
+        try:
+            _fetch(worker.address, worker.authkey, key)
+            assert False
+        except WorkerException:
+            pass
+
+
+@raises(ValueError)
+def test_local_process_cluster_assign_invalid():
+    with LocalProcessCluster(1) as cluster:
+        cluster.assign(Computation(), by='foo')
@@ -0,0 +1,77 @@
+import json
+import logging
+
+import six
+
+from loman import Computation, events
+
+
+def _computation():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node(('b', 1), lambda a: a + 1, kwds={'a': 'a'})
+    comp.add_node('c', lambda a: a / 0)
+    return comp
+
+
+def test_events_disabled_by_default():
+    assert not events.enabled
+    sink = events.add_sink(events.RecordingSink())
+    assert events.enabled
+    events.remove_sink(sink)
+    assert not events.enabled
+
+
+def test_recording_sink():
+    sink = events.add_sink(events.RecordingSink())
+    try:
+        comp = _computation()
+        comp.insert_many([('a', 2)])
+        comp.compute_all()
+    finally:
+        events.remove_sink(sink)
+    kinds = [event.kind for event in sink.events]
+    assert kinds[:4] == ['add_node', 'add_node', 'add_node', 'insert_many']
+    assert kinds[4] == 'compute_start'
+    assert sorted(kinds[5:]) == ['node_error', 'node_finish', 'node_submit', 'node_submit']
+    finish = next(event for event in sink.events if event.kind == 'node_finish')
+    assert finish.fields['name'] == ('b', 1)
+    assert finish.fields['duration'] >= 0
+    error = next(event for event in sink.events if event.kind == 'node_error')
+    assert 'ZeroDivisionError' in error.fields['error']
+
+
+def test_logging_sink():
+    records = []
+
+    class Handler(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    logger = logging.getLogger('loman.test.events')
+    logger.setLevel(logging.DEBUG)
+    handler = Handler()
+    logger.addHandler(handler)
+    sink = events.add_sink(events.LoggingSink(logger))
+    try:
+        comp = _computation()
+        comp.insert('a', 2)
+    finally:
+        events.remove_sink(sink)
+        logger.removeHandler(handler)
+    assert records == ['Adding node a', "Adding node ('b', 1)", 'Adding node c', 'Inserting value into node a']
+
+
+def test_json_lines_sink():
+    f = six.StringIO()
+    sink = events.add_sink(events.JsonLinesSink(f))
+    try:
+        comp = _computation()
+        comp.compute(('b', 1))
+    finally:
+        events.remove_sink(sink)
+    records = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert [record['event'] for record in records] == ['add_node'] * 3 + ['compute_start', 'node_submit',
+                                                                          'node_finish']
+    assert records[-1]['name'] == ['b', 1]
+    assert records[3]['names'] == [['b', 1]]
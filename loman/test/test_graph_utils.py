@@ -0,0 +1,39 @@
+import random
+
+import networkx as nx
+
+from loman.graph_utils import contract_node, contract_node_one, topological_sort_subset
+
+
+def test_contract_node():
+    g = nx.DiGraph([('a', 'b'), ('b', 'c'), ('c', 'd'), ('a', 'e'), ('e', 'd')])
+    contract_node(g, {'b', 'c'})
+    assert set(g.nodes()) == {'a', 'd', 'e'}
+    assert set(g.edges()) == {('a', 'd'), ('a', 'e'), ('e', 'd')}
+
+
+def test_contract_node_matches_contract_node_one():
+    rng = random.Random(0)
+    for i in range(50):
+        g = nx.DiGraph()
+        g.add_nodes_from(range(20))
+        g.add_edges_from((u, v) for u in range(20) for v in range(u + 1, 20) if rng.random() < 0.2)
+        ns = set(rng.sample(range(20), 8))
+        g1, g2 = g.copy(), g.copy()
+        contract_node(g1, ns)
+        for n in ns:
+            contract_node_one(g2, n)
+        assert set(g1.nodes()) == set(g2.nodes())
+        assert set(g1.edges()) == set(g2.edges())
+
+
+def test_topological_sort_subset():
+    g = nx.gnp_random_graph(50, 0.1, seed=1, directed=True)
+    g = nx.DiGraph([(u, v) for u, v in g.edges() if u < v])
+    nodes = set(range(0, 50, 3)) & set(g.nodes())
+    order = topological_sort_subset(g, nodes)
+    assert set(order) == nodes
+    position = {n: i for i, n in enumerate(order)}
+    for u, v in g.edges():
+        if u in nodes and v in nodes:
+            assert position[u] < position[v]
@@ -0,0 +1,22 @@
+import json
+import subprocess
+import sys
+
+SCRIPT = '''
+import json, sys
+import loman
+comp = loman.Computation()
+comp.add_node('a', value=1)
+comp.add_node('b', lambda a: a + 1)
+comp.compute_all()
+loaded = [m for m in ['pandas', 'dill', 'matplotlib', 'pydotplus'] if m in sys.modules]
+comp.to_df()
+print(json.dumps([loaded, 'pandas' in sys.modules]))
+'''
+
+
+def test_import_does_not_load_optional_dependencies():
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+    loaded, pandas_loaded_by_to_df = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+    assert loaded == []
+    assert pandas_loaded_by_to_df
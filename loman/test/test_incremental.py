@@ -0,0 +1,123 @@
+import pandas as pd
+
+from loman import Computation, States
+
+
+class Calls(object):
+    def __init__(self):
+        self.full = 0
+        self.update = 0
+
+    def total(self, trades):
+        self.full += 1
+        return trades.qty.sum()
+
+    def update_total(self, total, trades):
+        self.update += 1
+        return total + trades.qty.sum()
+
+
+def _trades(*qtys):
+    return pd.DataFrame({'qty': list(qtys)})
+
+
+def _total_computation(calls):
+    comp = Computation()
+    comp.add_node('trades', value=_trades(1, 2))
+    comp.add_node('total', calls.total, update=calls.update_total)
+    comp.compute_all()
+    return comp
+
+
+def test_append_updates_incremental_node():
+    calls = Calls()
+    comp = _total_computation(calls)
+    assert comp.v.total == 3
+
+    comp.append('trades', _trades(10))
+    assert comp.s.total == States.COMPUTABLE
+    assert len(comp.v.trades) == 3
+    comp.compute_all()
+    assert comp.v.total == 13
+    assert (calls.full, calls.update) == (1, 1)
+
+    comp.append('trades', _trades(100))
+    comp.append('trades', _trades(1000, 10000))
+    comp.compute_all()
+    assert comp.v.total == 11113
+    assert (calls.full, calls.update) == (1, 2)
+
+
+def test_insert_recalculates_incremental_node_in_full():
+    calls = Calls()
+    comp = _total_computation(calls)
+    comp.insert('trades', _trades(5))
+    comp.compute_all()
+    assert comp.v.total == 5
+    assert (calls.full, calls.update) == (2, 0)
+
+    comp.append('trades', _trades(1))
+    comp.insert('total', 0)
+    comp.append('trades', _trades(1))
+    comp.compute_all()
+    assert comp.v.total == 7
+    assert (calls.full, calls.update) == (3, 0)
+
+
+def test_incremental_node_with_changed_input():
+    comp = Computation()
+    comp.add_node('xs', value=[1, 2])
+    comp.add_node('scale', value=1)
+    comp.add_node('total', lambda xs, scale: sum(xs) * scale, update=lambda total, xs, scale: total + sum(xs) * scale)
+    comp.compute_all()
+    comp.append('xs', [3])
+    comp.insert('scale', 2)
+    comp.compute_all()
+    assert comp.v.total == 12
+
+
+def test_appending_node_publishes_rows():
+    comp = Computation()
+    comp.add_node('xs', value=[1, 5, 2])
+    big_calls = []
+
+    def big(xs):
+        big_calls.append(xs)
+        return [x for x in xs if x > 1]
+
+    comp.add_node('big', big, update=lambda big, xs: [x for x in xs if x > 1], appends=True)
+    comp.add_node('count', lambda big: len(big), update=lambda count, big: count + len(big))
+    comp.add_node('last', lambda big: big[-1])
+    comp.compute_all()
+    assert comp.v[['big', 'count', 'last']] == [[5, 2], 2, 2]
+
+    comp.append('xs', [0, 7])
+    comp.compute('count')
+    assert comp.v[['big', 'count']] == [[5, 2, 7], 3]
+    assert len(big_calls) == 1
+    assert comp.s.last == States.COMPUTABLE
+
+    comp.append('xs', [9])
+    comp.compute_all()
+    assert comp.v[['big', 'count', 'last']] == [[5, 2, 7, 9], 4, 9]
+    assert len(big_calls) == 1
+
+
+def test_deltas_kept_until_consumed():
+    comp = Computation()
+    comp.add_node('xs', value=[1])
+    comp.add_node('a', lambda xs: sum(xs), update=lambda a, xs: a + sum(xs))
+    comp.add_node('b', lambda xs: len(xs), update=lambda b, xs: b + len(xs))
+    comp.compute_all()
+    comp.append('xs', [2])
+    comp.compute('a')
+    comp.append('xs', [3])
+    comp.compute('a')
+    assert len(comp.dag.node['xs']['deltas']) == 2
+    comp.compute('b')
+    assert comp.v[['a', 'b']] == [6, 3]
+    assert comp.dag.node['xs']['deltas'] == []
+
+    comp.add_node('ys', value=[1])
+    comp.append('ys', [2])
+    assert 'deltas' not in comp.dag.node['ys']
@@ -0,0 +1,272 @@
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import six
+from nose.tools import raises
+
+from loman import Computation, States
+from loman.computeengine import ComputationException
+from loman.memory import estimate_size
+from loman.store import SpilledValue
+
+
+def test_estimate_size():
+    a = np.zeros(1000)
+    assert estimate_size(a) >= 8000
+    assert estimate_size([a, a]) < 2 * 8000
+    assert estimate_size(pd.DataFrame({'x': a, 'y': a})) >= 16000
+    assert estimate_size(pd.Series(a)) >= 8000
+    assert estimate_size({'a': list(range(100))}) > sys.getsizeof(list(range(100)))
+
+
+def _chain_computation(calls, **kwds):
+    def make_f(name):
+        def f(x):
+            calls.append(name)
+            return x + 1
+        return f
+
+    comp = Computation(**kwds)
+    comp.add_node('a', value=np.zeros(1000))
+    comp.add_node('b', make_f('b'), kwds={'x': 'a'})
+    comp.add_node('c', make_f('c'), kwds={'x': 'b'})
+    comp.add_node('d', make_f('d'), kwds={'x': 'c'})
+    return comp
+
+
+def test_get_size():
+    comp = _chain_computation([])
+    comp.compute_all()
+    assert comp.get_size('d') >= 8000
+    df = comp.to_df()
+    assert df.loc['d', 'size'] == comp.get_size('d')
+
+
+def test_memory_budget_evicts_intermediate_values():
+    calls = []
+    comp = _chain_computation(calls, memory_budget=20000)
+    comp.compute('d')
+
+    assert calls == ['b', 'c', 'd']
+    assert comp.is_evicted(['a', 'b', 'c', 'd']) == [False, True, True, False]
+    assert comp.s[['b', 'c', 'd']] == [States.UPTODATE] * 3
+    assert comp._memory_usage <= 20000
+    assert comp.get_size('b') == 0
+
+    assert (comp.v.c == 2).all()
+    assert calls == ['b', 'c', 'd', 'b', 'c']
+    assert not comp.is_evicted('c')
+
+
+def test_memory_budget_restores_evicted_inputs():
+    calls = []
+    comp = _chain_computation(calls, memory_budget=20000)
+    comp.add_node('e', lambda b: b * 2)
+    comp.compute('d')
+    del calls[:]
+
+    comp.compute('e')
+    assert calls == ['b']
+    assert (comp.v.e == 2).all()
+
+
+def test_evicted_value_not_restored_from_changed_inputs():
+    calls = []
+    comp = _chain_computation(calls, memory_budget=20000)
+    comp.compute('d')
+    comp.insert('a', np.ones(1000))
+    assert comp.s[['b', 'c']] == [States.COMPUTABLE, States.STALE]
+    assert comp.is_evicted('b')
+    with pytest.raises(ComputationException):
+        comp.value('b')
+    with pytest.raises(ComputationException):
+        comp.value('c')
+    comp.compute('d')
+    assert (comp.v.c == 3).all()
+
+
+def test_to_dict_leaves_out_stale_evicted_values():
+    comp = _chain_computation([], memory_budget=20000)
+    comp.compute('c')
+    assert comp.is_evicted('b')
+    comp.insert('a', np.ones(1000))
+    values = comp.to_dict()
+    assert 'b' not in values
+    assert (values['c'] == 2).all()
+    with pytest.raises(ComputationException) as e:
+        comp.v.b
+    assert 'COMPUTABLE' in str(e.value)
+
+
+def test_memory_budget_checks_each_node_once_per_change():
+    comp = Computation(memory_budget=1000)
+    n = 200
+    for i in range(n):
+        comp.add_node(('input', i), value=np.zeros(100))
+        comp.add_node(('calc', i), lambda x: x + 1, kwds={'x': ('input', i)})
+    checks = []
+    is_releasable = comp._is_releasable
+
+    def counting_is_releasable(*args):
+        checks.append(args[0])
+        return is_releasable(*args)
+
+    comp._is_releasable = counting_is_releasable
+    comp.compute_all()
+    assert comp._memory_usage > comp.memory_budget
+    assert len(checks) < 10 * n
+
+
+def test_no_memory_budget_keeps_values():
+    calls = []
+    comp = _chain_computation(calls)
+    comp.compute_all()
+    assert comp.is_evicted(['b', 'c', 'd']) == [False, False, False]
+
+    comp.set_memory_budget(20000)
+    comp.insert('a', np.ones(1000))
+    comp.compute_all()
+    assert comp.is_evicted(['b', 'c', 'd']) == [True, True, False]
+
+    comp.set_memory_budget(None)
+    assert (comp.v.b == 2).all()
+
+
+def test_memory_budget_spills_values():
+    calls = []
+    spill_dir = tempfile.mkdtemp()
+    try:
+        comp = _chain_computation(calls, memory_budget=20000, memory_policy='spill', spill_dir=spill_dir)
+        comp.compute('d')
+
+        assert calls == ['b', 'c', 'd']
+        assert comp.get_residency(['a', 'b', 'c', 'd']) == ['spilled', 'spilled', 'resident', 'resident']
+        assert list(comp.to_df().loc[['a', 'b', 'c', 'd'], 'residency']) == ['spilled', 'spilled', 'resident', 'resident']
+        assert comp.s[['a', 'b', 'c', 'd']] == [States.UPTODATE] * 4
+        assert comp._memory_usage <= 20000
+        assert len(os.listdir(spill_dir)) == 2
+
+        b = comp.v.b
+        assert isinstance(b, np.memmap)
+        assert (b == 1).all()
+        assert calls == ['b', 'c', 'd']
+        assert comp.get_residency('b') == 'resident'
+    finally:
+        shutil.rmtree(spill_dir)
+
+
+def test_memory_budget_spills_on_insert():
+    comp = Computation(memory_budget=20000, memory_policy='spill')
+    comp.add_node('a')
+    comp.add_node('b')
+    comp.add_node('c')
+    comp.insert('a', np.zeros(1000))
+    comp.insert('b', {'x': np.zeros(1000)})
+    assert comp.get_residency(['a', 'b']) == ['resident', 'resident']
+    comp.insert_many([('c', np.zeros(1000))])
+    assert comp.get_residency(['a', 'b', 'c']) == ['spilled', 'resident', 'resident']
+    assert (comp.v.a == 0).all()
+    assert comp.get_residency('a') == 'resident'
+    comp.insert('c', np.ones(1000))
+    assert comp.get_residency(['a', 'b', 'c']) == ['resident', 'spilled', 'resident']
+    assert (comp.v.b['x'] == 0).all()
+
+
+def test_spill_store_not_serialized():
+    comp = Computation(memory_budget=20000, memory_policy='spill')
+    comp.add_node('a')
+    comp.add_node('b')
+    comp.insert('a', np.zeros(1000))
+    comp.insert('b', np.zeros(2000))
+    assert comp.get_residency('a') == 'spilled'
+    comp2 = pickle.loads(pickle.dumps(comp))
+    assert comp2._disk_store is None
+    comp2.insert('a', np.zeros(2000))
+    assert comp2.get_residency(['a', 'b']) == ['resident', 'spilled']
+    assert comp2._disk_store.directory != comp._disk_store.directory
+    assert (comp2.v.b == 0).all()
+
+
+def test_memory_policy_kept_when_budget_changes():
+    comp = Computation(memory_policy='spill')
+    comp.add_node('a', value=np.zeros(1000))
+    assert comp.memory_policy == 'spill'
+    comp.set_memory_budget(20000)
+    assert comp.memory_policy == 'spill'
+    assert comp.get_size('a') >= 8000
+    comp.insert('a', np.zeros(4000))
+    assert comp.get_residency('a') == 'spilled'
+    assert comp.get_size('a') == 0
+    comp.set_memory_budget(None)
+    comp.set_memory_budget(20000, 'drop')
+    assert comp.memory_policy == 'drop'
+
+
+@raises(ValueError)
+def test_memory_budget_invalid_constructor_policy():
+    Computation(memory_policy='foo')
+
+
+@raises(ValueError)
+def test_memory_budget_invalid_policy():
+    comp = Computation()
+    comp.set_memory_budget(1000, 'foo')
+
+
+def _long_chain_computation(n, resident_counts):
+    comp = Computation()
+
+    def f(x):
+        resident_counts.append(sum(1 for i in range(1, n) if comp.dag.node[i].get('value') is not None
+                                   and not comp.is_evicted(i) and not isinstance(comp.dag.node[i]['value'], SpilledValue)))
+        return x + 1
+
+    comp.add_node(0, value=0)
+    for i in range(1, n):
+        comp.add_node(i, f, kwds={'x': i - 1})
+    return comp
+
+
+def test_compute_release_drop():
+    resident_counts = []
+    comp = _long_chain_computation(10, resident_counts)
+    comp.compute(9, release='drop')
+    assert comp.v[9] == 9
+    assert max(resident_counts) <= 1
+    assert comp.is_evicted(list(range(1, 9))) == [True] * 8
+    assert comp.s[5] == States.UPTODATE
+    assert comp.v[5] == 5
+
+
+def test_compute_all_release_spill():
+    resident_counts = []
+    comp = _long_chain_computation(10, resident_counts)
+    comp.compute_all(release='spill')
+    assert max(resident_counts) <= 1
+    spilled = comp.dag.node[5]['value']
+    assert isinstance(spilled, SpilledValue)
+    assert os.path.exists(spilled.path)
+    path = spilled.path
+    del spilled
+
+    assert comp.v[5] == 5
+    assert not isinstance(comp.dag.node[5]['value'], SpilledValue)
+    assert not os.path.exists(path)
+
+    f = six.BytesIO()
+    comp.write_dill(f)
+    f.seek(0)
+    comp2 = Computation.read_dill(f)
+    assert comp2.dag.node[6]['value'] == 6
+
+
+@raises(ValueError)
+def test_compute_release_invalid():
+    comp = _long_chain_computation(3, [])
+    comp.compute(2, release='foo')
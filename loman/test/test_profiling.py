@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+import six
+
+from loman import Computation, States
+from loman.visualization import get_color_range
+
+
+def test_profile_accumulates():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda a: 2 * a)
+    comp.add_node('d', lambda b, c: b + c)
+
+    assert comp.get_profile('b') is None
+    comp.compute_all()
+    comp.insert('a', 2)
+    comp.compute('b')
+
+    assert comp.get_profile('a') is None
+    assert comp.get_profile('b').count == 2
+    assert comp.get_profile('c').count == 1
+    assert comp.get_profile('d').count == 1
+    profile = comp.get_profile('b')
+    assert profile.min <= profile.last <= profile.max
+    assert abs(profile.total - profile.min - profile.max) < 1e-9
+
+    comp.reset_profile()
+    assert comp.get_profile(['b', 'c', 'd']) == [None, None, None]
+
+
+def test_profile_critical_path():
+    def slow(a):
+        sleep(0.05)
+        return a
+
+    def fast(a):
+        return a
+
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('slow', slow)
+    comp.add_node('fast', fast)
+    comp.add_node('res', lambda slow, fast: slow + fast)
+    comp.compute_all()
+
+    res = comp.get_profile('res')
+    assert res.critical_pred == 'slow'
+    assert res.critical_path >= comp.get_profile('slow').critical_path + res.total
+    assert comp.get_profile('slow').critical_pred is None
+
+    f = six.StringIO()
+    comp.write_flamegraph(f)
+    lines = dict(line.rsplit(' ', 1) for line in f.getvalue().splitlines())
+    assert set(lines) == {'slow', 'fast', 'slow;res'}
+    assert int(lines['slow']) >= 50000
+
+
+def test_timing_colors_with_equal_durations():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.compute_all()
+    comp.dag.node['b']['timing'] = comp.dag.node['b']['timing']._replace(duration=0.0)
+    comp.to_pydot(colors='timing')
+
+    comp2 = Computation()
+    comp2.add_node('a', value=1)
+    comp2.to_pydot(colors='timing')
+
+
+def test_timing_color_range_follows_current_timings():
+    comp = Computation()
+    comp.add_node('a', value=0.05)
+    comp.add_node('b', lambda a: sleep(a))
+    comp.add_node('c', lambda a: a)
+    comp.compute_all()
+    assert get_color_range(comp.dag, 'timing')[1] >= 0.05
+    comp.insert('a', 0.0)
+    comp.compute_all()
+    lo, hi = get_color_range(comp.dag, 'timing')
+    assert hi < 0.05
+    assert get_color_range(comp.copy().dag, 'timing') == (lo, hi)
+    comp.reset_profile()
+    assert get_color_range(comp.dag, 'profile') == (0.0, None)
+
+
+def test_timing_color_range_uses_nodes_shown():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: sleep(0.05))
+    comp.add_node('c', lambda a: sleep(0.01), tags=['shown'])
+    comp.add_node('d', lambda a: a, tags=['shown'])
+    comp.compute_all()
+
+    def fillcolors(viz_dag):
+        return {data['label']: data['fillcolor'] for name, data in viz_dag.nodes(data=True)}
+
+    assert fillcolors(comp._create_viz_dag(colors='timing'))['c'] != '#e50000'
+    assert fillcolors(comp._create_viz_dag(colors='timing', tags='shown'))['c'] == '#e50000'
+
+
+def test_profile_colors():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.compute_all()
+
+    viz_dag = comp._create_viz_dag(colors='profile')
+    labels = sorted(data['label'] for name, data in viz_dag.nodes(data=True))
+    assert labels[0] == 'a'
+    assert labels[1].startswith('b\nself: ')
+    assert '(1 calls)' in labels[1]
+    assert comp.s.b == States.UPTODATE
+
+
+def test_timing_queue_wait_and_worker():
+    def slow(a):
+        sleep(0.05)
+        return a
+
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', slow)
+    comp.add_node('c', slow)
+    comp.compute_all()
+
+    tb, tc = comp.tim.b, comp.tim.c
+    for timing in [tb, tc]:
+        assert timing.submit <= timing.start <= timing.end
+        assert abs(timing.queue_wait - (timing.start - timing.submit)) < 1e-9
+        assert abs(timing.duration - (timing.end - timing.start)) < 1e-9
+        assert timing.executor is None
+    assert tb.worker == tc.worker
+    assert max(tb.queue_wait, tc.queue_wait) >= 0.04
+
+
+def test_executor_utilization():
+    def slow(a):
+        sleep(0.05)
+        return a
+
+    comp = Computation(executor_map={'foo': ThreadPoolExecutor(2)})
+    comp.add_node('a', value=1)
+    comp.add_node('b', slow)
+    comp.add_node('c', slow, executor='foo')
+    comp.add_node('d', slow, executor='foo')
+    comp.compute_all()
+
+    utilization = comp.get_executor_utilization()
+    assert set(utilization) == {None, 'foo'}
+    assert utilization[None].nodes == 1
+    assert utilization[None].workers == 1
+    assert utilization['foo'].nodes == 2
+    assert utilization['foo'].workers == 2
+    assert utilization['foo'].busy >= 0.1
+    assert 0.0 < utilization['foo'].utilization <= 1.0
+
+    assert comp.get_executor_utilization(['b'])[None].nodes == 1
+    assert set(comp.get_executor_utilization(['b'])) == {None}
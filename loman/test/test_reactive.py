@@ -0,0 +1,111 @@
+import threading
+
+from nose.tools import assert_raises, raises
+
+from loman import Computation, States, ReactiveDriver, NonExistentNodeException
+
+
+def _counting_computation(calls):
+    comp = Computation()
+    comp.add_node('a', value=0)
+    comp.add_node('b', value=0)
+
+    def c(a):
+        calls.append(a)
+        return a % 2
+
+    comp.add_node('c', c)
+    comp.add_node('d', lambda a, b: a + b)
+    comp.compute_all()
+    return comp
+
+
+def test_reactive_driver_coalesces_inserts():
+    calls = []
+    comp = _counting_computation(calls)
+    changes = []
+    driver = ReactiveDriver(comp, ['c', 'd'])
+    driver.subscribe(changes.append)
+    for i in range(1, 101):
+        driver.insert('a', i)
+    driver.insert_many([('b', 1), ('b', 2)])
+    driver.flush()
+    assert calls == [0, 100]
+    assert (driver.n_inserts, driver.n_applied, driver.n_batches) == (102, 2, 1)
+    assert comp.v.d == 102
+    assert changes == [{'d': (States.UPTODATE, 102)}]
+
+    driver.insert('a', 102)
+    driver.flush()
+    assert calls == [0, 100, 102]
+    assert changes[-1] == {'d': (States.UPTODATE, 104)}
+
+
+def test_reactive_driver_subscribers():
+    calls = []
+    comp = _counting_computation(calls)
+    c_changes, d_changes = [], []
+    driver = ReactiveDriver(comp, ['c', 'd'])
+    driver.subscribe(c_changes.append, names='c')
+    driver.subscribe(d_changes.append, names=['d'])
+    driver.insert('a', 1)
+    driver.flush()
+    driver.insert('a', 3)
+    driver.flush()
+    assert c_changes == [{'c': (States.UPTODATE, 1)}]
+    assert d_changes == [{'d': (States.UPTODATE, 1)}, {'d': (States.UPTODATE, 3)}]
+
+    driver.unsubscribe(d_changes.append)
+    driver.insert('a', 4)
+    driver.flush()
+    assert len(d_changes) == 2
+    assert c_changes[-1] == {'c': (States.UPTODATE, 0)}
+
+
+def test_reactive_driver_background_thread():
+    comp = Computation()
+    comp.add_node('a', value=0)
+    comp.add_node('b', lambda a: 1 / a)
+    event = threading.Event()
+    changes = []
+
+    def on_change(c):
+        changes.append(c)
+        event.set()
+
+    driver = ReactiveDriver(comp, 'b', debounce=10, max_latency=0.05)
+    driver.subscribe(on_change)
+    with driver:
+        driver.insert('a', 2)
+        assert event.wait(5)
+        assert changes == [{'b': (States.UPTODATE, 0.5)}]
+        driver.insert('a', 0)
+        assert driver.flush(5)
+    assert changes[-1]['b'].state == States.ERROR
+    assert driver.n_batches == 2
+
+
+def test_reactive_driver_reports_errors():
+    calls = []
+    comp = _counting_computation(calls)
+    comp.add_node('e', lambda missing: missing)
+    driver = ReactiveDriver(comp, ['d', 'e'])
+    driver.start()
+    driver.insert('a', 5)
+    assert_raises(Exception, driver.flush, 5)
+    assert 'placeholder' in str(driver.last_error)
+    assert driver.n_errors == 1
+    assert driver.flush(5)
+    assert comp.v.a == 5
+    assert comp.s.d == States.COMPUTABLE
+
+    driver.insert('a', 6)
+    assert_raises(Exception, driver.stop)
+    assert driver.n_errors == 2
+    assert driver._thread is None
+
+
+@raises(NonExistentNodeException)
+def test_reactive_driver_nonexistent_node():
+    driver = ReactiveDriver(Computation(), [])
+    driver.insert('a', 1)
@@ -0,0 +1,215 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from nose.tools import raises
+
+from loman import (Computation, States, ResourcePool, CancellationToken, ComputationCancelledException,
+                   DeadlineExceededException)
+from loman.scheduling import PoolScheduler
+from loman.tracing import ComputationHook
+
+
+class ConcurrencyCounter(object):
+    def __init__(self, gate=None):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.gate = gate
+
+    def __call__(self, x):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        if self.gate is None:
+            time.sleep(0.05)
+        else:
+            self.gate.wait(5)
+        with self.lock:
+            self.running -= 1
+        return x + 1
+
+
+def _pool(name, max_concurrency=1, priority=0, groups=(), tags=(), executor=None, stealable=False):
+    return ResourcePool(name, max_concurrency, priority, frozenset(groups), frozenset(tags), executor, stealable)
+
+
+def test_pool_scheduler_priority():
+    lo, hi = _pool('lo', groups=['lo']), _pool('hi', priority=1, tags=['hi'])
+    scheduler = PoolScheduler([lo, hi])
+    assert scheduler.get_pool({'group': 'lo', 'tag': {'hi'}}) is hi
+    assert scheduler.get_pool({'group': 'lo', 'tag': set()}) is lo
+    assert scheduler.get_pool({'tag': set()}) is None
+
+    for name in ['l1', 'l2']:
+        scheduler.push(name, lo)
+    for name in ['h1', 'h2']:
+        scheduler.push(name, hi)
+    assert scheduler.pop_ready() == [('h1', hi), ('l1', lo)]
+    assert scheduler.pop_ready() == []
+    scheduler.finish('l1')
+    assert scheduler.pop_ready() == [('l2', lo)]
+    scheduler.finish('h1')
+    assert scheduler.pop_ready() == [('h2', hi)]
+
+
+def test_pool_scheduler_stealing():
+    busy, fixed, idle = _pool('busy', stealable=True), _pool('fixed', priority=1), _pool('idle', max_concurrency=2)
+    scheduler = PoolScheduler([busy, fixed, idle])
+    for name in ['b1', 'b2', 'b3', 'b4']:
+        scheduler.push(name, busy)
+    for name in ['f1', 'f2']:
+        scheduler.push(name, fixed)
+    assert scheduler.pop_ready() == [('f1', fixed), ('b1', busy), ('b2', idle), ('b3', idle)]
+    scheduler.finish('b2')
+    assert scheduler.pop_ready() == [('b4', idle)]
+    scheduler.finish('f1')
+    assert scheduler.pop_ready() == [('f2', fixed)]
+
+
+def _fan_out_computation(counter, n, **kwds):
+    comp = Computation(default_executor=ThreadPoolExecutor(8))
+    comp.add_node('a', value=0)
+    for i in range(n):
+        comp.add_node(i, counter, kwds={'x': 'a'}, **kwds)
+    return comp
+
+
+def test_resource_pool_max_concurrency():
+    counter = ConcurrencyCounter()
+    comp = _fan_out_computation(counter, 6, group='g')
+    comp.add_resource_pool('limited', max_concurrency=2, groups='g')
+    comp.compute_all()
+    assert comp.s[list(range(6))] == [States.UPTODATE] * 6
+    assert counter.max_running == 2
+
+    comp.remove_resource_pool('limited')
+    comp.insert('a', 1)
+    comp.compute_all()
+    assert counter.max_running == 6
+
+
+def test_resource_pool_executor_and_stealing():
+    counter = ConcurrencyCounter()
+    comp = _fan_out_computation(counter, 4, tags=['cpu'])
+    comp.executor_map['io'] = ThreadPoolExecutor(2)
+    comp.add_resource_pool('cpu', max_concurrency=1, tags='cpu', stealable=True)
+    comp.add_resource_pool('io', max_concurrency=2, tags='io', executor='io')
+    comp.compute_all()
+    assert counter.max_running == 3
+    executors = [comp.get_timing(i).executor for i in range(4)]
+    assert executors.count('io') >= 2
+
+
+def test_resource_pool_capacity_after_deadline():
+    gate = threading.Event()
+    counter = ConcurrencyCounter(gate)
+    comp = _fan_out_computation(counter, 3, group='g')
+    comp.add_resource_pool('limited', max_concurrency=1, groups='g')
+    try:
+        comp.compute_all(timeout=0.1)
+    except DeadlineExceededException:
+        pass
+    assert counter.running == 1
+
+    timer = threading.Timer(0.2, gate.set)
+    timer.start()
+    comp.compute_all()
+    timer.join()
+    assert comp.s[list(range(3))] == [States.UPTODATE] * 3
+    assert counter.max_running == 1
+
+
+@raises(ValueError)
+def test_resource_pool_invalid_concurrency():
+    comp = Computation()
+    comp.add_resource_pool('pool', max_concurrency=0)
+
+
+def _slow_chain_computation(calls, n, delay):
+    comp = Computation()
+
+    def f(x):
+        calls.append(x)
+        time.sleep(delay)
+        return x + 1
+
+    comp.add_node(0, value=0)
+    for i in range(1, n):
+        comp.add_node(i, f, kwds={'x': i - 1})
+    return comp
+
+
+def test_compute_timeout():
+    calls = []
+    comp = _slow_chain_computation(calls, 6, 0.1)
+    try:
+        comp.compute(5, timeout=0.25)
+        assert False
+    except DeadlineExceededException as e:
+        assert e.completed == [1, 2]
+        assert e.remaining == [3, 4, 5]
+    assert comp.s[[1, 2, 3, 4, 5]] == [States.UPTODATE] * 2 + [States.COMPUTABLE] + [States.STALE] * 2
+
+    comp.compute(5, timeout=10)
+    assert comp.v[5] == 5
+    assert calls[:2] == [0, 1]
+    assert calls[-3:] == [2, 3, 4]
+
+
+class CancelAfter(ComputationHook):
+    def __init__(self, name, token):
+        self.name = name
+        self.token = token
+
+    def on_finish(self, name, start, end, worker):
+        if name == self.name:
+            self.token.cancel()
+
+
+def test_compute_all_cancel_token():
+    token = CancellationToken()
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    comp.add_hook(CancelAfter('b', token))
+    try:
+        comp.compute_all(cancel_token=token)
+        assert False
+    except ComputationCancelledException as e:
+        assert e.completed == ['b']
+        assert e.remaining == ['c']
+    assert comp.s[['b', 'c']] == [States.UPTODATE, States.COMPUTABLE]
+
+    try:
+        comp.compute_all(cancel_token=token)
+        assert False
+    except ComputationCancelledException as e:
+        assert e.completed == []
+    comp.compute_all(cancel_token=CancellationToken())
+    assert comp.v.c == 3
+
+
+def test_cancel_token_cancels_queued_nodes():
+    token = CancellationToken()
+    calls = []
+
+    def f(x):
+        calls.append(x)
+        token.cancel()
+        time.sleep(0.05)
+        return x
+
+    comp = Computation(default_executor=ThreadPoolExecutor(1))
+    comp.add_node('a', value=0)
+    for i in range(4):
+        comp.add_node(i, f, kwds={'x': 'a'})
+    try:
+        comp.compute_all(cancel_token=token)
+        assert False
+    except ComputationCancelledException as e:
+        assert e.completed == []
+        assert len(e.remaining) == 4
+    assert len(calls) == 1
+    assert comp.s[list(range(4))] == [States.COMPUTABLE] * 4
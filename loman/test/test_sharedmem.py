@@ -0,0 +1,108 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from loman import Computation, States
+from loman.distributed import LocalProcessCluster
+from loman.sharedmem import DEFAULT_THRESHOLD, SharedValue, share_value, shared_memory
+
+
+def describe(x):
+    return type(x).__name__, bool(getattr(x, 'values', x).flags.writeable), float(np.asarray(x).sum())
+
+
+def test_share_value():
+    if shared_memory is None:
+        return
+    a = np.arange(10000.)
+    shared = share_value(a)
+    assert isinstance(shared, SharedValue)
+    a2 = pickle.loads(pickle.dumps(shared))
+    assert (a2 == a).all()
+    assert not a2.flags.writeable
+
+    df = pd.DataFrame({'x': a, 'y': a})
+    shared_df, shared_series = share_value(df), share_value(df.x)
+    df2 = pickle.loads(pickle.dumps(shared_df))
+    assert df2.equals(df)
+    s2 = pickle.loads(pickle.dumps(shared_series))
+    assert s2.equals(df.x)
+
+    assert share_value(np.arange(10.)) is None
+    assert share_value(np.array([object()] * 10000)) is None
+    assert share_value(pd.DataFrame({'x': a, 'y': a.astype(int)})) is None
+    shared.release()
+
+
+def _shared_computation():
+    comp = Computation(executor_map={'procs': ProcessPoolExecutor(2)})
+    comp.shared_memory_threshold = DEFAULT_THRESHOLD
+    comp.add_node('a', value=np.ones(10000))
+    comp.add_node('b', value=pd.Series(np.ones(10000)))
+    comp.add_node('c', describe, kwds={'x': 'a'}, executor='procs')
+    comp.add_node('d', describe, kwds={'x': 'b'}, executor='procs')
+    comp.add_node('e', describe, kwds={'x': 'a'}, executor='procs')
+    return comp
+
+
+def test_process_executor_shared_memory():
+    comp = _shared_computation()
+    comp.compute_all()
+    assert comp.s[['c', 'd', 'e']] == [States.UPTODATE] * 3
+    if shared_memory is None:
+        assert comp.v.c == ('ndarray', True, 10000.)
+        return
+    assert comp.v.c == ('ndarray', False, 10000.)
+    assert comp.v.d == ('Series', False, 10000.)
+    assert sorted(comp._shared_values) == ['a', 'b']
+    block = comp._shared_values['a']
+
+    comp.insert('a', np.ones(10000) * 2)
+    assert 'a' not in comp._shared_values
+    assert block.name is not None and block._shm is None
+    comp.compute_all()
+    assert comp.v.e == ('ndarray', False, 20000.)
+
+    comp.delete_node('d')
+    comp.delete_node('b')
+    assert sorted(comp._shared_values) == ['a']
+
+
+def test_process_executor_shared_memory_disabled():
+    comp = _shared_computation()
+    comp.shared_memory_threshold = None
+    comp.compute_all()
+    assert comp.v.c == ('ndarray', True, 10000.)
+    assert comp._shared_values == {}
+
+
+def add_one_in_place(x):
+    x += 1
+    return x
+
+
+def test_process_executor_shared_memory_off_by_default():
+    comp = Computation(executor_map={'procs': ProcessPoolExecutor(2)})
+    assert comp.shared_memory_threshold is None
+    comp.add_node('a', value=np.ones(10000))
+    comp.add_node('b', add_one_in_place, kwds={'x': 'a'}, executor='procs')
+    comp.compute_all()
+    assert comp.s.b == States.UPTODATE
+    assert (comp.v.b == 2).all()
+    assert (comp.v.a == 1).all()
+    assert comp._shared_values == {}
+
+
+def test_local_process_cluster_shared_memory():
+    if shared_memory is None:
+        return
+    with LocalProcessCluster(1) as cluster:
+        comp = Computation()
+        comp.shared_memory_threshold = DEFAULT_THRESHOLD
+        comp.add_node('a', value=np.ones(10000))
+        comp.add_node('b', describe, kwds={'x': 'a'}, group='g')
+        cluster.assign(comp)
+        comp.compute_all()
+        assert comp.v.b == ('ndarray', False, 10000.)
@@ -0,0 +1,158 @@
+import threading
+
+import numpy as np
+import pytest
+
+from loman import Computation, States
+from loman.computeengine import ComputationException
+
+
+def _computation():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b * 10)
+    return comp
+
+
+def test_snapshot_is_unaffected_by_later_changes():
+    comp = _computation()
+    comp.compute_all()
+    snapshot = comp.snapshot()
+    assert snapshot.v.c == 20
+    assert snapshot[['a', 'b']] == [(States.UPTODATE, 1), (States.UPTODATE, 2)]
+
+    comp.insert('a', 2)
+    assert snapshot.s.b == States.UPTODATE
+    assert snapshot.value(['a', 'b', 'c']) == [1, 2, 20]
+    later = comp.snapshot()
+    assert later.version > snapshot.version
+    assert later.state(['a', 'b', 'c']) == [States.UPTODATE, States.COMPUTABLE, States.STALE]
+    assert later.get_version('a') == snapshot.get_version('a') + 1
+
+    comp.compute_all()
+    comp.add_node('d', value=5)
+    comp.delete_node('c')
+    assert comp.snapshot().to_dict() == {'a': 2, 'b': 3, 'd': 5}
+    assert later.to_dict() == {'a': 2, 'b': 2, 'c': 20}
+    assert 'c' in later and 'c' not in comp.snapshot()
+
+
+def _blocking_computation():
+    started, release = threading.Event(), threading.Event()
+
+    def slow(b):
+        started.set()
+        release.wait(5)
+        return b * 10
+
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', slow)
+    release.set()
+    comp.compute_all()
+    started.clear()
+    release.clear()
+    return comp, started, release
+
+
+@pytest.mark.parametrize('publish', ['node', 'batch'])
+def test_snapshot_during_compute(publish):
+    comp, started, release = _blocking_computation()
+    comp.enable_snapshots(publish)
+    comp.insert('a', 2)
+    thread = threading.Thread(target=comp.compute_all)
+    thread.start()
+    try:
+        assert started.wait(5)
+        snapshot = comp.snapshot()
+        assert snapshot.v.c == 20
+        if publish == 'node':
+            assert snapshot[['a', 'b']] == [(States.UPTODATE, 2), (States.UPTODATE, 3)]
+            assert snapshot.s.c == States.COMPUTABLE
+        else:
+            assert snapshot[['a', 'b']] == [(States.UPTODATE, 2), (States.COMPUTABLE, 2)]
+            assert snapshot.s.c == States.STALE
+    finally:
+        release.set()
+        thread.join()
+    assert comp.snapshot().v.c == 30
+
+
+def test_writers_wait_for_compute():
+    comp, started, release = _blocking_computation()
+    comp.insert('a', 2)
+    thread = threading.Thread(target=comp.compute_all)
+    thread.start()
+    inserted = threading.Event()
+    writer = threading.Thread(target=lambda: (comp.insert('a', 3), inserted.set()))
+    try:
+        assert started.wait(5)
+        writer.start()
+        assert not inserted.wait(0.1)
+    finally:
+        release.set()
+        thread.join()
+        writer.join()
+    assert comp.s.c == States.STALE
+    comp.compute_all()
+    assert comp.v.c == 40
+
+
+def test_value_waits_for_compute():
+    comp, started, release = _blocking_computation()
+    comp.insert('a', 2)
+    thread = threading.Thread(target=comp.compute_all)
+    thread.start()
+    values = []
+    reader = threading.Thread(target=lambda: values.append(comp.v.c))
+    try:
+        assert started.wait(5)
+        reader.start()
+        reader.join(0.1)
+        assert values == []
+    finally:
+        release.set()
+        thread.join()
+        reader.join()
+    assert values == [30]
+
+
+def test_disable_snapshots():
+    comp = _computation()
+    comp.compute_all()
+    snapshot = comp.snapshot()
+    comp.disable_snapshots()
+    comp.insert('a', 5)
+    assert comp._dirty is None
+    assert snapshot.v.a == 1
+    assert comp.snapshot().v.a == 5
+    with pytest.raises(ValueError):
+        comp.enable_snapshots('compute')
+
+
+def test_snapshot_with_memory_budget():
+    comp = Computation(memory_budget=20000)
+    comp.add_node('a', value=np.zeros(1000))
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    comp.add_node('d', lambda c: c + 1)
+    comp.compute('d')
+    assert comp.is_evicted('b')
+    snapshot = comp.snapshot()
+    assert snapshot.s.b == States.UPTODATE
+    assert (snapshot.v.b == 1).all()
+
+    comp.insert('a', np.ones(1000))
+    assert (comp.snapshot().v.b == 1).all()
+    comp.compute('d')
+    assert comp.is_evicted('b')
+    assert (comp.snapshot().v.b == 2).all()
+
+    comp.disable_snapshots()
+    comp.insert('a', np.zeros(1000))
+    snapshot = comp.snapshot()
+    assert snapshot.s.b == States.COMPUTABLE
+    with pytest.raises(ComputationException):
+        snapshot.v.b
@@ -0,0 +1,98 @@
+import threading
+
+from nose.tools import raises
+from six.moves import queue
+
+from loman import Computation, States, CancellationToken
+from loman.sources import END_OF_STREAM, Source
+
+
+def test_run_pipeline_iterator():
+    comp = Computation()
+    comp.add_source_node('x', (i for i in range(10)))
+    comp.add_node('y', lambda x: x * 2)
+    results = []
+    stats = comp.run_pipeline('y', on_batch=lambda c: results.append(c.v.y))
+    assert results == [i * 2 for i in range(10)]
+    assert (stats.items, stats.batches) == (10, 10)
+    assert stats.items_per_second > 0
+    assert comp.s.y == States.UPTODATE
+
+
+def test_run_pipeline_batches():
+    comp = Computation()
+    comp.add_source_node('x', range(10), batch_size=4)
+    comp.add_source_node('w', [1, 1, 1])
+    comp.add_node('y', lambda x, w: sum(x) * w)
+    results = []
+    stats = comp.run_pipeline(on_batch=lambda c: results.append(c.v.y))
+    assert results == [6, 22, 17]
+    assert (stats.items, stats.batches) == (13, 3)
+
+
+def test_run_pipeline_queue():
+    q = queue.Queue(maxsize=5)
+    comp = Computation()
+    comp.add_source_node('x', q, batch_size=100)
+    comp.add_node('y', lambda x: len(x))
+    sizes = []
+
+    def produce():
+        for i in range(50):
+            q.put(i)
+        q.put(END_OF_STREAM)
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    stats = comp.run_pipeline('y', on_batch=lambda c: sizes.append(c.v.y))
+    thread.join()
+    assert stats.items == 50
+    assert sum(sizes) == 50
+
+    q = queue.Queue()
+    for i in range(12):
+        q.put(i)
+    q.put(END_OF_STREAM)
+    comp.add_source_node('x', q, batch_size=5)
+    sizes = []
+    comp.run_pipeline('y', on_batch=lambda c: sizes.append(c.v.y))
+    assert sizes == [5, 5, 2]
+
+
+def test_run_pipeline_cancel():
+    token = CancellationToken()
+    comp = Computation()
+    comp.add_source_node('x', queue.Queue())
+    token.cancel()
+    stats = comp.run_pipeline(cancel_token=token)
+    assert stats.batches == 0
+
+
+def test_source_nodes_not_copied():
+    comp = Computation()
+    comp.add_source_node('x', [1, 2])
+    assert list(comp.copy().sources) == []
+    comp.delete_node('x')
+    assert list(comp.sources) == []
+
+
+def test_source_nodes_renamed_and_deleted():
+    comp = Computation()
+    comp.add_source_node('x', [1, 2])
+    comp.rename_node('x', 'z')
+    comp.add_node('y', lambda z: z * 10)
+    assert list(comp.sources) == ['z']
+    stats = comp.run_pipeline('y')
+    assert stats.items == 2
+    assert comp.v.y == 20
+
+    comp.add_source_node('w', [1])
+    comp.add_node('v', lambda w: w)
+    comp.delete_node('w')
+    assert comp.s.w == States.PLACEHOLDER
+    assert list(comp.sources) == ['z']
+
+
+@raises(ValueError)
+def test_source_invalid_batch_size():
+    Source([], batch_size=0)
@@ -0,0 +1,82 @@
+from six.moves import queue
+
+from loman import Computation, States
+from loman.computeengine import NodeChange
+
+
+def _computation():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1, group='g')
+    comp.add_node('c', lambda b: b + 1, tags=['t'])
+    comp.add_node('d', lambda a: a * 10)
+    comp.compute_all()
+    return comp
+
+
+def test_subscribe_delivers_one_change_set_per_compute():
+    comp = _computation()
+    change_sets = []
+    comp.subscribe(change_sets.append)
+    comp.compute_all()
+    assert change_sets == []
+
+    comp.insert('a', 2)
+    assert change_sets == []
+    comp.compute_all()
+    assert len(change_sets) == 1
+    assert sorted(change_sets[0]) == [
+        NodeChange('a', States.UPTODATE, States.UPTODATE, 2),
+        NodeChange('b', States.UPTODATE, States.UPTODATE, 3),
+        NodeChange('c', States.UPTODATE, States.UPTODATE, 4),
+        NodeChange('d', States.UPTODATE, States.UPTODATE, 20),
+    ]
+
+    comp.insert('a', 3)
+    comp.compute('b')
+    assert sorted(change_sets[-1]) == [
+        NodeChange('a', States.UPTODATE, States.UPTODATE, 3),
+        NodeChange('b', States.UPTODATE, States.UPTODATE, 4),
+        NodeChange('c', States.UPTODATE, States.COMPUTABLE, 4),
+        NodeChange('d', States.UPTODATE, States.COMPUTABLE, 20),
+    ]
+
+
+def test_subscribe_filters():
+    comp = _computation()
+    by_node, by_tag, by_group = [], queue.Queue(), []
+    comp.subscribe(by_node.append, nodes=['d'])
+    comp.subscribe(by_tag, tags='t')
+    subscription = comp.subscribe(by_group.append, groups=['g'])
+    comp.insert('a', 2)
+    comp.compute_all()
+    assert [[change.name for change in changes] for changes in by_node] == [['d']]
+    assert [change.name for change in by_tag.get_nowait()] == ['c']
+    assert [[change.name for change in changes] for changes in by_group] == [['b']]
+
+    comp.unsubscribe(subscription)
+    comp.insert('a', 3)
+    comp.compute_all()
+    assert len(by_group) == 1
+    assert len(by_node) == 2
+
+
+def test_publish_changes_and_errors():
+    comp = _computation()
+    change_sets = []
+
+    def failing_subscriber(changes):
+        raise ValueError()
+
+    comp.subscribe(failing_subscriber)
+    comp.subscribe(change_sets.append)
+    comp.add_node('e', lambda a: 1 / 0)
+    comp.publish_changes()
+    assert change_sets == [[NodeChange('e', None, States.COMPUTABLE, None)]]
+    comp.compute_all()
+    assert change_sets[-1][0].name == 'e'
+    assert change_sets[-1][0].new_state == States.ERROR
+
+    for subscription in list(comp._subscriptions):
+        comp.unsubscribe(subscription)
+    assert comp._changes is None
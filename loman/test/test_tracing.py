@@ -0,0 +1,87 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import six
+
+from loman import Computation, States
+from loman.tracing import ComputationHook, ChromeTraceRecorder
+
+
+class EventRecorder(ComputationHook):
+    def __init__(self):
+        self.events = []
+
+    def on_plan(self, targets, nodes, start, end):
+        self.events.append(('plan', targets, set(nodes)))
+
+    def on_submit(self, name, executor_name, bind_start, submit):
+        assert bind_start <= submit
+        self.events.append(('submit', name))
+
+    def on_start(self, name, start, worker):
+        self.events.append(('start', name))
+
+    def on_finish(self, name, start, end, worker):
+        assert start <= end
+        assert worker[0] == os.getpid()
+        self.events.append(('finish', name))
+
+    def on_error(self, name, error, start, end, worker):
+        self.events.append(('error', name, type(error.exception)))
+
+    def on_propagate(self, name, start, end):
+        self.events.append(('propagate', name))
+
+
+def test_hook_events():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b / 0)
+    hook = EventRecorder()
+    comp.add_hook(hook)
+    comp.compute('c')
+
+    assert hook.events == [
+        ('plan', 'c', {'b', 'c'}),
+        ('submit', 'b'),
+        ('start', 'b'),
+        ('finish', 'b'),
+        ('submit', 'c'),
+        ('propagate', 'b'),
+        ('start', 'c'),
+        ('error', 'c', ZeroDivisionError),
+        ('propagate', 'c'),
+    ]
+
+    comp.remove_hook(hook)
+    comp.insert('a', 2)
+    comp.compute_all()
+    assert len(hook.events) == 9
+    assert comp.s.b == States.UPTODATE
+
+
+def test_chrome_trace_recorder():
+    comp = Computation(default_executor=ThreadPoolExecutor(2))
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda a: a + 2)
+    comp.add_node('d', lambda b, c: b + c)
+    recorder = ChromeTraceRecorder()
+    comp.add_hook(recorder)
+    comp.compute('d')
+
+    f = six.StringIO()
+    recorder.write(f)
+    trace = json.loads(f.getvalue())
+    events = trace['traceEvents']
+    calcs = [e for e in events if e['cat'] == 'calc']
+    assert sorted(e['name'] for e in calcs) == ['b', 'c', 'd']
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in calcs)
+    assert len([e for e in events if e['cat'] == 'queue']) == 6
+    assert len([e for e in events if e['cat'] == 'plan']) == 1
+    assert len([e for e in events if e['cat'] == 'propagate']) == 3
+
+    recorder.clear()
+    assert recorder.to_dict()['traceEvents'] == []
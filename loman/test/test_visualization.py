@@ -56,3 +56,95 @@ def test_simple():
     assert node['c']['attributes']['style'] == 'filled'
     assert node['d']['attributes']['fillcolor'] == loman.visualization.state_colors[States.UPTODATE]
     assert node['d']['attributes']['style'] == 'filled'
+
+
+def test_to_dot():
+    comp = Computation()
+    comp.add_node('a', group='foo')
+    comp.add_node('b', lambda a: a + 1, group='foo')
+    comp.add_node('c', lambda b: 2 * b)
+    comp.insert('a', 1)
+
+    dot = comp.to_dot(graph_attr={'size': '"10,8"'})
+    assert dot.startswith('digraph G {')
+    assert 'size="10,8";' in dot
+    assert 'subgraph "cluster_foo" {' in dot
+    assert '[label="a", style="filled", fillcolor="{}"]'.format(
+        loman.visualization.state_colors[States.UPTODATE]) in dot
+    assert '[label="c", style="filled", fillcolor="{}"]'.format(
+        loman.visualization.state_colors[States.STALE]) in dot
+    assert dot.count(' -> ') == 2
+
+    f = six.StringIO()
+    comp.write_dot(f, graph_attr={'size': '"10,8"'})
+    assert f.getvalue() == dot
+
+
+def test_collapse_groups():
+    comp = Computation()
+    comp.add_node('a', group='foo')
+    comp.add_node('b', lambda a: a + 1, group='foo')
+    comp.add_node('c', lambda a: a + 2, group='foo')
+    comp.add_node('d', lambda b, c: b + c)
+    comp.insert('a', 1)
+
+    viz_dag = comp._create_viz_dag(collapse_groups=True)
+    labels = {data['label']: (name, data) for name, data in viz_dag.nodes(data=True)}
+    assert set(labels) == {'foo\nCOMPUTABLE: 2\nUPTODATE: 1', 'd'}
+    foo_name, foo_data = labels['foo\nCOMPUTABLE: 2\nUPTODATE: 1']
+    assert foo_data['fillcolor'] == loman.visualization.state_colors[States.COMPUTABLE]
+    assert list(viz_dag.edges()) == [(foo_name, labels['d'][0])]
+
+    d = comp.to_pydot(collapse_groups=True)
+    assert len(d.obj_dict['nodes']) == 2
+
+
+def _viz_labels(viz_dag):
+    return {data['label'] for name, data in viz_dag.nodes(data=True)}
+
+
+def test_draw_neighbourhood():
+    comp = Computation()
+    comp.add_node('a', value=1)
+    comp.add_node('b', lambda a: a + 1)
+    comp.add_node('c', lambda b: b + 1)
+    comp.add_node('d', lambda c: c + 1)
+    comp.add_node('e', lambda d: d + 1)
+    comp.add_node('x', value=1)
+
+    assert _viz_labels(comp._create_viz_dag(nodes='c')) == {'a', 'b', 'c', 'd', 'e'}
+    assert _viz_labels(comp._create_viz_dag(nodes='c', depth=1)) == {'b', 'c', 'd'}
+    assert _viz_labels(comp._create_viz_dag(nodes=['a', 'x'], depth=1)) == {'a', 'b', 'x'}
+    assert _viz_labels(comp._create_viz_dag(nodes='c', depth=0)) == {'c'}
+
+    d = comp.to_pydot(nodes='c', depth=1)
+    assert len(d.obj_dict['nodes']) == 3
+
+
+def test_draw_filter_states_and_tags():
+    comp = Computation()
+    comp.add_node('a', value=1, tags=['foo'])
+    comp.add_node('b', lambda a: a + 1, tags=['foo'])
+    comp.add_node('c', lambda b: b + 1)
+    comp.add_node('d', lambda c: c + 1, tags=['foo'])
+    comp.insert('a', 2)
+
+    assert _viz_labels(comp._create_viz_dag(states=States.STALE)) == {'c', 'd'}
+    assert _viz_labels(comp._create_viz_dag(states=[States.UPTODATE, States.COMPUTABLE])) == {'a', 'b'}
+    assert _viz_labels(comp._create_viz_dag(tags='foo')) == {'a', 'b', 'd'}
+    assert _viz_labels(comp._create_viz_dag(tags='foo', states=States.STALE)) == {'d'}
+    assert _viz_labels(comp._create_viz_dag(nodes='a', depth=2, tags='foo')) == {'a', 'b'}
+    assert 'label="d"' in comp.to_dot(tags='foo', states=States.STALE)
+
+
+def test_hide_unreferenced_expansion_nodes():
+    from collections import namedtuple
+    Coordinate = namedtuple('Coordinate', ['x', 'y'])
+    comp = Computation()
+    comp.add_node('c', value=Coordinate(1, 2))
+    comp.add_named_tuple_expansion('c', Coordinate)
+    comp.add_node('foo', lambda x: x + 1, kwds={'x': 'c.x'})
+    comp.add_node('bar', value=1)
+
+    assert _viz_labels(comp._create_viz_dag()) == {'c', 'c.x', 'foo', 'bar'}
+    assert _viz_labels(comp._create_viz_dag(show_expansion=True)) == {'c', 'c.x', 'c.y', 'foo', 'bar'}
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+
+import six
+
+from loman.compat import perf_counter
+
+
+class ComputationHook(object):
+    """
+    Base class for hooks that observe node calculations. Subclasses override the methods for the events they need.
+
+    Times are floats in seconds from ``loman.compat.perf_counter``. Workers are identified by a tuple ``(process id, thread id)``. All methods are called from the thread that called ``compute``. ``on_start`` and ``on_finish`` or ``on_error`` are called once a node's result has been received, with the times recorded by the worker that calculated it.
+    """
+    def on_plan(self, targets, nodes, start, end):
+        """Called when ``compute`` has planned the nodes that must be calculated to compute ``targets``"""
+
+    def on_submit(self, name, executor_name, bind_start, submit):
+        """Called when a node is submitted to an executor, after its arguments were bound from ``bind_start``"""
+
+    def on_start(self, name, start, worker):
+        """Called with the time a worker started calculating a node"""
+
+    def on_finish(self, name, start, end, worker):
+        """Called when a node's calculation succeeded"""
+
+    def on_error(self, name, error, start, end, worker):
+        """Called when a node's calculation raised an exception"""
+
+    def on_propagate(self, name, start, end):
+        """Called after a node's new state has been propagated to its descendents"""
+
+
+class ChromeTraceRecorder(ComputationHook):
+    """
+    Records node calculations as Chrome trace events
+
+    The recorded trace can be loaded into ``chrome://tracing`` or other trace viewers that read the Trace Event Format. Planning, argument binding and state propagation are shown on the thread that called ``compute``, queueing on an executor as an asynchronous event from submission until the worker starts, and each calculation on the thread of the worker that ran it.
+
+    Example::
+
+        >>> recorder = ChromeTraceRecorder()
+        >>> comp.add_hook(recorder)
+        >>> comp.compute_all()
+        >>> recorder.write('trace.json')
+    """
+    def __init__(self):
+        self.origin = perf_counter()
+        self.events = []
+        self._submit_times = {}
+        self._pid = os.getpid()
+
+    def _ts(self, t):
+        return (t - self.origin) * 1e6
+
+    def _add_event(self, name, cat, start, end, pid=None, tid=None, args=None):
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': self._ts(start),
+            'dur': (end - start) * 1e6,
+            'pid': self._pid if pid is None else pid,
+            'tid': threading.current_thread().ident if tid is None else tid,
+        }
+        if args is not None:
+            event['args'] = args
+        self.events.append(event)
+
+    def on_plan(self, targets, nodes, start, end):
+        self._add_event('plan', 'plan', start, end, args={'targets': str(targets), 'nodes': len(nodes)})
+
+    def on_submit(self, name, executor_name, bind_start, submit):
+        self._add_event('bind {}'.format(name), 'bind', bind_start, submit, args={'executor': str(executor_name)})
+        self._submit_times[name] = submit
+
+    def on_start(self, name, start, worker):
+        submit = self._submit_times.pop(name, None)
+        if submit is not None:
+            event = {'name': 'queue {}'.format(name), 'cat': 'queue', 'id': len(self.events), 'pid': worker[0]}
+            self.events.append(dict(event, ph='b', ts=self._ts(submit)))
+            self.events.append(dict(event, ph='e', ts=self._ts(start)))
+
+    def on_finish(self, name, start, end, worker):
+        pid, tid = worker
+        self._add_event(str(name), 'calc', start, end, pid=pid, tid=tid)
+
+    def on_error(self, name, error, start, end, worker):
+        pid, tid = worker
+        self._add_event(str(name), 'calc', start, end, pid=pid, tid=tid, args={'error': repr(error.exception)})
+
+    def on_propagate(self, name, start, end):
+        self._add_event('propagate {}'.format(name), 'propagate', start, end)
+
+    def to_dict(self):
+        """
+        Get the recorded trace in the Trace Event Format
+
+        :rtype: dict
+        """
+        return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def write(self, file_):
+        """
+        Write the recorded trace as JSON
+
+        :param file_: If string, writes to a file
+        :type file_: File-like object, or string
+        """
+        if isinstance(file_, six.string_types):
+            with open(file_, 'w') as f:
+                json.dump(self.to_dict(), f)
+        else:
+            json.dump(self.to_dict(), file_)
+
+    def clear(self):
+        """Discard all recorded events"""
+        self.events = []
+        self._submit_times = {}
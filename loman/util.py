@@ -1,3 +1,4 @@
+import sys
 import types
 import itertools
 
@@ -20,6 +21,44 @@ def apply_n(f, *xs, **kwds):
     for p in itertools.product(*[as_iterable(x) for x in xs]):
         f(*p, **kwds)
 
+
+def values_equal(a, b):
+    """
+    Check cheaply whether two values are the same, for deciding whether inserting a value changes a node
+
+    Numpy arrays and pandas objects are compared by type and shape before their contents, and values that cannot be compared are treated as different.
+    """
+    if type(a) is not type(b):
+        return False
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(a, np.ndarray):
+        return a.shape == b.shape and a.dtype == b.dtype and bool(np.array_equal(a, b))
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(a, (pd.DataFrame, pd.Series, pd.Index)):
+        return a.shape == b.shape and bool(a.equals(b))
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def append_values(value, rows):
+    """
+    Append rows to a value, which may be a pandas DataFrame or Series, numpy array, list or tuple
+    """
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return pd.concat([value, rows])
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(value, np.ndarray):
+        return np.concatenate([value, rows])
+    if isinstance(value, list):
+        return value + list(rows)
+    if isinstance(value, tuple):
+        return value + tuple(rows)
+    raise TypeError('Cannot append rows to a value of type {}'.format(type(value).__name__))
+
+
 class AttributeView(object):
     def __init__(self, get_attribute_list, get_attribute, get_item=None):
         self.get_attribute_list = get_attribute_list
@@ -1,9 +1,8 @@
-import matplotlib as mpl
 import networkx as nx
-import pydotplus
 import six
 
 from loman.consts import NodeAttributes, States
+from loman.profiling import format_duration
 
 state_colors = {
     None: '#ffffff',                    # xkcd white
@@ -17,17 +16,101 @@ state_colors = {
 }
 
 
-def create_viz_dag(comp_dag, colors='state', cmap=None):
+_state_severity = [States.ERROR, States.PLACEHOLDER, States.UNINITIALIZED, States.STALE, States.COMPUTABLE,
+                   States.PINNED, States.UPTODATE, None]
+
+
+def create_group_viz_dag(comp_dag, cmap=None):
+    """
+    Create a visualization DAG in which each group of nodes is collapsed into a single summary node
+
+    Summary nodes are labelled with the number of nodes in each state, and colored according to the most severe state in the group. Nodes without a group are shown individually.
+    """
+    if cmap is None:
+        cmap = state_colors
+
+    members = {}
+    node_keys = {}
+    for name, data in comp_dag.nodes(data=True):
+        group = data.get(NodeAttributes.GROUP)
+        key = ('group', group) if group is not None else ('node', name)
+        node_keys[name] = key
+        members.setdefault(key, []).append(data.get(NodeAttributes.STATE))
+
+    viz_dag = nx.DiGraph()
+    node_index_map = {}
+    for i, (key, states) in enumerate(six.iteritems(members)):
+        short_name = "n{}".format(i)
+        kind, name = key
+        if kind == 'group':
+            counts = {}
+            for state in states:
+                counts[state] = counts.get(state, 0) + 1
+            lines = [str(name)]
+            for state in _state_severity:
+                if state in counts:
+                    lines.append('{}: {}'.format(state.name if state is not None else 'NONE', counts[state]))
+            label = '\n'.join(lines)
+            state = min(counts, key=_state_severity.index)
+        else:
+            label = name
+            state = states[0]
+        viz_dag.add_node(short_name, label=label, style='filled', fillcolor=cmap[state], _group=None)
+        node_index_map[key] = short_name
+    for name1, name2 in comp_dag.edges():
+        short_name_1 = node_index_map[node_keys[name1]]
+        short_name_2 = node_index_map[node_keys[name2]]
+        if short_name_1 != short_name_2:
+            viz_dag.add_edge(short_name_1, short_name_2, _group=None)
+    return viz_dag
+
+
+def get_color_range(comp_dag, colors):
+    """
+    Get the (min, max) durations of nodes' most recent calculations for ``'timing'`` colors, or (0, max) of their profile totals for ``'profile'`` colors
+    """
+    lo, hi = None, None
+    if colors == 'timing':
+        for name, timing in comp_dag.nodes(data=NodeAttributes.TIMING):
+            if timing is not None:
+                lo = timing.duration if lo is None else min(lo, timing.duration)
+                hi = timing.duration if hi is None else max(hi, timing.duration)
+    elif colors == 'profile':
+        lo = 0.0
+        for name, profile in comp_dag.nodes(data=NodeAttributes.PROFILE):
+            if profile is not None:
+                hi = profile.total if hi is None else max(hi, profile.total)
+    return lo, hi
+
+
+def _range_color(cmap, value, color_range):
+    import matplotlib as mpl
+    lo, hi = color_range
+    if hi is None or hi <= lo:
+        norm_value = 0.0
+    else:
+        norm_value = min(max((value - lo) / (hi - lo), 0.0), 1.0)
+    return mpl.colors.rgb2hex(cmap(norm_value))
+
+
+def create_viz_dag(comp_dag, colors='state', cmap=None, color_range=None):
+    """
+    Create a visualization DAG from a computation DAG
+
+    :param colors: ``'state'`` to color nodes by state, ``'timing'`` to color nodes by the duration of their last calculation, or ``'profile'`` to color nodes by their total calculation time, and label them with accumulated profile data
+    :param cmap: Mapping from state to color for ``'state'``, otherwise a matplotlib colormap
+    :param color_range: (min, max) durations to scale colors for ``'timing'`` and ``'profile'``. If not given, it is found from the nodes of ``comp_dag``.
+    """
     colors = colors.lower()
     if colors == 'state':
         if cmap is None:
             cmap = state_colors
-    elif colors == 'timing':
+    elif colors in ('timing', 'profile'):
         if cmap is None:
+            import matplotlib as mpl
             cmap = mpl.colors.LinearSegmentedColormap.from_list('blend', ['#15b01a', '#ffff14', '#e50000'])
-        timings = nx.get_node_attributes(comp_dag, NodeAttributes.TIMING)
-        max_duration = max(timing.duration for timing in six.itervalues(timings) if hasattr(timing, 'duration'))
-        min_duration = min(timing.duration for timing in six.itervalues(timings) if hasattr(timing, 'duration'))
+        if color_range is None:
+            color_range = get_color_range(comp_dag, colors)
     else:
         raise ValueError('{} is not a valid loman colors parameter for visualization'.format(colors))
 
@@ -48,9 +131,16 @@ def create_viz_dag(comp_dag, colors='state', cmap=None):
             if timing_data is None:
                 col = '#FFFFFF'
             else:
-                duration = timing_data.duration
-                norm_duration = (duration - min_duration) / (max_duration - min_duration)
-                col = mpl.colors.rgb2hex(cmap(norm_duration))
+                col = _range_color(cmap, timing_data.duration, color_range)
+            attr_dict['fillcolor'] = col
+        elif colors == 'profile':
+            profile = data.get(NodeAttributes.PROFILE)
+            if profile is None:
+                col = '#FFFFFF'
+            else:
+                col = _range_color(cmap, profile.total, color_range)
+                attr_dict['label'] = '{}\nself: {} ({} calls)\ncritical path: {}'.format(
+                    name, format_duration(profile.total), profile.count, format_duration(profile.critical_path))
             attr_dict['fillcolor'] = col
 
         viz_dag.add_node(short_name, **attr_dict)
@@ -70,6 +160,7 @@ def create_viz_dag(comp_dag, colors='state', cmap=None):
 
 
 def to_pydot(viz_dag, graph_attr=None, node_attr=None, edge_attr=None):
+    import pydotplus
     node_groups = {}
     for name, data in viz_dag.nodes(data=True):
         group = data.get('_group')
@@ -122,4 +213,71 @@ def to_pydot(viz_dag, graph_attr=None, node_attr=None, edge_attr=None):
         edge = pydotplus.Edge(name1, name2)
         viz_dot.add_edge(edge)
 
-    return viz_dot
\ No newline at end of file
+    return viz_dot
+
+
+def _dot_id(value):
+    value = six.text_type(value)
+    if len(value) >= 2 and (value[0], value[-1]) in (('"', '"'), ('<', '>')):
+        return value
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def _dot_attrs(attrs):
+    items = ['{}={}'.format(k, _dot_id(v)) for k, v in six.iteritems(attrs) if not k.startswith('_')]
+    return ' [' + ', '.join(items) + ']' if items else ''
+
+
+def write_dot(viz_dag, file_, graph_attr=None, node_attr=None, edge_attr=None):
+    """
+    Write a visualization DAG as GraphViz DOT text
+
+    This produces the same graph as ``to_pydot``, but writes text directly to ``file_`` in a single pass over the nodes and edges, without building intermediate pydotplus objects, which makes it practical for very large graphs.
+
+    :param viz_dag: Visualization DAG, as created by ``create_viz_dag``
+    :param file_: File-like object to write to
+    """
+    node_groups = {}
+    for name, data in viz_dag.nodes(data=True):
+        node_groups.setdefault(data.get('_group'), []).append((name, data))
+
+    edge_groups = {}
+    for name1, name2, data in viz_dag.edges(data=True):
+        edge_groups.setdefault(data.get('_group'), []).append((name1, name2))
+
+    file_.write('digraph G {\n')
+    if graph_attr is not None:
+        for k, v in six.iteritems(graph_attr):
+            file_.write('{}={};\n'.format(k, _dot_id(v)))
+    if node_attr is not None:
+        file_.write('node{};\n'.format(_dot_attrs(node_attr)))
+    if edge_attr is not None:
+        file_.write('edge{};\n'.format(_dot_attrs(edge_attr)))
+
+    for group, nodes in six.iteritems(node_groups):
+        if group is None:
+            continue
+        file_.write('subgraph {} {{\n'.format(_dot_id('cluster_' + str(group))))
+        file_.write('label={};\n'.format(_dot_id(group)))
+        for name, data in nodes:
+            file_.write('{}{};\n'.format(_dot_id(name), _dot_attrs(data)))
+        for name1, name2 in edge_groups.get(group, []):
+            file_.write('{} -> {};\n'.format(_dot_id(name1), _dot_id(name2)))
+        file_.write('}\n')
+
+    for name, data in node_groups.get(None, []):
+        file_.write('{}{};\n'.format(_dot_id(name), _dot_attrs(data)))
+    for name1, name2 in edge_groups.get(None, []):
+        file_.write('{} -> {};\n'.format(_dot_id(name1), _dot_id(name2)))
+    file_.write('}\n')
+
+
+def to_dot(viz_dag, graph_attr=None, node_attr=None, edge_attr=None):
+    """
+    Convert a visualization DAG to GraphViz DOT text
+
+    :rtype: str
+    """
+    f = six.StringIO()
+    write_dot(viz_dag, f, graph_attr, node_attr, edge_attr)
+    return f.getvalue()